@@ -0,0 +1,374 @@
+"""
+End-to-end benchmark suite.
+
+Builds the app with create_app() against a scratch database, seeds it with
+synthetic data (see src/seeding.py) and measures latency percentiles and
+throughput for every route in routes.py and the hot service functions.
+Results are written as JSON; --baseline compares them with a saved run and
+exits 1 if anything got slower than --threshold.
+
+Usage (from the project root):
+    python benchmarks/benchmark_suite.py --scale tiny --json baseline.json
+    python benchmarks/benchmark_suite.py --scale tiny --baseline baseline.json
+    python benchmarks/benchmark_suite.py --scale xl --database-url mysql+pymysql://root:pw@localhost/moffat_bay_bench
+
+A --database-url must point at a scratch database created from db/schema.sql
+and db/data.sql (the script adds the scaled rows on top). Without one, a
+temporary SQLite database is created, seeded and deleted afterwards.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlite_standin import ROOT, create_sqlite_database, remove_sqlite_database, sqlite_config
+from sqlalchemy import text  # noqa: E402
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from seeding import SCALES, seed_database  # noqa: E402
+from services.audit_service import audit_writer  # noqa: E402
+from services.booking_service import DATE_FMT  # noqa: E402
+from services.reservations_service import list_reservations, room_is_available  # noqa: E402
+from services.rooms_service import list_rooms_paginated  # noqa: E402
+from services.team_service import get_team_with_contributions  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Differences below this are noise, whatever the percentage (milliseconds)
+NOISE_FLOOR_MS = 0.05
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy URL of a scratch database (default: temporary SQLite file)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="tiny", help="dataset size (default: tiny)")
+    parser.add_argument("--rooms", type=int, help="override the number of seeded rooms")
+    parser.add_argument("--customers", type=int, help="override the number of seeded customers")
+    parser.add_argument("--reservations", type=int, help="override the number of seeded reservations")
+    parser.add_argument("--skip-seed", action="store_true", help="use the --database-url data as it is")
+    parser.add_argument("--seed", type=int, default=460, help="random seed for data and request mix")
+    parser.add_argument("--iterations", type=int, default=200, help="measured calls per case (default: 200)")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured calls per case first (default: 20)")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--json", dest="json_path", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=15.0,
+                        help="percent slowdown of p50 or p95 counted as a regression (default: 15)")
+    return parser.parse_args()
+
+
+# -----------------
+# Measurement
+# -----------------
+
+def summarize(latencies, wall: float):
+    latencies = sorted(latencies)
+    n = len(latencies)
+    result = {
+        "iterations": n,
+        "mean_ms": round(sum(latencies) / n * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+        "throughput_per_s": round(n / wall, 1) if wall else None,
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(latencies[min(n - 1, int(n * p / 100))] * 1000, 4)
+    return result
+
+def run_case(call, iterations: int, warmup: int):
+    """
+    Calls `call(i)` warmup + iterations times; `call` may raise AssertionError
+    to report a wrong status. Returns the latency summary.
+    """
+    for i in range(warmup):
+        call(i)
+    latencies = []
+    began = time.perf_counter()
+    for i in range(iterations):
+        started = time.perf_counter()
+        call(warmup + i)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, time.perf_counter() - began)
+
+
+# -----------------
+# Cases
+# -----------------
+
+class Fixture:
+    """
+    Ids and values the cases pick from, read once from the seeded database.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.room_ids = db.session.execute(text("SELECT RoomID FROM room ORDER BY RoomID")).scalars().all()
+        self.member_ids = db.session.execute(text("SELECT id FROM team_member ORDER BY id")).scalars().all()
+        busiest = db.session.execute(text("""
+            SELECT c.CustomerID, c.Email, COUNT(*) AS n
+            FROM reservation r JOIN customer c ON c.CustomerID = r.CustomerID
+            GROUP BY c.CustomerID, c.Email
+            ORDER BY n DESC
+            LIMIT 1
+        """)).first()
+        self.customer_id, self.customer_email = busiest.CustomerID, busiest.Email
+        self.reservation_ids = db.session.execute(
+            text("SELECT ReservationID FROM reservation ORDER BY ReservationID DESC LIMIT 500")
+        ).scalars().all()
+        self.today = date.today()
+
+    def room(self):
+        return self.rng.choice(self.room_ids)
+
+    def stay(self, max_nights: int = 4):
+        check_in = self.today + timedelta(days=self.rng.randint(1, 150))
+        check_out = check_in + timedelta(days=self.rng.randint(1, max_nights))
+        return check_in.strftime(DATE_FMT), check_out.strftime(DATE_FMT)
+
+    def month(self):
+        return (self.today + timedelta(days=self.rng.randint(0, 150))).strftime("%Y-%m")
+
+
+def expect(response, *statuses):
+    assert response.status_code in statuses, f"{response.request.path}: HTTP {response.status_code}"
+    return response
+
+def route_cases(app, fx: Fixture):
+    """
+    One case per route (and per interesting variant). Each returns a callable
+    taking the iteration number.
+    """
+    anon = app.test_client()
+    user = app.test_client()
+    with user.session_transaction() as session:
+        session["customer_id"] = fx.customer_id
+        session["customer_email"] = fx.customer_email
+        session["customer_firstName"] = "Bench"
+        session["customer_lastName"] = "User"
+
+    room = fx.rng.choice(fx.room_ids)
+
+    def set_pending(_i):
+        check_in, check_out = fx.stay()
+        expect(user.post(f"/rooms/{room}", data={"check_in": check_in, "check_out": check_out, "guests": "1"}), 302)
+
+    def booking_summary(i):
+        # The pending reservation stays in the session until it is confirmed
+        if i == 0:
+            set_pending(i)
+        expect(user.get("/reservation_summary.html"), 200)
+
+    cases = {
+        "GET /":                          lambda i: expect(anon.get("/"), 200),
+        "GET /attraction.html":           lambda i: expect(anon.get("/attraction.html"), 200),
+        "GET /about.html":                lambda i: expect(anon.get("/about.html"), 200),
+        "GET /lodge_reservation.html":    lambda i: expect(anon.get(f"/lodge_reservation.html?page={i % 5 + 1}"), 200),
+        "GET /lodge_reservation.html (filtered)": lambda i: expect(anon.get(
+            "/lodge_reservation.html?check_in={}&check_out={}&guests=2".format(*fx.stay())), 200),
+        "GET /rooms/<id>":                lambda i: expect(anon.get(f"/rooms/{fx.room()}"), 200),
+        "POST /rooms/<id>":               set_pending,
+        "GET /reservation_lookup.html (by email)": lambda i: expect(
+            anon.get(f"/reservation_lookup.html?q={fx.customer_email}"), 200),
+        "GET /reservation_lookup.html (by id)": lambda i: expect(
+            anon.get(f"/reservation_lookup.html?q={fx.rng.choice(fx.reservation_ids)}"), 200),
+        "GET /reservation_lookup.html (logged in)": lambda i: expect(user.get("/reservation_lookup.html"), 200),
+        "GET /reservation_summary.html":  booking_summary,
+        "GET /registration":              lambda i: expect(anon.get("/registration"), 200),
+        "POST /login (bad password)":     lambda i: expect(
+            anon.post("/login", data={"email": fx.customer_email, "password": "wrong"}), 200),
+        "GET /logout":                    lambda i: expect(app.test_client().get("/logout"), 302),
+        "GET /api/availability":          lambda i: expect(
+            anon.get("/api/availability?check_in={}&check_out={}".format(*fx.stay())), 200),
+        "GET /api/rooms/calendar":        lambda i: expect(anon.get(f"/api/rooms/calendar?month={fx.month()}"), 200),
+        "GET /api/rooms/<id>/calendar":   lambda i: expect(
+            anon.get(f"/api/rooms/{fx.room()}/calendar?month={fx.month()}"), 200),
+        "GET /api/team":                  lambda i: expect(anon.get("/api/team"), 200),
+        "GET /api/team/<id>":             lambda i: expect(anon.get(f"/api/team/{fx.rng.choice(fx.member_ids)}"), 200),
+        "GET /internal/catalog":          lambda i: expect(anon.get("/internal/catalog"), 200),
+        "GET /internal/pool":             lambda i: expect(anon.get("/internal/pool"), 200),
+        "GET /internal/sql":              lambda i: expect(anon.get("/internal/sql"), 200),
+        "GET /metrics":                   lambda i: expect(anon.get("/metrics"), 200),
+        "GET 404":                        lambda i: expect(anon.get("/no-such-page"), 404),
+    }
+    return cases
+
+def write_cases(app, fx: Fixture):
+    """
+    Routes that write rows; run last so they don't change what the reads see.
+    """
+    user = app.test_client()
+    with user.session_transaction() as session:
+        session["customer_id"] = fx.customer_id
+    anon = app.test_client()
+
+    def register(i):
+        expect(anon.post("/registration", data={
+            "first": "Bench", "last": "Mark", "email": f"bench{time.time_ns()}@example.com",
+            "password": "Password123!", "phone": "773-555-0100",
+        }), 200)
+
+    def confirm(i):
+        check_in, check_out = fx.stay(max_nights=2)
+        expect(user.post(f"/rooms/{fx.room()}", data={"check_in": check_in, "check_out": check_out, "guests": "1"}), 302)
+        expect(user.post("/reservation_summary.html", data={"action": "confirm"}), 302)
+
+    return {
+        "POST /registration":               register,
+        "POST /reservation_summary.html":   confirm,
+        "POST /api/send-team-message":      lambda i: expect(anon.post("/api/send-team-message", json={
+            "memberId": fx.member_ids[0], "senderName": "Bench", "senderEmail": "bench@example.com", "message": "Hello",
+        }), 200),
+    }
+
+def service_cases(app, fx: Fixture):
+    def in_context(call):
+        def wrapped(i):
+            with app.app_context():
+                call(i)
+        return wrapped
+
+    def lookup_pages(i):
+        rows, pagination = list_reservations(q=fx.customer_email, customer_id=None, per_page=3)
+        if pagination["next_cursor"]:
+            list_reservations(q=fx.customer_email, customer_id=None, per_page=3, cursor=pagination["next_cursor"])
+
+    return {
+        "list_reservations (customer, with total)": in_context(
+            lambda i: list_reservations(q="", customer_id=fx.customer_id, per_page=3)),
+        "list_reservations (email, 2 pages)":       in_context(lookup_pages),
+        "list_reservations (by id)":                in_context(
+            lambda i: list_reservations(q=str(fx.rng.choice(fx.reservation_ids)), customer_id=None, per_page=3)),
+        "list_reservations (customer, no total)":   in_context(
+            lambda i: list_reservations(q="", customer_id=fx.customer_id, per_page=3, with_total=False)),
+        "room_is_available":                        in_context(
+            lambda i: room_is_available(fx.room(), *fx.stay())),
+        "list_rooms_paginated":                     in_context(
+            lambda i: list_rooms_paginated(page=i % 20 + 1, per_page=9)),
+        "get_team_with_contributions":              in_context(lambda i: get_team_with_contributions()),
+    }
+
+
+# -----------------
+# Baseline comparison
+# -----------------
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """
+    Prints old vs new p50/p95 per case. Returns the names of regressed cases.
+    """
+    regressions = []
+    print(f"\n{'case':52} {'p50 base':>9} {'p50 now':>9} {'diff':>7} {'p95 base':>9} {'p95 now':>9} {'diff':>7}")
+    for name, now in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None or "error" in now or "error" in base:
+            print(f"{name:52} {'(no baseline)' if base is None else '(error)':>9}")
+            continue
+        row, regressed = [], False
+        for key in ("p50_ms", "p95_ms"):
+            change = (now[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            if change > threshold and now[key] - base[key] > NOISE_FLOOR_MS:
+                regressed = True
+            row += [f"{base[key]:>9.3f}", f"{now[key]:>9.3f}", f"{change:>+6.1f}%"]
+        print(f"{name:52} {' '.join(row)}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    scale = dict(SCALES[args.scale])
+    for key in ("rooms", "customers", "reservations"):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    db_path = None
+    if args.database_url:
+        BenchConfig = type("BenchConfig", (Config,), {"SQLALCHEMY_DATABASE_URI": args.database_url})
+    else:
+        db_path = create_sqlite_database()
+        BenchConfig = sqlite_config(db_path)
+    BenchConfig.WTF_CSRF_ENABLED = False
+    BenchConfig.SQL_SLOW_QUERY_MS = 0
+
+    app = create_app(BenchConfig)
+
+    seed_seconds = None
+    with app.app_context():
+        if not args.skip_seed:
+            began = time.perf_counter()
+            seeded = seed_database(seed=args.seed, log=lambda msg: print(f"seeding {msg}", file=sys.stderr), **scale)
+            seed_seconds = round(time.perf_counter() - began, 2)
+            print(f"seeded {seeded} in {seed_seconds}s", file=sys.stderr)
+        fx = Fixture(rng)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit":    git_commit(),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "database":  app.config["SQLALCHEMY_DATABASE_URI"].split("@")[-1] if args.database_url else "sqlite (temporary)",
+            "scale":     scale,
+            "seed":      args.seed,
+            "seed_seconds": seed_seconds,
+            "iterations": args.iterations,
+            "warmup":    args.warmup,
+        },
+        "cases": {},
+    }
+
+    groups = [route_cases(app, fx), service_cases(app, fx), write_cases(app, fx)]
+    for cases in groups:
+        for name, call in cases.items():
+            if args.only and args.only not in name:
+                continue
+            try:
+                result = run_case(call, args.iterations, args.warmup)
+            except AssertionError as e:
+                result = {"error": str(e)}
+            results["cases"][name] = result
+            if "error" in result:
+                print(f"{name:52} ERROR {result['error']}")
+            else:
+                print(f"{name:52} p50 {result['p50_ms']:>8.3f} ms  p95 {result['p95_ms']:>8.3f} ms  "
+                      f"p99 {result['p99_ms']:>8.3f} ms  {result['throughput_per_s']:>8.1f}/s")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    exit_code = 1 if any("error" in r for r in results["cases"].values()) else 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold}%")
+            exit_code = 1
+
+    # Audit events are still queued for the background writer
+    audit_writer.close()
+    if db_path:
+        with app.app_context():
+            db.engine.dispose()
+        remove_sqlite_database(db_path)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Concurrency load test for the booking path (confirm_reservation).
+
+Fires hundreds of simultaneous confirms from many threads at a small pool of
+rooms and overlapping date ranges, then reports throughput, conflict rate and
+the number of double bookings found in the database (which must be zero).
+
+Usage (from the project root):
+    python benchmarks/booking_load_test.py                      # temporary SQLite DB
+    python benchmarks/booking_load_test.py --threads 64 --attempts 1000
+    python benchmarks/booking_load_test.py --database-url mysql+pymysql://root:pw@localhost/moffat_bay_load
+
+A --database-url must point at a scratch database created from db/schema.sql
+(or db/schema_sqlite.sql); the script adds its own room type, rooms and customer.
+Exit code is 1 if any double booking is detected.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from sqlite_standin import create_sqlite_database, remove_sqlite_database, sqlite_config
+from sqlalchemy import text  # noqa: E402
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from services.booking_service import DATE_FMT  # noqa: E402
+from services.reservations_service import confirm_reservation, RoomUnavailableError  # noqa: E402
+
+ROOM_NUMBER_PREFIX = "LT"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy URL of a scratch database (default: temporary SQLite file)")
+    parser.add_argument("--threads", type=int, default=50, help="concurrent worker threads (default: 50)")
+    parser.add_argument("--attempts", type=int, default=500, help="total confirm attempts (default: 500)")
+    parser.add_argument("--rooms", type=int, default=5, help="rooms competed for (default: 5)")
+    parser.add_argument("--days", type=int, default=30, help="window of check-in days (default: 30)")
+    parser.add_argument("--max-nights", type=int, default=4, help="longest stay requested (default: 4)")
+    parser.add_argument("--seed", type=int, default=460, help="random seed for the request mix")
+    return parser.parse_args()
+
+def seed_fixtures(room_count: int):
+    """
+    Adds a room type, `room_count` rooms and one customer for the test.
+    Returns (room_ids, customer_id).
+    """
+    run_tag = str(int(time.time()))[-5:]
+    db.session.execute(text("""
+        INSERT INTO roomtype (TypeName, BedConfiguration, PricePerNight, MaxOccupancy)
+        VALUES (:name, '1 King', 150.00, 2)
+    """), {"name": f"Load Test {run_tag}"})
+    room_type_id = db.session.execute(
+        text("SELECT RoomTypeID FROM roomtype WHERE TypeName = :name"), {"name": f"Load Test {run_tag}"}
+    ).scalar()
+
+    db.session.execute(text("""
+        INSERT INTO room (RoomNumber, RoomTypeID, ADAAccessible, Description)
+        VALUES (:number, :type_id, 0, 'Load test room')
+    """), [
+        {"number": f"{ROOM_NUMBER_PREFIX}{run_tag}{i:02d}", "type_id": room_type_id}
+        for i in range(room_count)
+    ])
+    db.session.execute(text("""
+        INSERT INTO customer (FirstName, LastName, Email, Phone, PasswordHash)
+        VALUES ('Load', 'Test', :email, NULL, 'x')
+    """), {"email": f"loadtest{run_tag}@example.com"})
+    db.session.commit()
+
+    room_ids = db.session.execute(
+        text("SELECT RoomID FROM room WHERE RoomTypeID = :type_id ORDER BY RoomID"), {"type_id": room_type_id}
+    ).scalars().all()
+    customer_id = db.session.execute(
+        text("SELECT CustomerID FROM customer WHERE Email = :email"), {"email": f"loadtest{run_tag}@example.com"}
+    ).scalar()
+    return room_ids, customer_id
+
+def count_double_bookings(room_ids):
+    """
+    Counts pairs of CONFIRMED reservations that overlap on the same room.
+    """
+    return db.session.execute(text("""
+        SELECT COUNT(*)
+        FROM reservation a
+        JOIN reservation b
+          ON a.RoomID = b.RoomID
+         AND a.ReservationID < b.ReservationID
+         AND a.CheckInDate < b.CheckOutDate
+         AND a.CheckOutDate > b.CheckInDate
+        WHERE a.ReservationStatus = 'Confirmed'
+          AND b.ReservationStatus = 'Confirmed'
+          AND a.RoomID IN ({})
+    """.format(", ".join(str(int(room_id)) for room_id in room_ids)))).scalar()
+
+def build_requests(args, room_ids):
+    """
+    Builds the request mix: random rooms, check-ins and stay lengths in a
+    narrow window so many requests compete for the same nights.
+    """
+    rng = random.Random(args.seed)
+    start = date.today() + timedelta(days=1)
+    requests = []
+    for _ in range(args.attempts):
+        check_in = start + timedelta(days=rng.randrange(args.days))
+        check_out = check_in + timedelta(days=rng.randint(1, args.max_nights))
+        requests.append({
+            "room_id":   rng.choice(room_ids),
+            "check_in":  check_in.strftime(DATE_FMT),
+            "check_out": check_out.strftime(DATE_FMT),
+            "guests":    1,
+            "price_per_night": 150.0,  # the fixture room type's price, as build_pending_reservation() quotes it
+        })
+    return requests
+
+def main():
+    args = parse_args()
+
+    db_path = None
+    if args.database_url:
+        database_url = args.database_url
+
+        class LoadTestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database_url
+            SQLALCHEMY_ENGINE_OPTIONS = {**Config.SQLALCHEMY_ENGINE_OPTIONS, "pool_size": args.threads, "max_overflow": 0}
+    else:
+        db_path = create_sqlite_database(sample_data=False)
+        LoadTestConfig = sqlite_config(db_path)
+        database_url = LoadTestConfig.SQLALCHEMY_DATABASE_URI
+
+    app = create_app(LoadTestConfig)
+
+    with app.app_context():
+        room_ids, customer_id = seed_fixtures(args.rooms)
+    requests = build_requests(args, room_ids)
+
+    counts = {"confirmed": 0, "conflicts": 0, "errors": 0}
+    counts_lock = threading.Lock()
+    latencies = []
+    start_gate = threading.Barrier(min(args.threads, len(requests)))
+
+    def attempt(pending, wait_at_gate):
+        if wait_at_gate:
+            start_gate.wait()
+        with app.app_context():
+            began = time.perf_counter()
+            try:
+                confirm_reservation(pending, customer_id)
+                outcome = "confirmed"
+            except RoomUnavailableError:
+                outcome = "conflicts"
+            except Exception:
+                db.session.rollback()
+                outcome = "errors"
+            elapsed = time.perf_counter() - began
+        with counts_lock:
+            counts[outcome] += 1
+            latencies.append(elapsed)
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        # The first wave waits at a barrier so it really hits the DB at the same instant
+        list(pool.map(attempt, requests, [i < start_gate.parties for i in range(len(requests))]))
+    wall = time.perf_counter() - began
+
+    with app.app_context():
+        double_bookings = count_double_bookings(room_ids)
+
+    latencies.sort()
+    report = {
+        "database":            database_url.split("@")[-1],
+        "threads":             args.threads,
+        "attempts":            len(requests),
+        "confirmed":           counts["confirmed"],
+        "conflicts":           counts["conflicts"],
+        "errors":              counts["errors"],
+        "conflict_rate":       round(counts["conflicts"] / len(requests), 4),
+        "throughput_per_s":    round(len(requests) / wall, 1),
+        "latency_p50_ms":      round(latencies[len(latencies) // 2] * 1000, 2),
+        "latency_p95_ms":      round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "wall_seconds":        round(wall, 3),
+        "double_bookings":     double_bookings,
+    }
+    print(json.dumps(report, indent=2))
+
+    if db_path:
+        remove_sqlite_database(db_path)
+    return 1 if double_bookings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
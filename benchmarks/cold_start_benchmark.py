@@ -0,0 +1,167 @@
+"""
+Cold-start cost of a new worker process: time to first response, and how
+much slower each page's first request is than its later ones.
+
+Every run is a fresh Python process (like a worker started by a deploy or a
+recycle) that imports the app, runs create_app() against a SQLite stand-in
+and requests ROUTES in order, with one template setup per mode:
+  baseline        no bytecode cache, templates compiled on first render
+  bytecode-cold   TEMPLATE_BYTECODE_CACHE on an empty directory (first
+                  worker after a deploy without `flask templates compile`)
+  bytecode-warm   TEMPLATE_BYTECODE_CACHE, directory already filled
+  precompile      TEMPLATE_PRECOMPILE, no bytecode cache
+  precompile+bytecode-warm  both
+Reports medians over --runs processes: create_app() time, time from spawn
+to the first response, and the summed first-request latency of ROUTES
+against their steady-state latency.
+
+Usage (from the project root):
+    python benchmarks/cold_start_benchmark.py
+    python benchmarks/cold_start_benchmark.py --runs 10 --json cold_start.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUTES = [
+    "/",
+    "/about.html",
+    "/attraction.html",
+    "/rooms/101",
+    "/lodge_reservation.html",
+    "/registration",
+]
+
+MODES = {
+    "baseline":                 {"TEMPLATE_BYTECODE_CACHE": False, "TEMPLATE_PRECOMPILE": False, "warm": False},
+    "bytecode-cold":            {"TEMPLATE_BYTECODE_CACHE": True,  "TEMPLATE_PRECOMPILE": False, "warm": False},
+    "bytecode-warm":            {"TEMPLATE_BYTECODE_CACHE": True,  "TEMPLATE_PRECOMPILE": False, "warm": True},
+    "precompile":               {"TEMPLATE_BYTECODE_CACHE": False, "TEMPLATE_PRECOMPILE": True,  "warm": False},
+    "precompile+bytecode-warm": {"TEMPLATE_BYTECODE_CACHE": True,  "TEMPLATE_PRECOMPILE": True,  "warm": True},
+}
+
+# Later requests per route timed for the steady-state latency
+STEADY_REQUESTS = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode (default: 5)")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated modes to run (default: all)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "DB", "CACHE_DIR"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def child(mode: str, db_path: str, cache_dir: str):
+    """
+    One cold worker: prints its timings as JSON on stdout.
+    """
+    from sqlite_standin import sqlite_config
+
+    imported = time.perf_counter()
+    from app import create_app
+
+    settings = {key: value for key, value in MODES[mode].items() if key != "warm"}
+    started = time.perf_counter()
+    app = create_app(sqlite_config(db_path, TEMPLATE_BYTECODE_CACHE_DIR=cache_dir, **settings))
+    created = time.perf_counter()
+    client = app.test_client()
+
+    first, steady, first_response_at = {}, {}, None
+    for url in ROUTES:
+        t0 = time.perf_counter()
+        status = client.get(url).status_code
+        first[url] = (time.perf_counter() - t0) * 1000
+        if first_response_at is None:
+            first_response_at = time.time()
+        if status != 200:
+            raise SystemExit(f"{url} returned {status}")
+    for url in ROUTES:
+        timings = []
+        for _ in range(STEADY_REQUESTS):
+            t0 = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - t0) * 1000)
+        steady[url] = statistics.median(timings)
+
+    print(json.dumps({
+        "import_ms":         (started - imported) * 1000,
+        "create_app_ms":     (created - started) * 1000,
+        "first_response_at": first_response_at,
+        "first_ms":          first,
+        "steady_ms":         steady,
+    }))
+
+def run_child(mode: str, db_path: str, cache_dir: str):
+    spawned = time.time()
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, db_path, cache_dir],
+        check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["time_to_first_response_ms"] = (result.pop("first_response_at") - spawned) * 1000
+    return result
+
+def main():
+    args = parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    from sqlite_standin import create_sqlite_database, remove_sqlite_database
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise SystemExit(f"unknown mode(s): {', '.join(unknown)} (choose from {', '.join(MODES)})")
+
+    db_path = create_sqlite_database()
+    work_dir = tempfile.mkdtemp(prefix="moffat_templates_")
+    results = {}
+    try:
+        for mode in modes:
+            runs = []
+            for _ in range(args.runs):
+                cache_dir = os.path.join(work_dir, mode)
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                if MODES[mode]["warm"]:
+                    run_child("bytecode-cold", db_path, cache_dir)  # fills the cache
+                runs.append(run_child(mode, db_path, cache_dir))
+
+            first_total = [sum(run["first_ms"].values()) for run in runs]
+            steady_total = [sum(run["steady_ms"].values()) for run in runs]
+            results[mode] = {
+                "import_app_ms":             round(statistics.median(r["import_ms"] for r in runs), 1),
+                "create_app_ms":             round(statistics.median(r["create_app_ms"] for r in runs), 1),
+                "time_to_first_response_ms": round(statistics.median(r["time_to_first_response_ms"] for r in runs), 1),
+                "first_requests_ms":         round(statistics.median(first_total), 1),
+                "steady_requests_ms":        round(statistics.median(steady_total), 1),
+                "first_request_penalty_ms":  round(statistics.median(f - s for f, s in zip(first_total, steady_total)), 1),
+                "first_ms_by_route":         {url: round(statistics.median(r["first_ms"][url] for r in runs), 1)
+                                              for url in ROUTES},
+            }
+    finally:
+        remove_sqlite_database(db_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{len(ROUTES)} routes, median of {args.runs} fresh processes per mode")
+    print(f"  {'mode':<26} {'create_app':>11} {'to 1st resp':>12} {'1st reqs':>10} {'steady':>8} {'penalty':>9}")
+    for mode, result in results.items():
+        print(f"  {mode:<26} {result['create_app_ms']:>9} ms {result['time_to_first_response_ms']:>9} ms "
+              f"{result['first_requests_ms']:>7} ms {result['steady_requests_ms']:>5} ms "
+              f"{result['first_request_penalty_ms']:>6} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"routes": ROUTES, "runs": args.runs, "modes": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measures what HTTP conditional caching saves per request.
+
+For each cacheable route, a browser-like client (keeps its session cookie)
+requests the page N times without validators and N times revalidating with
+If-None-Match, then reports bytes sent and CPU time per request for both.
+
+Usage (from the project root):
+    python benchmarks/http_cache_benchmark.py
+    python benchmarks/http_cache_benchmark.py --requests 500 --json results.json
+"""
+
+import argparse
+import json
+import time
+
+from sqlite_standin import create_sqlite_database, remove_sqlite_database, sqlite_config
+from app import create_app  # noqa: E402
+
+ROUTES = [
+    "/",
+    "/attraction.html",
+    "/about.html",
+    "/lodge_reservation.html",
+    "/rooms/101",
+    "/registration",
+    "/api/team",
+    "/api/team/1",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and mode (default: 200)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    return parser.parse_args()
+
+def response_bytes(response):
+    """
+    Body plus status line and headers, roughly what goes on the wire.
+    """
+    head = sum(len(k) + len(v) + 4 for k, v in response.headers.items()) + len(response.status) + 11
+    return head + len(response.get_data())
+
+def measure(client, url, count, headers=None):
+    statuses = set()
+    total_bytes = 0
+    cpu_start = time.process_time()
+    for _ in range(count):
+        response = client.get(url, headers=headers or {})
+        statuses.add(response.status_code)
+        total_bytes += response_bytes(response)
+    cpu = time.process_time() - cpu_start
+    return {
+        "statuses":      sorted(statuses),
+        "bytes_per_req": round(total_bytes / count),
+        "cpu_us_per_req": round(cpu / count * 1_000_000),
+    }
+
+def main():
+    args = parse_args()
+    db_path = create_sqlite_database()
+    app = create_app(sqlite_config(db_path))
+    client = app.test_client()
+
+    results = {}
+    for url in ROUTES:
+        # Warm-up: establishes the session (CSRF token) and fills in-process caches
+        client.get(url)
+        etag = client.get(url).headers.get("ETag")
+
+        full = measure(client, url, args.requests)
+        revalidated = measure(client, url, args.requests, {"If-None-Match": etag} if etag else None)
+        results[url] = {
+            "etag":        etag,
+            "full":        full,
+            "revalidated": revalidated,
+            "bytes_saved_pct": round(100 * (1 - revalidated["bytes_per_req"] / full["bytes_per_req"]), 1),
+            "cpu_saved_pct":   round(100 * (1 - revalidated["cpu_us_per_req"] / max(full["cpu_us_per_req"], 1)), 1),
+        }
+
+    print(f"{'route':28} {'full B':>8} {'304 B':>7} {'saved':>7} {'full us':>8} {'304 us':>7} {'saved':>7}")
+    for url, r in results.items():
+        print(
+            f"{url:28} {r['full']['bytes_per_req']:>8} {r['revalidated']['bytes_per_req']:>7} "
+            f"{r['bytes_saved_pct']:>6}% {r['full']['cpu_us_per_req']:>8} "
+            f"{r['revalidated']['cpu_us_per_req']:>7} {r['cpu_saved_pct']:>6}%"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    remove_sqlite_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
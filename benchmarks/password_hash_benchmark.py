@@ -0,0 +1,103 @@
+"""
+Logins per second per core for each password hashing policy.
+
+For every policy in HASH_POLICIES (or --policies), verifies a correct
+password repeatedly in this process to get the cost of one login on one
+core, then runs --concurrency logins at once through PasswordHasher's
+process pool to get the throughput of --workers cores. Also reports the
+peak memory one hash needs (scrypt is memory-hard).
+
+Usage (from the project root):
+    python benchmarks/password_hash_benchmark.py
+    python benchmarks/password_hash_benchmark.py --policies scrypt,pbkdf2-light --workers 4 --json hashing.json
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlite_standin  # noqa: F401  (puts src/ on sys.path)
+from werkzeug.security import check_password_hash, generate_password_hash
+from services.password_service import HASH_POLICIES, PasswordHasher, canonical_method  # noqa: E402
+
+PASSWORD = "Password123"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", default=",".join(HASH_POLICIES),
+                        help="comma-separated policy names or Werkzeug methods (default: all named policies)")
+    parser.add_argument("--logins", type=int, default=20, help="logins measured per policy and mode (default: 20)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="hashing pool processes (default: one per CPU)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="logins in flight through the pool (default: 2 x workers)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    return parser.parse_args()
+
+def single_core(pw_hash: str, logins: int):
+    check_password_hash(pw_hash, PASSWORD)  # warm up
+    started = time.perf_counter()
+    for _ in range(logins):
+        assert check_password_hash(pw_hash, PASSWORD)
+    return (time.perf_counter() - started) / logins
+
+def through_pool(policy: str, pw_hash: str, logins: int, workers: int, concurrency: int):
+    hasher = PasswordHasher()
+    hasher.configure(policy=policy, workers=workers, queue_factor=max(concurrency // workers, 1) + 1)
+    try:
+        hasher.verify(pw_hash, PASSWORD)  # starts the pool processes
+        with ThreadPoolExecutor(max_workers=concurrency) as threads:
+            started = time.perf_counter()
+            results = list(threads.map(lambda _i: hasher.verify(pw_hash, PASSWORD), range(logins)))
+            seconds = time.perf_counter() - started
+    finally:
+        hasher.shutdown()
+    assert all(results)
+    return logins / seconds
+
+def scrypt_memory_mb(method: str):
+    name, *args = method.split(":")
+    if name != "scrypt":
+        return None
+    n, r, p = map(int, args)
+    return round(128 * n * r * p / 2**20, 1)
+
+def main():
+    args = parse_args()
+    concurrency = args.concurrency or args.workers * 2
+
+    rows = []
+    for policy in [p.strip() for p in args.policies.split(",") if p.strip()]:
+        method = canonical_method(policy)
+        pw_hash = generate_password_hash(PASSWORD, method)
+        seconds = single_core(pw_hash, args.logins)
+        pooled = through_pool(policy, pw_hash, args.logins, args.workers, concurrency)
+        rows.append({
+            "policy":              policy,
+            "method":              method,
+            "ms_per_login":        round(seconds * 1000, 2),
+            "logins_per_sec_core": round(1 / seconds, 1),
+            "pool_logins_per_sec": round(pooled, 1),
+            "pool_workers":        args.workers,
+            "memory_mb_per_hash":  scrypt_memory_mb(method),
+        })
+
+    print(f"{'policy':<14} {'method':<24} {'ms/login':>9} {'logins/s/core':>14} "
+          f"{'pool logins/s':>14} {'MB/hash':>8}")
+    for row in rows:
+        memory = "-" if row["memory_mb_per_hash"] is None else row["memory_mb_per_hash"]
+        print(f"{row['policy']:<14} {row['method']:<24} {row['ms_per_login']:>9} "
+              f"{row['logins_per_sec_core']:>14} {row['pool_logins_per_sec']:>14} {memory:>8}")
+    print(f"(pool: {args.workers} processes, {concurrency} logins in flight)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+# The pool processes import this file again; only the parent may run main()
+if __name__ == "__main__":
+    main()
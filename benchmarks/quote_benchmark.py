@@ -0,0 +1,138 @@
+"""
+Quotes per second of the vectorized quote engine against a per-stay loop.
+
+Prices --rooms rooms (prices drawn from the room types of the sample data)
+for --ranges stays each, check-ins spread over the next year and stays of
+1 to --max-nights nights, with weekend, seasonal and length-of-stay rules
+active. Times QuoteEngine.quote_batch() on all of them at once, and a
+plain Python loop over the nights of each stay (what pricing per night one
+reservation at a time costs) on a --sample of them; the two must agree to
+the cent.
+
+Usage (from the project root):
+    python benchmarks/quote_benchmark.py
+    python benchmarks/quote_benchmark.py --rooms 10000 --ranges 30 --json quotes.json
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import sqlite_standin  # noqa: F401  (puts src/ on sys.path)
+from services.pricing_service import (  # noqa: E402
+    QuoteEngine,
+    parse_seasons,
+    parse_stay_discounts,
+)
+
+PRICES = (115.00, 125.00, 157.50, 225.00, 295.00)
+SEASONS = "06-15..09-15:1.25,12-20..01-02:1.10"
+STAY_DISCOUNTS = "7:0.10,14:0.15"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10000, help="rooms to quote (default: 10000)")
+    parser.add_argument("--ranges", type=int, default=30, help="stays quoted per room (default: 30)")
+    parser.add_argument("--max-nights", type=int, default=14, help="longest stay in nights (default: 14)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed batch runs, best is reported (default: 5)")
+    parser.add_argument("--sample", type=int, default=20000, help="stays priced by the loop (default: 20000)")
+    parser.add_argument("--seed", type=int, default=460)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    return parser.parse_args()
+
+def make_stays(rooms: int, ranges: int, max_nights: int, seed: int):
+    rng = np.random.default_rng(seed)
+    count = rooms * ranges
+    prices = np.repeat(rng.choice(PRICES, size=rooms), ranges)
+    check_ins = np.datetime64(date.today(), "D") + rng.integers(0, 365, size=count)
+    check_outs = check_ins + rng.integers(1, max_nights + 1, size=count)
+    return prices, check_ins, check_outs
+
+def loop_quote(engine: QuoteEngine, price: float, check_in: date, check_out: date):
+    """
+    One stay, one night at a time, with the same rules as the engine.
+    """
+    price_cents = round(price * 100)
+    subtotal = 0
+    day = check_in
+    while day < check_out:
+        multiplier = 1.0
+        if day.weekday() in engine.weekend_nights:
+            multiplier *= engine.weekend_multiplier
+        month_day = day.month * 100 + day.day
+        season = 1.0
+        for first, last, season_multiplier in engine.seasons:
+            inside = first <= month_day <= last if first <= last else (month_day >= first or month_day <= last)
+            if inside:
+                season = season_multiplier
+        multiplier *= season
+        subtotal += round(price_cents * multiplier)
+        day += timedelta(days=1)
+
+    nights = (check_out - check_in).days
+    rate = 0.0
+    for min_nights, discount_rate in engine.stay_discounts:
+        if nights >= min_nights:
+            rate = discount_rate
+    return (subtotal - round(subtotal * rate)) / 100
+
+def main():
+    args = parse_args()
+    engine = QuoteEngine()
+    engine.configure(
+        weekend_multiplier=1.15,
+        seasons=parse_seasons(SEASONS),
+        stay_discounts=parse_stay_discounts(STAY_DISCOUNTS),
+    )
+
+    prices, check_ins, check_outs = make_stays(args.rooms, args.ranges, args.max_nights, args.seed)
+    count = len(prices)
+
+    engine.quote_batch(prices[:100], check_ins[:100], check_outs[:100])  # warm up
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        batch = engine.quote_batch(prices, check_ins, check_outs)
+        timings.append(time.perf_counter() - started)
+    batch_seconds = min(timings)
+
+    sample = random.Random(args.seed).sample(range(count), min(args.sample, count))
+    stays = [(float(prices[i]), check_ins[i].item(), check_outs[i].item()) for i in sample]
+    started = time.perf_counter()
+    looped = [loop_quote(engine, *stay) for stay in stays]
+    loop_seconds = (time.perf_counter() - started) / len(stays) * count
+
+    mismatches = sum(1 for i, total in zip(sample, looped) if abs(batch.total[i] - total) > 0.005)
+
+    result = {
+        "stays":                count,
+        "rooms":                args.rooms,
+        "ranges_per_room":      args.ranges,
+        "nights_quoted":        int(batch.nights.sum()),
+        "batch_ms":             round(batch_seconds * 1000, 1),
+        "batch_quotes_per_sec": round(count / batch_seconds),
+        "loop_ms":              round(loop_seconds * 1000, 1),
+        "loop_quotes_per_sec":  round(count / loop_seconds),
+        "speedup":              round(loop_seconds / batch_seconds, 1),
+        "checked":              len(stays),
+        "mismatches":           mismatches,
+    }
+
+    print(f"{count} stays ({args.rooms} rooms x {args.ranges} ranges, {result['nights_quoted']} nights)")
+    print(f"  vectorized: {result['batch_ms']:>9} ms  {result['batch_quotes_per_sec']:>12} quotes/s")
+    print(f"  per-stay:   {result['loop_ms']:>9} ms  {result['loop_quotes_per_sec']:>12} quotes/s "
+          f"(extrapolated from {len(stays)})")
+    print(f"  speedup x{result['speedup']}, {mismatches} mismatches in {len(stays)} checked")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Helpers to run the app against a throwaway SQLite database instead of MySQL.
+Shared by the scripts in this folder.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from config import Config  # noqa: E402
+
+# detect_types turns DATE/TIMESTAMP columns into date/datetime objects like PyMySQL does
+SQLITE_ENGINE_OPTIONS = {
+    "connect_args": {
+        "timeout": 30,
+        "check_same_thread": False,
+        "detect_types": sqlite3.PARSE_DECLTYPES,
+    },
+}
+
+
+def load_sample_data(con):
+    """
+    Replays the INSERT statements of db/data.sql (MySQL dialect) on SQLite.
+    """
+    with open(os.path.join(ROOT, "db", "data.sql"), encoding="utf-8") as f:
+        data = f.read()
+    for statement in re.findall(r"^INSERT INTO .*?;\s*$", data, re.S | re.M):
+        statement = re.sub(r"^\s*--.*$", "", statement, flags=re.M)
+        statement = statement.replace("NOW()", "CURRENT_TIMESTAMP").replace("\\n", "\n")
+        con.executescript(statement)
+
+def create_sqlite_database(path: str | None = None, sample_data: bool = True):
+    """
+    Creates a SQLite database from db/schema_sqlite.sql (optionally filled with
+    db/data.sql) and returns its path. A temporary file is used if path is None.
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="moffat_", suffix=".db")
+        os.close(fd)
+        os.remove(path)
+
+    con = sqlite3.connect(path)
+    with open(os.path.join(ROOT, "db", "schema_sqlite.sql"), encoding="utf-8") as f:
+        con.executescript(f.read())
+    con.execute("PRAGMA journal_mode = WAL")
+    if sample_data:
+        load_sample_data(con)
+    con.commit()
+    con.close()
+    return path
+
+def remove_sqlite_database(path: str):
+    """
+    Deletes a database made by create_sqlite_database, including WAL side files.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def sqlite_config(path: str, **overrides):
+    """
+    Returns a Config subclass pointing at the SQLite database at `path`.
+    """
+    attrs = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {**Config.SQLALCHEMY_ENGINE_OPTIONS, **SQLITE_ENGINE_OPTIONS},
+        **overrides,
+    }
+    return type("SQLiteStandInConfig", (Config,), attrs)
@@ -12,6 +12,8 @@ SET FOREIGN_KEY_CHECKS = 0;
 
 -- 2) Clear tables
 TRUNCATE TABLE auditlog;
+TRUNCATE TABLE occupancyrollup;
+TRUNCATE TABLE roomnight;
 TRUNCATE TABLE reservation;
 TRUNCATE TABLE roomamenity;
 TRUNCATE TABLE room;
@@ -97,6 +99,22 @@ INSERT INTO reservation (ReservationID, CustomerID, RoomID, CheckInDate, CheckOu
 (1003, 3, 301, '2025-09-29', '2025-10-02', 3, 'Confirmed', NOW()),
 (1004, 1, 103, '2025-10-14', '2025-10-16', 2, 'Cancelled', NOW());
 
+-- =========================
+-- Room Nights (one row per night held by a Confirmed reservation)
+-- =========================
+INSERT INTO roomnight (RoomID, StayDate, ReservationID, RoomTypeID, Revenue) VALUES
+(201, '2025-09-06', 1001, 3, 168.00), (201, '2025-09-07', 1001, 3, 168.00), (201, '2025-09-08', 1001, 3, 168.00),
+(101, '2025-09-02', 1002, 1, 141.75), (101, '2025-09-03', 1002, 1, 141.75),
+(301, '2025-09-29', 1003, 4, 157.50), (301, '2025-09-30', 1003, 4, 157.50), (301, '2025-10-01', 1003, 4, 157.50);
+
+-- =========================
+-- Occupancy rollup (the nights above per night and room type)
+-- =========================
+INSERT INTO occupancyrollup (StayDate, RoomTypeID, NightsSold, Guests, Revenue) VALUES
+('2025-09-02', 1, 1, 2, 141.75), ('2025-09-03', 1, 1, 2, 141.75),
+('2025-09-06', 3, 1, 2, 168.00), ('2025-09-07', 3, 1, 2, 168.00), ('2025-09-08', 3, 1, 2, 168.00),
+('2025-09-29', 4, 1, 3, 157.50), ('2025-09-30', 4, 1, 3, 157.50), ('2025-10-01', 4, 1, 3, 157.50);
+
 -- =========================
 -- Audit Log
 -- =========================
@@ -14,7 +14,7 @@ CREATE TABLE `customer` (
   `CustomerID` int(11) NOT NULL AUTO_INCREMENT,
   `FirstName` varchar(50) NOT NULL,
   `LastName` varchar(50) NOT NULL,
-  `Email` varchar(100) NOT NULL UNIQUE,
+  `Email` varchar(100) NOT NULL UNIQUE, -- stored trimmed + lowercase (see normalize_email)
   `Phone` varchar(20) DEFAULT NULL,
   `PasswordHash` varchar(255) NOT NULL,
   `RegistrationDate` datetime DEFAULT current_timestamp(),
@@ -83,25 +83,88 @@ CREATE TABLE `reservation` (
   `ReservationStatus` enum('Pending','Confirmed','Cancelled') DEFAULT 'Pending',
   `DateReserved` datetime DEFAULT current_timestamp(),
   PRIMARY KEY (`ReservationID`),
-  KEY `CustomerID` (`CustomerID`),
+  -- Serves the reservation lookup: equality on CustomerID, then keyset
+  -- pagination newest-first on (DateReserved, ReservationID)
+  KEY `CustomerID_DateReserved` (`CustomerID`,`DateReserved`,`ReservationID`),
+  KEY `DateReserved` (`DateReserved`,`ReservationID`),
   KEY `RoomID` (`RoomID`),
   CONSTRAINT `reservation_ibfk_1` FOREIGN KEY (`CustomerID`) REFERENCES `customer` (`CustomerID`),
   CONSTRAINT `reservation_ibfk_2` FOREIGN KEY (`RoomID`) REFERENCES `room` (`RoomID`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- --------------------------------------------------------
+-- Table structure for table `roomnight`
+-- One row per booked room night. The primary key makes it impossible
+-- for two reservations to hold the same room on the same night, even
+-- when they are confirmed concurrently. A database that had reservations
+-- before this table existed needs `flask reservations backfill-nights`
+-- once, or its confirmed stays won't block new bookings.
+-- RoomTypeID and Revenue record the room type and what the night earns
+-- (quoted at booking), for occupancyrollup; NULL only on rows stored
+-- before they existed, until `flask reservations backfill-nights` runs.
+-- --------------------------------------------------------
+CREATE TABLE `roomnight` (
+  `RoomID` int(11) NOT NULL,
+  `StayDate` date NOT NULL,
+  `ReservationID` int(11) NOT NULL,
+  `RoomTypeID` int(11) DEFAULT NULL,
+  `Revenue` decimal(10,2) DEFAULT NULL,
+  PRIMARY KEY (`RoomID`,`StayDate`),
+  KEY `ReservationID` (`ReservationID`),
+  CONSTRAINT `roomnight_ibfk_1` FOREIGN KEY (`RoomID`) REFERENCES `room` (`RoomID`),
+  CONSTRAINT `roomnight_ibfk_2` FOREIGN KEY (`ReservationID`) REFERENCES `reservation` (`ReservationID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- --------------------------------------------------------
+-- Table structure for table `occupancyrollup`
+-- Rooms sold, guests and revenue per night and room type, for the
+-- occupancy/revenue reports. Maintained by confirm_reservation() and
+-- set_reservation_status(); rebuilt from roomnight with `flask reports rebuild`.
+-- --------------------------------------------------------
+CREATE TABLE `occupancyrollup` (
+  `StayDate` date NOT NULL,
+  `RoomTypeID` int(11) NOT NULL,
+  `NightsSold` int(11) NOT NULL DEFAULT 0,
+  `Guests` int(11) NOT NULL DEFAULT 0,
+  `Revenue` decimal(12,2) NOT NULL DEFAULT 0.00,
+  PRIMARY KEY (`StayDate`,`RoomTypeID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- --------------------------------------------------------
 -- Table structure for table `auditlog`
+-- Partitioned by month on Timestamp (see services/audit_retention_service.py):
+-- time-range queries only read the months they cover, and old months are
+-- archived with `flask audit archive` and dropped as whole partitions.
+-- `flask audit roll` splits pfuture into the coming months. Partitioned
+-- InnoDB tables can't have foreign keys, and every unique key must contain
+-- the partitioning column, hence no FK on CustomerID and the two-column key.
 -- --------------------------------------------------------
 CREATE TABLE `auditlog` (
   `AuditLogID` int(11) NOT NULL AUTO_INCREMENT,
   `CustomerID` int(11) DEFAULT NULL,
   `Action` varchar(50) NOT NULL,
   `Description` text DEFAULT NULL,
-  `Timestamp` datetime DEFAULT current_timestamp(),
-  PRIMARY KEY (`AuditLogID`),
-  KEY `CustomerID` (`CustomerID`),
-  CONSTRAINT `auditlog_ibfk_1` FOREIGN KEY (`CustomerID`) REFERENCES `customer` (`CustomerID`)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+  `Timestamp` datetime NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`AuditLogID`,`Timestamp`),
+  KEY `CustomerID` (`CustomerID`,`Timestamp`),
+  KEY `Timestamp` (`Timestamp`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE COLUMNS (`Timestamp`) (
+  PARTITION `p_history` VALUES LESS THAN ('2026-01-01 00:00:00'),
+  PARTITION `p202601` VALUES LESS THAN ('2026-02-01 00:00:00'),
+  PARTITION `p202602` VALUES LESS THAN ('2026-03-01 00:00:00'),
+  PARTITION `p202603` VALUES LESS THAN ('2026-04-01 00:00:00'),
+  PARTITION `p202604` VALUES LESS THAN ('2026-05-01 00:00:00'),
+  PARTITION `p202605` VALUES LESS THAN ('2026-06-01 00:00:00'),
+  PARTITION `p202606` VALUES LESS THAN ('2026-07-01 00:00:00'),
+  PARTITION `p202607` VALUES LESS THAN ('2026-08-01 00:00:00'),
+  PARTITION `p202608` VALUES LESS THAN ('2026-09-01 00:00:00'),
+  PARTITION `p202609` VALUES LESS THAN ('2026-10-01 00:00:00'),
+  PARTITION `p202610` VALUES LESS THAN ('2026-11-01 00:00:00'),
+  PARTITION `p202611` VALUES LESS THAN ('2026-12-01 00:00:00'),
+  PARTITION `p202612` VALUES LESS THAN ('2027-01-01 00:00:00'),
+  PARTITION `pfuture` VALUES LESS THAN (MAXVALUE)
+);
 
 -- ------------------------------------------------------------
 -- Table structure for table 'team_member'
@@ -0,0 +1,124 @@
+-- =========================================================
+-- Moffat Bay – SQLite schema (local stand-in for MySQL)
+-- Mirrors schema.sql table-for-table so the app, load tests and
+-- benchmarks can run without a MySQL server:
+--   sqlite3 moffat_bay.db < db/schema_sqlite.sql
+-- =========================================================
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE customer (
+  CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
+  FirstName VARCHAR(50) NOT NULL,
+  LastName VARCHAR(50) NOT NULL,
+  Email VARCHAR(100) NOT NULL UNIQUE, -- stored trimmed + lowercase
+  Phone VARCHAR(20) DEFAULT NULL,
+  PasswordHash VARCHAR(255) NOT NULL,
+  RegistrationDate DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE roomtype (
+  RoomTypeID INTEGER PRIMARY KEY AUTOINCREMENT,
+  TypeName VARCHAR(50) NOT NULL UNIQUE,
+  BedConfiguration VARCHAR(50) DEFAULT NULL,
+  PricePerNight DECIMAL(8,2) NOT NULL,
+  MaxOccupancy INTEGER NOT NULL
+);
+
+CREATE TABLE amenity (
+  AmenityID INTEGER PRIMARY KEY AUTOINCREMENT,
+  Name VARCHAR(50) NOT NULL UNIQUE,
+  Description TEXT DEFAULT NULL
+);
+
+CREATE TABLE room (
+  RoomID INTEGER PRIMARY KEY AUTOINCREMENT,
+  RoomNumber VARCHAR(10) NOT NULL UNIQUE,
+  RoomTypeID INTEGER NOT NULL REFERENCES roomtype (RoomTypeID),
+  ADAAccessible TINYINT DEFAULT 0,
+  Description TEXT DEFAULT NULL,
+  ImagePath VARCHAR(255) DEFAULT NULL
+);
+CREATE INDEX room_RoomTypeID ON room (RoomTypeID);
+
+CREATE TABLE roomamenity (
+  RoomID INTEGER NOT NULL REFERENCES room (RoomID),
+  AmenityID INTEGER NOT NULL REFERENCES amenity (AmenityID),
+  PRIMARY KEY (RoomID, AmenityID)
+);
+CREATE INDEX roomamenity_AmenityID ON roomamenity (AmenityID);
+
+CREATE TABLE reservation (
+  ReservationID INTEGER PRIMARY KEY AUTOINCREMENT,
+  CustomerID INTEGER NOT NULL REFERENCES customer (CustomerID),
+  RoomID INTEGER NOT NULL REFERENCES room (RoomID),
+  CheckInDate DATE NOT NULL,
+  CheckOutDate DATE NOT NULL,
+  NumberOfGuests INTEGER NOT NULL,
+  ReservationStatus VARCHAR(10) DEFAULT 'Pending'
+    CHECK (ReservationStatus IN ('Pending', 'Confirmed', 'Cancelled')),
+  DateReserved DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX reservation_CustomerID_DateReserved ON reservation (CustomerID, DateReserved, ReservationID);
+CREATE INDEX reservation_DateReserved ON reservation (DateReserved, ReservationID);
+CREATE INDEX reservation_RoomID ON reservation (RoomID);
+
+CREATE TABLE roomnight (
+  RoomID INTEGER NOT NULL REFERENCES room (RoomID),
+  StayDate DATE NOT NULL,
+  ReservationID INTEGER NOT NULL REFERENCES reservation (ReservationID),
+  RoomTypeID INTEGER DEFAULT NULL,
+  Revenue DECIMAL(10,2) DEFAULT NULL,
+  PRIMARY KEY (RoomID, StayDate)
+);
+CREATE INDEX roomnight_ReservationID ON roomnight (ReservationID);
+
+CREATE TABLE occupancyrollup (
+  StayDate DATE NOT NULL,
+  RoomTypeID INTEGER NOT NULL,
+  NightsSold INTEGER NOT NULL DEFAULT 0,
+  Guests INTEGER NOT NULL DEFAULT 0,
+  Revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (StayDate, RoomTypeID)
+);
+
+-- No partitioning in SQLite: `flask audit roll` renames this table to
+-- auditlog_YYYYMM when a month ends and starts a new one
+CREATE TABLE auditlog (
+  AuditLogID INTEGER PRIMARY KEY AUTOINCREMENT,
+  CustomerID INTEGER DEFAULT NULL REFERENCES customer (CustomerID),
+  Action VARCHAR(50) NOT NULL,
+  Description TEXT DEFAULT NULL,
+  Timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX auditlog_CustomerID ON auditlog (CustomerID, Timestamp);
+CREATE INDEX auditlog_Timestamp ON auditlog (Timestamp);
+
+CREATE TABLE team_member (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  first_name VARCHAR(50) NOT NULL,
+  middle_name VARCHAR(50),
+  last_name VARCHAR(50) NOT NULL,
+  role VARCHAR(100) NOT NULL,
+  bio TEXT,
+  fun_fact TEXT,
+  linkedin_url VARCHAR(255),
+  github_url VARCHAR(255),
+  email VARCHAR(100),
+  profile_image VARCHAR(255)
+);
+
+CREATE TABLE team_member_contribution (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  team_member_id INTEGER NOT NULL REFERENCES team_member (id),
+  contribution TEXT NOT NULL
+);
+
+CREATE TABLE team_message (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  team_member_id INTEGER NOT NULL REFERENCES team_member (id),
+  sender_name VARCHAR(100) NOT NULL,
+  sender_email VARCHAR(100) NOT NULL,
+  message TEXT NOT NULL,
+  sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
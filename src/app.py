@@ -9,11 +9,13 @@ from dotenv import (
 from extensions import db, csrf  # Imports database object and csrf token instance
 
 
-def create_app():
+def create_app(config_object=Config):
     """
     This function builds and sets up the Flask app.
     It loads settings, connects the database, and adds routes.
     Then it gives back the ready-to-use app.
+    config_object lets scripts (load tests, benchmarks) swap in their own
+    settings, e.g. a Config subclass pointing at a local SQLite database.
     """
 
     # Loads environment variables from the .env file so they can be used in Config
@@ -27,24 +29,98 @@ def create_app():
     )
 
     # Load configuration values from our Config class
-    app.config.from_object(Config)
+    app.config.from_object(config_object)
+
+    # Picks the pool class for the engine options (see pool_telemetry.py)
+    from pool_telemetry import configure_pool, init_pool_telemetry
+
+    configure_pool(app)
 
     # Initializes SQLAlchemy from extensions with our Flask app
     db.init_app(app)
 
+    # Records checkouts, wait times, overflow and invalidations of the pool
+    init_pool_telemetry(app)
+
+    # Per-request SQL stats (Server-Timing), slow-query log and N+1 warnings
+    from sql_instrumentation import init_sql_instrumentation
+
+    init_sql_instrumentation(app)
+
+    # Keeps session data server-side; the cookie only holds its id (see session_store.py)
+    from session_store import init_sessions
+
+    init_sessions(app)
+
     # Enables CSRF for all POST/PUT/DELETE
     csrf.init_app(app)
 
+    # Request count / latency / size metrics for /metrics (see metrics.py)
+    from metrics import init_metrics
+
+    init_metrics(app)
+
+    # Background writer for the audit log (see services/audit_service.py)
+    from services.audit_service import init_audit_log
+
+    init_audit_log(app)
+
+    # Password hashing policy and process pool (see services/password_service.py)
+    from services.password_service import init_password_hashing
+
+    init_password_hashing(app)
+
+    # Per-night rate rules for quotes (see services/pricing_service.py)
+    from services.pricing_service import init_pricing
+
+    init_pricing(app)
+
+    # Computes the build id used in page ETags (see http_cache.py)
+    from http_cache import init_http_cache
+
+    init_http_cache(app)
+
+    # Rendered page cache with per-user holes (see page_cache.py)
+    from page_cache import init_page_cache
+
+    init_page_cache(app)
+
     # Registers all the routes
     from routes import register_routes
 
     register_routes(app)
 
+    # Loads the room catalog snapshot up front (rooms, types, amenities)
+    from services.catalog_service import init_catalog
+
+    init_catalog(app)
+
+    # Makes responsive_img() available in templates (reads the image manifest)
+    from assets.images import init_images
+
+    init_images(app)
+
+    # Serves fingerprinted CSS/JS (asset_url_for) with immutable caching and gzip
+    from assets.static_files import init_static_assets
+
+    init_static_assets(app)
+
+    # On-disk template bytecode cache and precompiling (see template_cache.py)
+    from template_cache import init_template_cache
+
+    init_template_cache(app)
+
+    # Registers the flask CLI commands (e.g. flask images build)
+    from commands import register_commands
+
+    register_commands(app)
+
     return app
 
 
 # Allows running with: python app.py
 # debug=True gives detailed error messages and auto-reloads when code changes
+# (development only; production runs wsgi.py under gunicorn, see gunicorn.conf.py)
 if __name__ == "__main__":
     app = create_app()  # builds the app
     app.run(debug=True)  # runs the app
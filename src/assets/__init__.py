@@ -0,0 +1 @@
+# Build-time asset pipelines (images, CSS/JS) and the template helpers that read their manifests.
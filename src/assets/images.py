@@ -0,0 +1,220 @@
+"""
+Responsive image pipeline.
+
+`flask images build` reads every JPEG/PNG under static/images, writes resized
+WebP + JPEG (or PNG, for images with transparency) variants at several widths
+into static/build/images with content-hashed file names, and records them in
+static/build/images/manifest.json. The `responsive_img()` template helper turns
+that manifest into <picture>/srcset markup with lazy loading.
+
+Pillow is only needed to *build* the variants; serving pages works without it.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from markupsafe import Markup, escape
+from flask import current_app, url_for
+
+SOURCE_DIR = "images"
+OUTPUT_DIR = os.path.join("build", "images")
+MANIFEST_NAME = "manifest.json"
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+DEFAULT_WIDTHS = (400, 800, 1200, 1600)
+DEFAULT_QUALITY = 80
+
+
+def _file_hash(path: str):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:10]
+
+def find_source_images(static_folder: str):
+    """
+    Returns every source image as a path relative to the static folder
+    (e.g. "images/attractions/kayak1.jpg"), sorted.
+    """
+    root = os.path.join(static_folder, SOURCE_DIR)
+    found = []
+    for folder, _dirs, files in os.walk(root):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(folder, name), static_folder).replace(os.sep, "/"))
+    return sorted(found)
+
+def build_variants(static_folder: str, rel_path: str, source_hash: str, widths, quality: int):
+    """
+    Writes every variant of one source image. Returns its manifest entry.
+    Runs in a worker process, so it only takes plain arguments.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(os.path.join(static_folder, rel_path)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    fallback_format = "png" if has_alpha else "jpeg"
+
+    # Never upscale; the original width is the last variant if it's smaller than the largest target
+    targets = sorted({w for w in widths if w < image.width} | {min(image.width, max(widths))})
+
+    stem = os.path.splitext(rel_path[len(SOURCE_DIR) + 1:])[0]
+    variants = {"webp": [], fallback_format: []}
+
+    for width in targets:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+        for fmt in variants:
+            ext = "jpg" if fmt == "jpeg" else fmt
+            out_rel = f"{OUTPUT_DIR}/{stem}-{width}w.{source_hash}.{ext}".replace(os.sep, "/")
+            out_path = os.path.join(static_folder, out_rel)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+            if fmt == "webp":
+                resized.save(out_path, "WEBP", quality=quality, method=4)
+            elif fmt == "jpeg":
+                resized.save(out_path, "JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                resized.save(out_path, "PNG", optimize=True)
+
+            variants[fmt].append({"width": width, "path": out_rel, "bytes": os.path.getsize(out_path)})
+
+    largest = targets[-1]
+    return {
+        "hash":     source_hash,
+        "width":    largest,
+        "height":   round(image.height * largest / image.width),
+        "fallback": fallback_format,
+        "variants": variants,
+    }
+
+def build_images(static_folder: str, widths=DEFAULT_WIDTHS, quality: int = DEFAULT_QUALITY,
+                 jobs: int | None = None, force: bool = False, log=print):
+    """
+    Builds variants for every source image whose content changed since the last
+    build (or all of them with force=True), writes the manifest and deletes
+    variants that no longer belong to any source. Returns a summary dict.
+    """
+    output_root = os.path.join(static_folder, OUTPUT_DIR)
+    manifest_path = os.path.join(output_root, MANIFEST_NAME)
+    widths = tuple(sorted(set(int(w) for w in widths)))
+
+    previous = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            previous = json.load(f)
+
+    def is_current(entry, source_hash):
+        return (
+            entry and entry["hash"] == source_hash and entry.get("widths") == list(widths)
+            and entry.get("quality") == quality
+            and all(os.path.exists(os.path.join(static_folder, v["path"]))
+                    for items in entry["variants"].values() for v in items)
+        )
+
+    manifest, pending = {}, {}
+    for rel_path in find_source_images(static_folder):
+        source_hash = _file_hash(os.path.join(static_folder, rel_path))
+        if is_current(previous.get(rel_path), source_hash):
+            manifest[rel_path] = previous[rel_path]
+        else:
+            pending[rel_path] = source_hash
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            rel_path: pool.submit(build_variants, static_folder, rel_path, source_hash, widths, quality)
+            for rel_path, source_hash in pending.items()
+        }
+        for rel_path, future in futures.items():
+            entry = future.result()
+            entry.update({"widths": list(widths), "quality": quality})
+            manifest[rel_path] = entry
+            log(f"  built {rel_path} ({sum(len(v) for v in entry['variants'].values())} variants)")
+
+    os.makedirs(output_root, exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+
+    # Removes variants left over from older versions of the sources
+    keep = {os.path.normpath(os.path.join(static_folder, v["path"]))
+            for entry in manifest.values() for items in entry["variants"].values() for v in items}
+    removed = 0
+    for folder, _dirs, files in os.walk(output_root):
+        for name in files:
+            path = os.path.normpath(os.path.join(folder, name))
+            if name != MANIFEST_NAME and path not in keep:
+                os.remove(path)
+                removed += 1
+
+    source_bytes = sum(os.path.getsize(os.path.join(static_folder, p)) for p in manifest)
+    output_bytes = sum(v["bytes"] for entry in manifest.values() for items in entry["variants"].values() for v in items)
+    largest_webp_bytes = sum(entry["variants"]["webp"][-1]["bytes"] for entry in manifest.values())
+    return {
+        "images":       len(manifest),
+        "built":        len(pending),
+        "reused":       len(manifest) - len(pending),
+        "removed":      removed,
+        "source_bytes": source_bytes,
+        "output_bytes": output_bytes,
+        "largest_webp_bytes": largest_webp_bytes,
+    }
+
+
+# -----------------
+# Template helper
+# -----------------
+
+def load_image_manifest(app):
+    """
+    Reads the image manifest into app.extensions (empty if the pipeline hasn't run).
+    """
+    path = os.path.join(app.static_folder, OUTPUT_DIR, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+    app.extensions["image_manifest"] = manifest
+    return manifest
+
+def _srcset(items):
+    return ", ".join(f"{url_for('static', filename=v['path'])} {v['width']}w" for v in items)
+
+def responsive_img(path: str, alt: str = "", sizes: str = "100vw", loading: str = "lazy", **attrs):
+    """
+    Renders a <picture> with WebP and JPEG/PNG srcsets for a source image such as
+    "images/Island.jpg". Falls back to a plain lazy <img> of the original file
+    when the image isn't in the manifest (e.g. the pipeline hasn't been run).
+    Extra keyword arguments become <img> attributes (class_ -> class).
+    """
+    entry = current_app.extensions.get("image_manifest", {}).get(path)
+
+    img_attrs = {"alt": alt, "loading": loading, "decoding": "async"}
+    img_attrs.update({key.rstrip("_").replace("_", "-"): value for key, value in attrs.items()})
+
+    if not entry:
+        img_attrs["src"] = url_for("static", filename=path)
+        return Markup(f"<img {_attributes(img_attrs)}>")
+
+    fallback = entry["variants"][entry["fallback"]]
+    img_attrs.update({
+        "src":    url_for("static", filename=fallback[-1]["path"]),
+        "srcset": _srcset(fallback),
+        "sizes":  sizes,
+        "width":  entry["width"],
+        "height": entry["height"],
+    })
+    webp_source = f'<source type="image/webp" srcset="{escape(_srcset(entry["variants"]["webp"]))}" sizes="{escape(sizes)}">'
+    return Markup(f"<picture>{webp_source}<img {_attributes(img_attrs)}></picture>")
+
+def _attributes(attrs: dict):
+    return " ".join(f'{key}="{escape(value)}"' for key, value in attrs.items() if value is not None)
+
+def init_images(app):
+    load_image_manifest(app)
+    app.jinja_env.globals["responsive_img"] = responsive_img
@@ -0,0 +1,178 @@
+"""
+Fingerprinted, precompressed CSS/JS.
+
+`flask assets build` copies style.css, css/*.css and js/*.js to
+static/build/assets under content-hashed names (style.3f9c2a71d0.css), writes
+a gzip variant next to each and records both in static/build/assets/manifest.json.
+Files are copied as-is: relative url() references in CSS are not rewritten.
+
+Templates link them with `asset_url_for('static', filename='style.css')`, a
+drop-in for url_for that swaps in the hashed name. Everything under
+static/build has a hash in its name, so the static handler serves it with a
+one-year immutable Cache-Control, and sends the .gz file when the client
+accepts gzip. The manifests are only read by the app and are not served.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from flask import abort, current_app, request, send_from_directory, url_for
+
+TEXT_ASSET_PATTERNS = ("style.css", "css/*.css", "js/*.js")
+BUILD_DIR = "build"
+OUTPUT_DIR = os.path.join(BUILD_DIR, "assets")
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _content_hash(data: bytes):
+    return hashlib.sha1(data).hexdigest()[:10]
+
+def find_text_assets(static_folder: str):
+    """
+    Returns the CSS/JS files to fingerprint, relative to the static folder.
+    """
+    found = set()
+    for pattern in TEXT_ASSET_PATTERNS:
+        for path in glob.glob(os.path.join(static_folder, pattern)):
+            found.add(os.path.relpath(path, static_folder).replace(os.sep, "/"))
+    return sorted(found)
+
+def build_text_assets(static_folder: str, log=print):
+    """
+    Writes the hashed copy and gzip variant of every text asset, the manifest,
+    and deletes outputs of older builds. Returns a summary dict.
+    """
+    output_root = os.path.join(static_folder, OUTPUT_DIR)
+    manifest = {}
+
+    for rel_path in find_text_assets(static_folder):
+        with open(os.path.join(static_folder, rel_path), "rb") as f:
+            data = f.read()
+        content_hash = _content_hash(data)
+        stem, ext = os.path.splitext(rel_path)
+        out_rel = f"{OUTPUT_DIR}/{stem}.{content_hash}{ext}".replace(os.sep, "/")
+        out_path = os.path.join(static_folder, out_rel)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+        if not os.path.exists(out_path):
+            with open(out_path, "wb") as f:
+                f.write(data)
+
+        # mtime=0 keeps the .gz byte-identical across builds of the same content
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        gzip_bytes = None
+        if len(compressed) < len(data):
+            with open(out_path + ".gz", "wb") as f:
+                f.write(compressed)
+            gzip_bytes = len(compressed)
+
+        manifest[rel_path] = {"hash": content_hash, "path": out_rel, "bytes": len(data), "gzip_bytes": gzip_bytes}
+        log(f"  {rel_path} -> {out_rel} ({len(data)} B, gzip {gzip_bytes or '-'} B)")
+
+    os.makedirs(output_root, exist_ok=True)
+    with open(os.path.join(output_root, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    keep = set()
+    for entry in manifest.values():
+        path = os.path.normpath(os.path.join(static_folder, entry["path"]))
+        keep.add(path)
+        if entry["gzip_bytes"]:
+            keep.add(path + ".gz")
+    removed = 0
+    for folder, _dirs, files in os.walk(output_root):
+        for name in files:
+            path = os.path.normpath(os.path.join(folder, name))
+            if name != MANIFEST_NAME and path not in keep:
+                os.remove(path)
+                removed += 1
+
+    return {
+        "assets":     len(manifest),
+        "removed":    removed,
+        "bytes":      sum(e["bytes"] for e in manifest.values()),
+        "gzip_bytes": sum(e["gzip_bytes"] or e["bytes"] for e in manifest.values()),
+    }
+
+
+# -----------------
+# Runtime
+# -----------------
+
+def load_asset_manifest(app):
+    """
+    Reads the manifest into app.extensions. Entries whose source file has
+    changed since the build are dropped, so an edited style.css is served
+    directly (uncached) instead of a stale hashed copy.
+    """
+    path = os.path.join(app.static_folder, OUTPUT_DIR, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+
+    current = {}
+    for rel_path, entry in manifest.items():
+        source = os.path.join(app.static_folder, rel_path)
+        if os.path.exists(source):
+            with open(source, "rb") as f:
+                if _content_hash(f.read()) == entry["hash"]:
+                    current[rel_path] = entry
+
+    app.extensions["asset_manifest"] = current
+    app.extensions["precompressed_assets"] = {e["path"] for e in current.values() if e["gzip_bytes"]}
+    return current
+
+def asset_url_for(endpoint: str, **values):
+    """
+    url_for() that points static files at their fingerprinted build output:
+    CSS/JS from the asset manifest, images from the image manifest (largest
+    JPEG/PNG variant). Anything not built falls back to the original file.
+    """
+    if endpoint == "static" and "filename" in values:
+        filename = values["filename"]
+        entry = current_app.extensions.get("asset_manifest", {}).get(filename)
+        if entry:
+            values["filename"] = entry["path"]
+        else:
+            image = current_app.extensions.get("image_manifest", {}).get(filename)
+            if image:
+                values["filename"] = image["variants"][image["fallback"]][-1]["path"]
+    return url_for(endpoint, **values)
+
+def send_static(filename: str):
+    """
+    Replaces Flask's static view. Hashed build outputs get an immutable
+    Cache-Control and, when accepted, their precompressed .gz variant.
+    Other files behave exactly like the default handler. The build
+    manifests have no hash in their name and are not served (404).
+    """
+    app = current_app
+    if not filename.startswith(BUILD_DIR + "/"):
+        return app.send_static_file(filename)
+    if os.path.basename(filename) == MANIFEST_NAME:
+        abort(404)
+
+    precompressed = filename in app.extensions.get("precompressed_assets", ())
+    if precompressed and request.accept_encodings["gzip"]:
+        response = send_from_directory(
+            app.static_folder, filename + ".gz",
+            mimetype=mimetypes.guess_type(filename)[0], max_age=IMMUTABLE_MAX_AGE,
+        )
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = send_from_directory(app.static_folder, filename, max_age=IMMUTABLE_MAX_AGE)
+
+    if precompressed:
+        response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return response
+
+def init_static_assets(app):
+    load_asset_manifest(app)
+    app.jinja_env.globals["asset_url_for"] = asset_url_for
+    app.view_functions["static"] = send_static
@@ -0,0 +1,359 @@
+"""
+Flask CLI commands. Run them from src/ with:
+    flask --app app <group> <command> [options]
+"""
+
+import os
+import time
+from datetime import date, datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from assets.images import DEFAULT_QUALITY, DEFAULT_WIDTHS, build_images, load_image_manifest
+from assets.static_files import build_text_assets, load_asset_manifest
+from seeding import SCALES, seed_database
+from template_cache import enable_bytecode_cache, get_template_stats, precompile_templates
+from services.audit_retention_service import (
+    AuditLogError,
+    archive_audit_log,
+    list_audit_segments,
+    roll_audit_log,
+)
+from services.auth_service import normalize_stored_emails
+from services.reporting_service import ReportError, parse_report_date, rebuild_occupancy_rollup
+from services.reservations_service import (
+    RESERVATION_STATUSES,
+    ReservationNotFoundError,
+    RoomUnavailableError,
+    backfill_room_nights,
+    set_reservation_status,
+)
+from services.export_service import (
+    EXPORT_FORMATS,
+    MAX_BATCH_SIZE,
+    ExportFilterError,
+    ExportStats,
+    export_reservations,
+    parse_export_filters,
+)
+
+
+# -----------------
+# Images
+# -----------------
+
+images_cli = AppGroup("images", help="Build responsive image variants.")
+
+@images_cli.command("build")
+@click.option("--widths", default=",".join(str(w) for w in DEFAULT_WIDTHS), show_default=True,
+              help="Comma-separated target widths in pixels.")
+@click.option("--quality", default=DEFAULT_QUALITY, show_default=True, type=click.IntRange(1, 100),
+              help="WebP/JPEG quality.")
+@click.option("--jobs", default=None, type=int, help="Worker processes (default: one per CPU).")
+@click.option("--force", is_flag=True, help="Rebuild every image, even unchanged ones.")
+def build_images_command(widths, quality, jobs, force):
+    """Writes WebP + JPEG variants to static/build/images and the manifest."""
+    try:
+        width_list = [int(w) for w in widths.split(",") if w.strip()]
+    except ValueError:
+        raise click.BadParameter("widths must be comma-separated integers", param_hint="--widths")
+    if not width_list:
+        raise click.BadParameter("at least one width is required", param_hint="--widths")
+    if any(w <= 0 for w in width_list):
+        raise click.BadParameter("widths must be positive", param_hint="--widths")
+
+    summary = build_images(
+        current_app.static_folder, widths=width_list, quality=quality, jobs=jobs, force=force, log=click.echo,
+    )
+    load_image_manifest(current_app)
+
+    saved = 1 - summary["largest_webp_bytes"] / max(summary["source_bytes"], 1)
+    click.echo(
+        f"{summary['images']} images: {summary['built']} built, {summary['reused']} unchanged, "
+        f"{summary['removed']} stale files removed"
+    )
+    click.echo(
+        f"sources {summary['source_bytes'] / 1e6:.1f} MB, largest WebP variants "
+        f"{summary['largest_webp_bytes'] / 1e6:.1f} MB ({saved:.0%} smaller), "
+        f"all variants on disk {summary['output_bytes'] / 1e6:.1f} MB"
+    )
+
+
+# -----------------
+# CSS / JS
+# -----------------
+
+assets_cli = AppGroup("assets", help="Build fingerprinted, precompressed CSS/JS.")
+
+@assets_cli.command("build")
+def build_assets_command():
+    """Writes hashed + gzipped copies of style.css, css/ and js/ to static/build/assets."""
+    summary = build_text_assets(current_app.static_folder, log=click.echo)
+    load_asset_manifest(current_app)
+
+    click.echo(
+        f"{summary['assets']} assets, {summary['removed']} stale files removed; "
+        f"{summary['bytes'] / 1e3:.1f} kB -> {summary['gzip_bytes'] / 1e3:.1f} kB gzipped"
+    )
+
+
+# -----------------
+# Templates
+# -----------------
+
+templates_cli = AppGroup("templates", help="Precompile Jinja templates.")
+
+@templates_cli.command("compile")
+@click.option("--dir", "directory", default=None,
+              help="Bytecode cache directory (default: TEMPLATE_BYTECODE_CACHE_DIR).")
+@click.option("--force", is_flag=True, help="Empty the cache first and recompile every template.")
+def compile_templates_command(directory, force):
+    """Writes the compiled bytecode of every template to the bytecode cache (run on deploy)."""
+    cache = enable_bytecode_cache(current_app, directory)
+    if force:
+        cache.clear()
+    if current_app.jinja_env.cache is not None:
+        current_app.jinja_env.cache.clear()  # templates create_app() loaded without the cache
+    count = precompile_templates(current_app)
+
+    stats = get_template_stats()
+    click.echo(f"{count} templates in {stats['bytecode_cache_dir']} ({stats['precompile_ms']} ms)")
+    if not current_app.config["TEMPLATE_BYTECODE_CACHE"]:
+        click.echo("TEMPLATE_BYTECODE_CACHE is off: workers won't read this cache until it is set.")
+
+
+# -----------------
+# Synthetic data
+# -----------------
+
+@click.command("seed")
+@click.option("--scale", type=click.Choice(list(SCALES)), default="tiny", show_default=True,
+              help="Named dataset size; xl is roughly production scale.")
+@click.option("--rooms", type=click.IntRange(0), help="Rooms to add (overrides --scale).")
+@click.option("--customers", type=click.IntRange(0), help="Customers to add (overrides --scale).")
+@click.option("--reservations", type=click.IntRange(0), help="Reservations to add (overrides --scale).")
+@click.option("--batch-size", default=5000, show_default=True, type=click.IntRange(1),
+              help="Rows per executemany() and commit.")
+@click.option("--seed", "random_seed", default=460, show_default=True, help="Random seed (same seed, same data).")
+@click.option("--keep-indexes", is_flag=True, help="Don't drop secondary indexes during the load.")
+@with_appcontext
+def seed_command(scale, rooms, customers, reservations, batch_size, random_seed, keep_indexes):
+    """Adds generated rooms, customers and non-overlapping reservations to the database."""
+    counts = dict(SCALES[scale])
+    for key, value in (("rooms", rooms), ("customers", customers), ("reservations", reservations)):
+        if value is not None:
+            counts[key] = value
+
+    click.echo(
+        f"seeding {counts['rooms']:,} rooms, {counts['customers']:,} customers, "
+        f"{counts['reservations']:,} reservations"
+    )
+    started = time.perf_counter()
+    rows = seed_database(
+        **counts, seed=random_seed, batch_size=batch_size, defer_indexes=not keep_indexes, log=click.echo,
+    )
+    seconds = time.perf_counter() - started
+    total = sum(rows.values())
+    click.echo(f"{total:,} rows in {seconds:.1f}s ({total / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+# -----------------
+# Exports
+# -----------------
+
+export_cli = AppGroup("export", help="Stream data out of the database.")
+
+# Seconds between progress lines on stderr
+EXPORT_PROGRESS_INTERVAL = 5.0
+
+@export_cli.command("reservations")
+@click.option("--format", "fmt", type=click.Choice(list(EXPORT_FORMATS)), default="csv", show_default=True)
+@click.option("--from", "date_from", default="", help="Stays overlapping this date onwards (YYYY-MM-DD).")
+@click.option("--to", "date_to", default="", help="Stays before this date (YYYY-MM-DD, exclusive).")
+@click.option("--customer", default="", help="CustomerID or email.")
+@click.option("--status", default="", help="Only this ReservationStatus (e.g. Confirmed).")
+@click.option("--batch-size", default=2000, show_default=True, type=click.IntRange(1, MAX_BATCH_SIZE),
+              help="Rows fetched from the server-side cursor at a time.")
+@click.option("--output", "-o", type=click.File("wb"), default="-", help="File to write (default: stdout).")
+@with_appcontext
+def export_reservations_command(fmt, date_from, date_to, customer, status, batch_size, output):
+    """Writes reservations joined with room, room type and customer as CSV or NDJSON."""
+    try:
+        where_sql, params = parse_export_filters(date_from, date_to, customer, status)
+    except ExportFilterError as e:
+        raise click.UsageError(str(e))
+
+    stats = ExportStats()
+    last_report = time.perf_counter()
+    for chunk in export_reservations(fmt, where_sql, params, batch_size, stats):
+        output.write(chunk)
+        if time.perf_counter() - last_report >= EXPORT_PROGRESS_INTERVAL:
+            click.echo(f"... {stats.summary()}", err=True)
+            last_report = time.perf_counter()
+    output.flush()
+    click.echo(stats.summary(), err=True)
+
+
+# -----------------
+# Customers
+# -----------------
+
+customers_cli = AppGroup("customers", help="Manage customer accounts.")
+
+@customers_cli.command("normalize-emails")
+@click.option("--dry-run", is_flag=True, help="Only count the emails and list duplicates.")
+@with_appcontext
+def normalize_emails_command(dry_run):
+    """Stores every customer email trimmed + lowercase (run once on databases from before that rule)."""
+    pending, duplicates = normalize_stored_emails(dry_run=dry_run)
+    for email, customer_ids in duplicates:
+        click.echo(f"{email}: customers {', '.join(str(cid) for cid in customer_ids)}", err=True)
+    if duplicates:
+        raise click.ClickException(
+            f"{len(duplicates)} emails belong to more than one customer once normalized; "
+            f"merge those accounts first. Nothing was changed."
+        )
+    click.echo(f"{pending:,} emails {'to normalize (dry run)' if dry_run else 'normalized'}")
+
+
+# -----------------
+# Reservations
+# -----------------
+
+reservations_cli = AppGroup("reservations", help="Manage reservations.")
+
+@reservations_cli.command("status")
+@click.argument("reservation_id", type=int)
+@click.argument("status", type=click.Choice(RESERVATION_STATUSES))
+@with_appcontext
+def reservation_status_command(reservation_id, status):
+    """Sets a reservation's status (room nights and occupancy rollup follow)."""
+    try:
+        old_status = set_reservation_status(reservation_id, status)
+    except (ReservationNotFoundError, RoomUnavailableError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"reservation {reservation_id}: {old_status} -> {status}")
+
+@reservations_cli.command("backfill-nights")
+@click.option("--batch-size", default=5000, show_default=True, type=click.IntRange(1),
+              help="Reservations per transaction.")
+@with_appcontext
+def backfill_nights_command(batch_size):
+    """Claims (and prices) the roomnight rows of Confirmed reservations made before roomnight existed."""
+    summary = backfill_room_nights(batch_size=batch_size, log=click.echo)
+    click.echo(
+        f"{summary['reservations']:,} confirmed reservations, {summary['nights']:,} nights: "
+        f"{summary['inserted']:,} claimed, {summary['priced']:,} priced in {summary['seconds']}s"
+    )
+    if summary["conflicts"]:
+        shown = ", ".join(str(rid) for rid in summary["conflicts"][:50])
+        more = f" and {len(summary['conflicts']) - 50} more" if len(summary["conflicts"]) > 50 else ""
+        raise click.ClickException(
+            f"{len(summary['conflicts'])} reservations overlap another confirmed one and could not "
+            f"claim every night: {shown}{more}"
+        )
+
+
+# -----------------
+# Reports
+# -----------------
+
+reports_cli = AppGroup("reports", help="Occupancy and revenue reporting tables.")
+
+@reports_cli.command("rebuild")
+@click.option("--from", "date_from", default="", help="First night to rebuild (YYYY-MM-DD; default: all).")
+@click.option("--to", "date_to", default="", help="Night after the last one to rebuild (YYYY-MM-DD).")
+@click.option("--chunk-size", default=50000, show_default=True, type=click.IntRange(1),
+              help="Reservations (by ReservationID range) per chunk.")
+@click.option("--jobs", default=4, show_default=True, type=click.IntRange(1), help="Chunks aggregated at once.")
+@with_appcontext
+def rebuild_rollup_command(date_from, date_to, chunk_size, jobs):
+    """Recomputes the occupancyrollup table from the reservations."""
+    try:
+        start = parse_report_date(date_from, "--from") if date_from else None
+        end = parse_report_date(date_to, "--to") if date_to else None
+    except ReportError as e:
+        raise click.UsageError(str(e))
+    if start and end and end <= start:
+        raise click.UsageError("--to must be after --from.")
+
+    summary = rebuild_occupancy_rollup(start, end, chunk_size=chunk_size, jobs=jobs, log=click.echo)
+    click.echo(
+        f"{summary['reservations']:,} reservations, {summary['nights']:,} nights -> {summary['rows']:,} rows "
+        f"in {summary['seconds']}s ({summary['chunks']} chunks)"
+    )
+
+
+# -----------------
+# Audit log
+# -----------------
+
+audit_cli = AppGroup("audit", help="Audit log partitions and archival.")
+
+@audit_cli.command("segments")
+@with_appcontext
+def audit_segments_command():
+    """Lists the monthly partitions (MySQL) / tables (SQLite) of the audit log."""
+    try:
+        segments = list_audit_segments()
+    except AuditLogError as e:
+        raise click.ClickException(str(e))
+    for segment in segments:
+        ends = f"< {segment.ends:%Y-%m-%d}" if segment.ends else "open"
+        span = f"{segment.oldest} .. {segment.newest}" if segment.oldest else "empty"
+        click.echo(f"{segment.name:<18} {ends:<14} {segment.rows:>12,} rows  {span}")
+
+@audit_cli.command("roll")
+@click.option("--ahead", type=click.IntRange(0), default=None,
+              help="Months of partitions to keep ready (default: AUDIT_PARTITIONS_AHEAD).")
+@with_appcontext
+def audit_roll_command(ahead):
+    """Adds the coming months' partitions (MySQL) or closes last month's table (SQLite). Run daily."""
+    if ahead is None:
+        ahead = current_app.config["AUDIT_PARTITIONS_AHEAD"]
+    try:
+        created = roll_audit_log(months_ahead=ahead)
+    except AuditLogError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"created {', '.join(created)}" if created else "nothing to do")
+
+@audit_cli.command("archive")
+@click.option("--before", default="", help="Archive the months before this one (YYYY-MM; default: keep "
+              "AUDIT_RETENTION_MONTHS months).")
+@click.option("--dir", "directory", default=None, help="Where to write the files (default: AUDIT_ARCHIVE_DIR).")
+@click.option("--batch-size", default=5000, show_default=True, type=click.IntRange(1),
+              help="Rows fetched from the server-side cursor at a time.")
+@click.option("--dry-run", is_flag=True, help="Only list what would be archived.")
+@with_appcontext
+def audit_archive_command(before, directory, batch_size, dry_run):
+    """Writes old months to gzipped NDJSON files, then drops their partitions / tables."""
+    today = date.today()
+    if before:
+        try:
+            cutoff = datetime.strptime(before.strip(), "%Y-%m").date()
+        except ValueError:
+            raise click.UsageError("--before must be a month (YYYY-MM).")
+    else:
+        months = today.year * 12 + today.month - 1 - current_app.config["AUDIT_RETENTION_MONTHS"]
+        cutoff = date(months // 12, months % 12 + 1, 1)
+    directory = (directory or current_app.config["AUDIT_ARCHIVE_DIR"]
+                 or os.path.join(current_app.instance_path, "audit-archive"))
+
+    try:
+        archived = archive_audit_log(cutoff, directory, batch_size=batch_size, dry_run=dry_run, log=click.echo)
+    except AuditLogError as e:
+        raise click.ClickException(str(e))
+    rows = sum(item["rows"] for item in archived)
+    click.echo(f"{len(archived)} segments before {cutoff:%Y-%m}, {rows:,} rows" + (" (dry run)" if dry_run else ""))
+
+
+def register_commands(app):
+    app.cli.add_command(images_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(customers_cli)
+    app.cli.add_command(reservations_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(audit_cli)
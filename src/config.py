@@ -15,3 +15,150 @@ class Config:
     )
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool (per worker process). POOL_SIZE connections are kept open,
+    # up to MAX_OVERFLOW more are opened under load, and a request waits at most
+    # POOL_TIMEOUT seconds for one. Connections older than POOL_RECYCLE seconds
+    # are replaced (keep it below MySQL's wait_timeout), and PRE_PING tests each
+    # connection on checkout so a dropped one is replaced instead of failing.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size":     DB_POOL_SIZE,
+        "max_overflow":  DB_MAX_OVERFLOW,
+        "pool_timeout":  DB_POOL_TIMEOUT,
+        "pool_recycle":  DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+    # Identifies the deployed templates in page ETags; computed from the
+    # templates folder when unset (see http_cache.py)
+    BUILD_ID = os.getenv("BUILD_ID", "")
+
+    # Client addresses allowed to reach the /internal/* operational endpoints
+    # (and /metrics). Behind a reverse proxy every request comes from the
+    # proxy's address, so set TRUSTED_PROXY_HOPS too, or these checks pass
+    # for everyone.
+    INTERNAL_ALLOWED_IPS = tuple(
+        ip.strip() for ip in os.getenv("INTERNAL_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+    )
+
+    # Reverse proxies in front of the app whose X-Forwarded-For /
+    # X-Forwarded-Proto are trusted (wsgi.py applies werkzeug's ProxyFix):
+    # 1 behind nginx on the same host. Keep 0 when clients reach the app
+    # directly, or they could claim any address.
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+    # Bearer token for the /internal/* endpoints that return customer data
+    # (reservations export, audit events); unset = those endpoints are off
+    STAFF_API_TOKEN = os.getenv("STAFF_API_TOKEN", "")
+
+    # Seconds the in-process room catalog snapshot (rooms, types, amenities)
+    # is served before it is reloaded. 0 = only reload on a version bump.
+    CATALOG_TTL = int(os.getenv("CATALOG_TTL", "300"))
+
+    # Seconds the serialized /api/team responses are cached before a rebuild
+    TEAM_CACHE_TTL = int(os.getenv("TEAM_CACHE_TTL", "600"))
+
+    # Seconds before the in-memory availability index is rebuilt from the DB
+    # (picks up bookings made by other worker processes). 0 = never expire.
+    AVAILABILITY_INDEX_TTL = int(os.getenv("AVAILABILITY_INDEX_TTL", "300"))
+
+    # Seconds a cached occupancy calendar month is served before it is rebuilt
+    CALENDAR_CACHE_TTL = int(os.getenv("CALENDAR_CACHE_TTL", "60"))
+
+    # SQL instrumentation (see sql_instrumentation.py). Share of requests that get
+    # per-request stats + a Server-Timing header (0-1), the slow-query log
+    # threshold in ms (0 = off), and how many runs of the same statement in one
+    # request are reported as a likely N+1.
+    SQL_SAMPLE_RATE = float(os.getenv("SQL_SAMPLE_RATE", "1.0"))
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+    SQL_TOP_STATEMENTS = int(os.getenv("SQL_TOP_STATEMENTS", "3"))
+
+    # Directory where each worker process writes its metrics so /metrics can
+    # add them up (see metrics.py). Empty = single-process numbers only.
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+
+    # Write-behind audit log (see services/audit_service.py). Events wait in a
+    # bounded queue of AUDIT_QUEUE_SIZE and are inserted AUDIT_BATCH_SIZE rows
+    # at a time, at least every AUDIT_FLUSH_INTERVAL seconds. With a full queue
+    # a request waits up to AUDIT_ENQUEUE_TIMEOUT seconds, then the event is
+    # dropped (and counted). A failed insert is retried AUDIT_WRITE_RETRIES
+    # times. AUDIT_ASYNC = false writes each event in the request instead.
+    AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "true").lower() in ("1", "true", "yes")
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+    AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+    AUDIT_WRITE_RETRIES = int(os.getenv("AUDIT_WRITE_RETRIES", "3"))
+
+    # Audit log retention (see services/audit_retention_service.py). `flask
+    # audit roll` keeps PARTITIONS_AHEAD months of partitions ready on MySQL;
+    # `flask audit archive` moves months older than RETENTION_MONTHS to
+    # gzipped NDJSON files in ARCHIVE_DIR (default instance/audit-archive).
+    AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3"))
+    AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))
+    AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "")
+
+    # Password hashing (see services/password_service.py). POLICY is a name from
+    # HASH_POLICIES (scrypt, scrypt-light, pbkdf2, pbkdf2-light) or a Werkzeug
+    # method string; stored hashes made with other parameters are upgraded on
+    # the next successful login. Hashing runs on WORKERS processes per app
+    # process (0 = in the request thread); at most WORKERS * QUEUE_FACTOR
+    # jobs wait, and a request gives up after QUEUE_TIMEOUT seconds.
+    PASSWORD_HASH_POLICY = os.getenv("PASSWORD_HASH_POLICY", "scrypt")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_FACTOR = int(os.getenv("PASSWORD_HASH_QUEUE_FACTOR", "4"))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2.0"))
+
+    # Server-side sessions (see session_store.py): "sqlite" (shared by the worker
+    # processes of a host), "memory" (single process), "cookie" (signed cookie,
+    # no server state) or "package.module:Class". Sessions expire after
+    # SESSION_TTL idle seconds; expired ones are deleted every
+    # SESSION_SWEEP_INTERVAL seconds. SQLITE_PATH defaults to
+    # instance/sessions.sqlite3.
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+    SESSION_TTL = int(os.getenv("SESSION_TTL", str(24 * 3600)))
+    SESSION_SWEEP_INTERVAL = int(os.getenv("SESSION_SWEEP_INTERVAL", "300"))
+    SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "")
+    SESSION_MEMORY_MAX_ENTRIES = int(os.getenv("SESSION_MEMORY_MAX_ENTRIES", "50000"))
+
+    # Template compilation (see template_cache.py). BYTECODE_CACHE keeps compiled
+    # templates in BYTECODE_CACHE_DIR (default instance/template-cache) for the
+    # next worker process; PRECOMPILE compiles every template in create_app()
+    # instead of on the first request that renders it.
+    TEMPLATE_BYTECODE_CACHE = os.getenv("TEMPLATE_BYTECODE_CACHE", "false").lower() in ("1", "true", "yes")
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "")
+    TEMPLATE_PRECOMPILE = os.getenv("TEMPLATE_PRECOMPILE", "false").lower() in ("1", "true", "yes")
+
+    # Worker warmup under the production server (see warmup.py, wsgi.py): pages
+    # rendered by each worker before it takes traffic (comma-separated paths,
+    # empty = none), and whether it starts its password hashing processes.
+    WARMUP_PATHS = tuple(
+        path.strip() for path in
+        os.getenv("WARMUP_PATHS", "/,/about.html,/attraction.html,/lodge_reservation.html").split(",")
+        if path.strip()
+    )
+    WARMUP_PASSWORD_POOL = os.getenv("WARMUP_PASSWORD_POOL", "true").lower() in ("1", "true", "yes")
+
+    # Per-night pricing (see services/pricing_service.py). A night costs the
+    # room's PricePerNight times WEEKEND_MULTIPLIER on WEEKEND_NIGHTS and times
+    # the multiplier of the season it falls in ("MM-DD..MM-DD:multiplier",
+    # comma-separated, ends inclusive); stays of at least N nights get the
+    # discount of STAY_DISCOUNTS ("N:rate", e.g. "7:0.10"). The defaults keep
+    # the flat nightly price.
+    PRICING_WEEKEND_NIGHTS = os.getenv("PRICING_WEEKEND_NIGHTS", "fri,sat")
+    PRICING_WEEKEND_MULTIPLIER = float(os.getenv("PRICING_WEEKEND_MULTIPLIER", "1.0"))
+    PRICING_SEASONS = os.getenv("PRICING_SEASONS", "")
+    PRICING_STAY_DISCOUNTS = os.getenv("PRICING_STAY_DISCOUNTS", "")
+
+    # Rendered page cache for the room listing and room details pages (see
+    # page_cache.py), bounded by the total size of the stored HTML
+    PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
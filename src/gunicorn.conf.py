@@ -0,0 +1,64 @@
+"""
+gunicorn settings for production (see wsgi.py). Run from src/:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: the app is created and warmed up (catalog, indexes,
+  compiled templates) once in the master; forked workers share those pages
+  copy-on-write. gc.freeze() keeps the collector from touching (and so
+  copying) them in every worker.
+- Workers are recycled after WEB_MAX_REQUESTS requests (plus up to
+  WEB_MAX_REQUESTS_JITTER, so they don't all restart at once), which caps
+  slow memory growth; the replacement is forked from the warm master.
+- Each worker runs warmup.warm_worker() before it accepts connections.
+Any gunicorn setting can still be overridden on the command line or in
+GUNICORN_CMD_ARGS.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(2 * multiprocessing.cpu_count() + 1)))
+# Sync workers by default (behind a buffering proxy such as nginx; then
+# bind to 127.0.0.1 and set TRUSTED_PROXY_HOPS=1, or every request looks
+# internal to INTERNAL_ALLOWED_IPS). With WEB_THREADS > 1, gthread
+# workers; these drop connections they have accepted but not yet served
+# when they are recycled.
+threads = int(os.getenv("WEB_THREADS", "1"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+preload_app = True
+
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "1000"))
+
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def when_ready(server):
+    """
+    Master, after the app is preloaded and before the first worker is forked.
+    """
+    from extensions import db
+
+    app = server.app.wsgi()
+    # Workers open their own connections; none may be inherited
+    with app.app_context():
+        db.engine.dispose()
+    gc.collect()
+    gc.freeze()
+    server.log.info("App preloaded and warmed up; forking %d workers", server.num_workers)
+
+def post_worker_init(worker):
+    """
+    Worker, after the app is loaded and before it accepts connections.
+    """
+    from warmup import warm_worker
+
+    warm_worker(worker.wsgi)
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import time
+from functools import wraps
+from flask import Response, current_app, make_response, request, session
+
+# Cache-Control per kind of response:
+# - "page":    HTML that embeds per-session bits (login state, CSRF token), so only
+#              the browser may keep it, and it must revalidate every time (cheap 304)
+# - "public":  JSON that is the same for everyone; shared caches may store it
+# - "private": personalized pages (lookup, summary); never stored anywhere
+CACHE_POLICIES = {
+    "page":    "private, no-cache",
+    "public":  "public, no-cache",
+    "private": "private, no-store",
+}
+
+
+def compute_build_id(app):
+    """
+    Fingerprint of the templates folder and the asset manifests in static/build
+    (file names, sizes, mtimes). It changes on every deploy that touches a
+    template or rebuilds assets, which invalidates every page ETag.
+    Override with the BUILD_ID setting (e.g. the git commit) if preferred.
+    """
+    digest = hashlib.sha1()
+    template_root = os.path.join(app.root_path, app.template_folder)
+    for folder, _dirs, files in sorted(os.walk(template_root)):
+        for name in sorted(files):
+            path = os.path.join(folder, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, template_root)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    build_root = os.path.join(app.static_folder, "build")
+    for folder, _dirs, files in sorted(os.walk(build_root)):
+        for name in sorted(files):
+            if name.endswith("manifest.json"):
+                stat = os.stat(os.path.join(folder, name))
+                digest.update(f"{folder}/{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+def init_http_cache(app):
+    app.config["BUILD_ID"] = app.config.get("BUILD_ID") or compute_build_id(app)
+
+def _session_parts():
+    """
+    Bits of the session a rendered page depends on: who is logged in and which
+    CSRF token its forms carry. The CSRF part also rolls over every half
+    WTF_CSRF_TIME_LIMIT, so a revalidated page never serves an expired token.
+    """
+    csrf_raw = session.get("csrf_token")
+    if not csrf_raw:
+        return None  # first visit: the token is generated while rendering
+    time_limit = current_app.config.get("WTF_CSRF_TIME_LIMIT") or 3600
+    return [
+        session.get("customer_id") or "anon",
+        hashlib.sha1(csrf_raw.encode()).hexdigest()[:12],
+        int(time.time() // max(time_limit // 2, 1)),
+    ]
+
+def _apply_policy(response, policy):
+    response.headers["Cache-Control"] = CACHE_POLICIES[policy]
+    if policy == "page":
+        response.vary.add("Cookie")
+    return response
+
+def conditional(policy: str = "page", versions=None):
+    """
+    Adds validators and a Cache-Control policy to a GET view.
+
+    The ETag is computed *before* the view runs, from the build id, the
+    endpoint with its view args and query string, the route's data versions
+    (`versions(**view_args)` returns a list of version strings, or None to
+    skip caching for that request, e.g. when the resource doesn't exist) and,
+    for "page", the session parts. A matching If-None-Match gets a 304
+    without rendering anything.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or policy == "private":
+                return _apply_policy(make_response(view(*args, **kwargs)), policy)
+
+            parts = [
+                current_app.config["BUILD_ID"],
+                request.endpoint,
+                sorted((request.view_args or {}).items()),
+                sorted(request.args.items(multi=True)),
+            ]
+            if versions is not None:
+                data_versions = versions(*args, **kwargs)
+                parts = None if data_versions is None else parts + list(data_versions)
+            if parts is not None and policy == "page":
+                # Pending flash messages are one-off content: always render
+                session_parts = None if session.get("_flashes") else _session_parts()
+                parts = None if session_parts is None else parts + session_parts
+
+            if parts is None:
+                response = make_response(view(*args, **kwargs))
+                response.headers["Cache-Control"] = CACHE_POLICIES["private"]
+                return response
+
+            etag = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+            if request.if_none_match.contains(etag):
+                not_modified = Response(status=304)
+                not_modified.set_etag(etag)
+                return _apply_policy(not_modified, policy)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                _apply_policy(response, policy)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,44 @@
+import hmac
+from functools import wraps
+from flask import abort, current_app, jsonify, request
+
+
+def internal_only(view):
+    """
+    Restricts an operational endpoint (stats, telemetry) to the addresses in
+    INTERNAL_ALLOWED_IPS. Everyone else gets a plain 404, so the endpoint
+    does not advertise itself.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        allowed = current_app.config.get("INTERNAL_ALLOWED_IPS", ())
+        if request.remote_addr not in allowed:
+            abort(404)
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def staff_token_required(view):
+    """
+    Requires `Authorization: Bearer <STAFF_API_TOKEN>` on endpoints that hand
+    out customer data, on top of internal_only: a client address says nothing
+    about who is asking. With no STAFF_API_TOKEN configured the endpoint is
+    off (404); use the matching CLI command instead.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get("STAFF_API_TOKEN", "")
+        if not token:
+            abort(404)
+        scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(given.strip().encode(), token.encode()):
+            response = jsonify({"error": "A valid staff token is required."})
+            response.status_code = 401
+            response.headers["WWW-Authenticate"] = "Bearer"
+            return response
+        return view(*args, **kwargs)
+
+    return wrapper
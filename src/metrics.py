@@ -0,0 +1,367 @@
+"""
+Prometheus-style metrics shared by all worker processes.
+
+Each process keeps its counters and histograms in memory (a lock and a dict
+update per observation) and, when METRICS_DIR is set, a background thread
+writes them to METRICS_DIR/metrics_<pid>_<token>.json every
+METRICS_FLUSH_INTERVAL seconds. /metrics sums the files of every process, so
+any worker can answer the scrape. Files of exited workers are folded into
+metrics_archive.json, which keeps counters monotonic across worker restarts.
+Without METRICS_DIR the numbers cover the current process only.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from flask import g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ARCHIVE_NAME = "metrics_archive.json"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, registry, name: str, documentation: str, labels=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self.registry.lock:
+            values = self.registry.values.setdefault(self.name, {})
+            values[key] = values.get(key, 0) + amount
+            self.registry.dirty = True
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, registry, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self.registry.lock:
+            values = self.registry.values.setdefault(self.name, {})
+            # Per-bucket (non-cumulative) counts, then +Inf, sum, count
+            series = values.get(key)
+            if series is None:
+                series = values[key] = [0] * (len(self.buckets) + 3)
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+            self.registry.dirty = True
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.values = {}   # metric name -> {label values tuple: number or histogram list}
+        self.dirty = False
+        self.directory = None
+        self.flush_interval = 1.0
+        self._file = None
+        self._flusher = None
+
+    def counter(self, name: str, documentation: str, labels=()):
+        self.metrics[name] = Counter(self, name, documentation, labels)
+        return self.metrics[name]
+
+    def histogram(self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.metrics[name] = Histogram(self, name, documentation, labels, buckets)
+        return self.metrics[name]
+
+    # -----------------
+    # Multi-process store
+    # -----------------
+
+    def configure(self, directory: str | None, flush_interval: float):
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._start_flusher()
+            atexit.register(self.flush)
+
+    def _start_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._file = os.path.join(self.directory, f"metrics_{os.getpid()}_{uuid.uuid4().hex[:8]}.json")
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def after_fork_in_child(self):
+        """
+        A forked worker starts from zero (the parent's numbers are still in the
+        parent's own file) and needs its own file and flusher thread.
+        """
+        self.lock = threading.Lock()
+        self.values = {}
+        self.dirty = False
+        self._flusher = None
+        if self.directory:
+            self._start_flusher()
+
+    def _serialize(self, mark_clean: bool = False):
+        with self.lock:
+            if mark_clean:
+                self.dirty = False
+            return {
+                name: {json.dumps(key): list(value) if isinstance(value, list) else value for key, value in series.items()}
+                for name, series in self.values.items()
+            }
+
+    def flush(self):
+        if not self.directory or self._file is None:
+            return
+        data = {"pid": os.getpid(), "metrics": self._serialize(mark_clean=True)}
+        tmp_path = self._file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._file)
+
+    def _flush_loop(self):
+        last_compaction = 0.0
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                if self.dirty:
+                    self.flush()
+                if time.monotonic() - last_compaction > 60:
+                    last_compaction = time.monotonic()
+                    self.compact()
+            except OSError:
+                pass
+
+    def compact(self):
+        """
+        Folds the files of processes that no longer exist into the archive file.
+        Needs fcntl (POSIX) to serialize workers doing it at the same time.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            # Readers take the shared lock, so none sees the new archive and
+            # the dead files it already contains at the same time
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            dead = [path for path, pid in self._process_files() if not _pid_alive(pid)]
+            if not dead:
+                return
+            archive_path = os.path.join(self.directory, ARCHIVE_NAME)
+            merged = _read_values([archive_path, *dead])
+            tmp_path = archive_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"metrics": merged}, f)
+            os.replace(tmp_path, archive_path)
+            for path in dead:
+                os.remove(path)
+
+    def _process_files(self):
+        for name in os.listdir(self.directory):
+            if name.startswith("metrics_") and name.endswith(".json") and name != ARCHIVE_NAME:
+                try:
+                    yield os.path.join(self.directory, name), int(name.split("_")[1])
+                except ValueError:
+                    continue
+
+    def collect(self):
+        """
+        Values of every process: the live numbers of this one plus the files
+        of the others (and the archive).
+        """
+        own = self._serialize()
+        if not self.directory:
+            return own
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+            others = [path for path, _pid in self._process_files() if path != self._file]
+            merged = _read_values([os.path.join(self.directory, ARCHIVE_NAME), *others])
+        return _merge(merged, own)
+
+    # -----------------
+    # Exposition
+    # -----------------
+
+    def render(self):
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        values = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            series = values.get(name, {})
+            if not series and metric.kind == "counter" and not metric.labels:
+                lines.append(f"{name} 0")
+            for key, value in sorted(series.items()):
+                labels = list(zip(metric.labels, json.loads(key)))
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, hits in zip([*metric.buckets, "+Inf"], value):
+                    cumulative += hits
+                    lines.append(f"{name}_bucket{_label_text(labels + [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(labels)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_label_text(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _merge(into: dict, values: dict):
+    for name, series in values.items():
+        target = into.setdefault(name, {})
+        for key, value in series.items():
+            if key not in target:
+                target[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                target[key] = [a + b for a, b in zip(target[key], value)]
+            else:
+                target[key] += value
+    return into
+
+def _read_values(paths):
+    merged = {}
+    for path in paths:
+        try:
+            with open(path) as f:
+                _merge(merged, json.load(f)["metrics"])
+        except (OSError, ValueError, KeyError):
+            continue  # missing, or being replaced right now
+    return merged
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+# -----------------
+# Metrics
+# -----------------
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests handled.", ("endpoint", "status"),
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time to produce the response.", ("endpoint", "status"), LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes", "Response body size (when known).", ("endpoint", "status"), SIZE_BUCKETS,
+)
+BOOKINGS_CONFIRMED = registry.counter(
+    "bookings_confirmed_total", "Reservations confirmed (committed).",
+)
+AVAILABILITY_CONFLICTS = registry.counter(
+    "availability_conflicts_total",
+    "Booking attempts for nights already taken: room_is_available() pre-check or confirm_reservation().",
+    ("source",),
+)
+LOGIN_FAILURES = registry.counter(
+    "login_failures_total", "Failed logins (unknown email or wrong password).",
+)
+AUDIT_LOG_FAILURES = registry.counter(
+    "audit_log_write_failures_total",
+    "Audit log inserts that failed, retries included (the booking itself still succeeds).",
+)
+AUDIT_EVENTS_QUEUED = registry.counter(
+    "audit_events_queued_total", "Audit events accepted by the write-behind queue.",
+)
+AUDIT_EVENTS_FLUSHED = registry.counter(
+    "audit_events_flushed_total", "Audit events written to the auditlog table.",
+)
+AUDIT_EVENTS_DROPPED = registry.counter(
+    "audit_events_dropped_total",
+    "Audit events lost: queue full, insert still failing after retries, or not flushed by shutdown.",
+    ("reason",),
+)
+PAGE_CACHE_LOOKUPS = registry.counter(
+    "page_cache_lookups_total", "Rendered page cache lookups.", ("template", "result"),
+)
+PAGE_CACHE_RENDER_SAVED = registry.counter(
+    "page_cache_render_seconds_saved_total",
+    "Template rendering time avoided by page cache hits (net of filling the per-user holes).",
+    ("template",),
+)
+EXPORT_ROWS = registry.counter(
+    "export_rows_total", "Rows written by reservation exports.", ("format",),
+)
+EXPORT_SECONDS = registry.counter(
+    "export_seconds_total", "Time spent streaming reservation exports.", ("format",),
+)
+
+
+
+# -----------------
+# Flask integration
+# -----------------
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+def _record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    labels = {"endpoint": request.endpoint or "unmatched", "status": response.status_code}
+    HTTP_REQUESTS.inc(**labels)
+    HTTP_LATENCY.observe(time.perf_counter() - started, **labels)
+    if response.content_length is not None:
+        HTTP_RESPONSE_SIZE.observe(response.content_length, **labels)
+    return response
+
+def render_metrics():
+    return registry.render()
+
+def init_metrics(app):
+    """
+    Records request count, latency and response size per endpoint and status,
+    and starts the per-process file store when METRICS_DIR is set.
+    """
+    registry.configure(app.config.get("METRICS_DIR"), app.config.get("METRICS_FLUSH_INTERVAL", 1.0))
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.after_fork_in_child)
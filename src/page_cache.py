@@ -0,0 +1,211 @@
+"""
+Rendered page cache with per-user holes.
+
+A cacheable page is rendered once per (template, arguments, data versions)
+with every per-user part left as a hole: templates write
+{{ cache_hole("partials/header_and_navbar.html") }} instead of an include,
+and {{ cache_hole("csrf_token") }} instead of {{ csrf_token() }}. A cache hit
+only renders the holes for the current visitor (login state, flashed
+messages, CSRF token) and splices them into the stored page, skipping the
+rest of the template and the work that builds its context. The partials
+behind the holes are cached too, per login state, unless there are flashed
+messages to show.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, render_template, session
+from flask_wtf.csrf import generate_csrf
+from markupsafe import Markup
+from metrics import PAGE_CACHE_LOOKUPS, PAGE_CACHE_RENDER_SAVED
+
+HOLE_MARKER = "\x00cache-hole:{}\x00"
+
+# Holes that are a value rather than a partial template
+HOLE_CALLABLES = {
+    "csrf_token": generate_csrf,
+}
+
+
+class CachedPage:
+    __slots__ = ("segments", "holes", "render_ms", "size")
+
+    def __init__(self, html: str, holes: list, render_ms: float):
+        # Alternating static text and hole names: [text, hole, text, hole, ..., text]
+        self.segments = []
+        rest = html
+        for name in holes:
+            before, _marker, rest = rest.partition(HOLE_MARKER.format(name))
+            self.segments.extend((before, name))
+        self.segments.append(rest)
+        self.holes = holes
+        self.render_ms = render_ms
+        self.size = len(html)
+
+
+class PageCache:
+    """
+    LRU of CachedPage, bounded by the total size of the stored HTML. Entries
+    are dropped as soon as the catalog they were rendered from changes.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> CachedPage
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.catalog_digest = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0,
+                      "render_ms_saved": 0.0, "hole_ms": 0.0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry: CachedPage):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.stats["evictions"] += 1
+
+    def check_catalog(self, digest: str):
+        """
+        Clears everything when the room catalog changed since the last render.
+        """
+        if digest == self.catalog_digest:
+            return
+        with self._lock:
+            if self.catalog_digest is not None and self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self.bytes = 0
+            self.catalog_digest = digest
+
+    def record(self, hit: bool, template: str, render_ms: float = 0.0, hole_ms: float = 0.0):
+        with self._lock:
+            self.stats["hits" if hit else "misses"] += 1
+            self.stats["hole_ms"] += hole_ms
+            if hit:
+                self.stats["render_ms_saved"] += max(render_ms - hole_ms, 0.0)
+        PAGE_CACHE_LOOKUPS.inc(template=template, result="hit" if hit else "miss")
+        if hit:
+            PAGE_CACHE_RENDER_SAVED.inc(max(render_ms - hole_ms, 0.0) / 1000, template=template)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "render_ms_saved": round(self.stats["render_ms_saved"], 1),
+                "hole_ms":         round(self.stats["hole_ms"], 1),
+                "hit_rate":        round(self.stats["hits"] / lookups, 4) if lookups else None,
+                "entries":         len(self._entries),
+                "bytes":           self.bytes,
+                "max_bytes":       self.max_bytes,
+            }
+
+
+page_cache = PageCache()
+
+
+def cache_hole(name: str):
+    """
+    Jinja global. While a page is being recorded for the cache, leaves a
+    marker for the hole `name`; otherwise renders it right away.
+    """
+    holes = g.get("page_cache_holes")
+    if holes is not None:
+        holes.append(name)
+        return Markup(HOLE_MARKER.format(name))
+    return _render_hole(name, None)
+
+def _hole_variant():
+    """
+    What the partial holes depend on: logged in or not. None (render them
+    uncached) when there are flashed messages to show.
+    """
+    if session.get("_flashes"):
+        return None
+    return bool(session.get("customer_id"))
+
+def _render_hole(name: str, variant):
+    if name in HOLE_CALLABLES:
+        return Markup.escape(HOLE_CALLABLES[name]())
+    if variant is None:
+        return Markup(render_template(name))
+
+    # The partial itself is the same for every visitor of this variant, apart
+    # from its own (callable) holes such as the CSRF token
+    key = ("hole", name, variant)
+    entry = page_cache.get(key)
+    if entry is None:
+        entry = _record(name, {})
+        page_cache.put(key, entry)
+    return Markup(_fill(entry, variant))
+
+def _record(template: str, context: dict):
+    started = time.perf_counter()
+    g.page_cache_holes = []
+    try:
+        html = render_template(template, **context)
+        holes = g.page_cache_holes
+    finally:
+        g.pop("page_cache_holes", None)
+    return CachedPage(html, holes, (time.perf_counter() - started) * 1000)
+
+def _fill(entry: CachedPage, variant):
+    rendered = {}
+    parts = []
+    for i, segment in enumerate(entry.segments):
+        if i % 2 == 0:
+            parts.append(segment)
+            continue
+        if segment not in rendered:
+            rendered[segment] = _render_hole(segment, variant)
+        parts.append(rendered[segment])
+    return "".join(parts)
+
+def render_cached(template: str, key: tuple, catalog_digest: str, context):
+    """
+    Returns `template` rendered with context() (a callable, only called on a
+    miss), from the page cache when possible. `key` must hold every request
+    argument the page depends on; `catalog_digest` is the catalog it shows.
+    Holes are filled for the current visitor either way.
+    """
+    if not current_app.config["PAGE_CACHE_ENABLED"]:
+        return render_template(template, **context())
+
+    page_cache.check_catalog(catalog_digest)
+    cache_key = (template, key, catalog_digest)
+    entry = page_cache.get(cache_key)
+    hit = entry is not None
+    if not hit:
+        entry = _record(template, context())
+        page_cache.put(cache_key, entry)
+
+    started = time.perf_counter()
+    html = _fill(entry, _hole_variant())
+    page_cache.record(hit, template, entry.render_ms, (time.perf_counter() - started) * 1000)
+    return html
+
+def get_page_cache_stats():
+    return page_cache.snapshot()
+
+def init_page_cache(app):
+    """
+    Registers cache_hole() for templates and applies PAGE_CACHE_MAX_BYTES.
+    """
+    page_cache.max_bytes = app.config["PAGE_CACHE_MAX_BYTES"]
+    app.jinja_env.globals["cache_hole"] = cache_hole
@@ -0,0 +1,207 @@
+import bisect
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from extensions import db
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets; the last
+# bucket catches everything slower
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Engine options that only QueuePool understands
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_use_lifo")
+
+
+class PoolTelemetry:
+    """
+    Counters for the SQLAlchemy connection pool of this process: checkouts,
+    how long they waited, overflow usage, invalidations and connection age.
+    Filled by pool events (see init_pool_telemetry) and TimedQueuePool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                "checkouts":      0,
+                "checkins":       0,
+                "connects":       0,
+                "closes":         0,
+                "invalidations":  0,
+                "soft_invalidations": 0,
+                "checkout_timeouts": 0,
+                "overflow_checkouts": 0,
+            }
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.wait_sum_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+            self.connected_at = {}  # id(connection record) -> time.time() of connect
+            self.since = time.time()
+
+    # -----------------
+    # Recorders
+    # -----------------
+
+    def record_wait(self, seconds: float, checked_out: int, overflow: int):
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            if overflow > 0:
+                self.counters["overflow_checkouts"] += 1
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def on_connect(self, _dbapi_connection, record):
+        with self._lock:
+            self.counters["connects"] += 1
+            self.connected_at[id(record)] = time.time()
+
+    def on_checkout(self, _dbapi_connection, _record, _proxy):
+        self.count("checkouts")
+
+    def on_checkin(self, _dbapi_connection, _record):
+        self.count("checkins")
+
+    def on_close(self, _dbapi_connection, record):
+        with self._lock:
+            self.counters["closes"] += 1
+            self.connected_at.pop(id(record), None)
+
+    def on_detach(self, _dbapi_connection, record):
+        with self._lock:
+            self.connected_at.pop(id(record), None)
+
+    def on_invalidate(self, _dbapi_connection, record, _exception):
+        with self._lock:
+            self.counters["invalidations"] += 1
+            self.connected_at.pop(id(record), None)
+
+    def on_soft_invalidate(self, _dbapi_connection, _record, _exception):
+        self.count("soft_invalidations")
+
+    # -----------------
+    # Reporting
+    # -----------------
+
+    def snapshot(self, pool=None):
+        """
+        Returns the counters, the wait histogram (cumulative, Prometheus style),
+        connection ages and, if given, the live state of `pool`.
+        """
+        now = time.time()
+        with self._lock:
+            checkouts = sum(self.wait_buckets)
+            cumulative, buckets = 0, {}
+            for bound, hits in zip([*WAIT_BUCKETS_MS, "+Inf"], self.wait_buckets):
+                cumulative += hits
+                buckets[f"le_{bound}"] = cumulative
+            ages = sorted(now - connected for connected in self.connected_at.values())
+            data = {
+                "since":    round(self.since, 3),
+                "counters": dict(self.counters),
+                "checkout_wait_ms": {
+                    "count":   checkouts,
+                    "sum":     round(self.wait_sum_ms, 3),
+                    "avg":     round(self.wait_sum_ms / checkouts, 3) if checkouts else 0.0,
+                    "max":     round(self.wait_max_ms, 3),
+                    "buckets": buckets,
+                },
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow":    self.peak_overflow,
+                "connection_age_s": {
+                    "open":   len(ages),
+                    "min":    round(ages[0], 1) if ages else None,
+                    "avg":    round(sum(ages) / len(ages), 1) if ages else None,
+                    "max":    round(ages[-1], 1) if ages else None,
+                },
+            }
+
+        if pool is not None:
+            data["pool"] = {"class": type(pool).__name__, "status": pool.status()}
+            if isinstance(pool, QueuePool):
+                data["pool"].update({
+                    "size":        pool.size(),
+                    "checked_in":  pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow":    max(pool.overflow(), 0),
+                })
+        return data
+
+
+pool_telemetry = PoolTelemetry()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that reports how long each checkout took, i.e. the wait for a
+    free connection (plus connect/pre-ping time), and how many were in overflow.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_telemetry.count("checkout_timeouts")
+            raise
+        pool_telemetry.record_wait(time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0))
+        return connection
+
+
+def configure_pool(app):
+    """
+    Adjusts SQLALCHEMY_ENGINE_OPTIONS before db.init_app(): uses TimedQueuePool
+    wherever SQLAlchemy would pick a QueuePool (MySQL, file-based SQLite), and
+    drops the QueuePool-only settings for other pools (in-memory SQLite).
+    """
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    pool_class = options.get("poolclass") or url.get_dialect().get_pool_class(url)
+
+    if issubclass(pool_class, QueuePool):
+        options.setdefault("poolclass", TimedQueuePool)
+    else:
+        for key in QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+def init_pool_telemetry(app):
+    """
+    Attaches the telemetry listeners to the pool of db.engine. Call after
+    db.init_app(); the listeners survive engine.dispose().
+    """
+    with app.app_context():
+        pool = db.engine.pool
+
+    for name in ("connect", "checkout", "checkin", "close", "detach", "invalidate", "soft_invalidate"):
+        handler = getattr(pool_telemetry, f"on_{name}")
+        if not event.contains(pool, name, handler):
+            event.listen(pool, name, handler)
+
+def get_pool_stats():
+    """
+    Telemetry plus the live pool state and the pool settings in effect.
+    """
+    data = pool_telemetry.snapshot(db.engine.pool)
+    options = current_app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    data["settings"] = {
+        key: options[key]
+        for key in (*QUEUE_POOL_OPTIONS, "pool_recycle", "pool_pre_ping")
+        if key in options
+    }
+    return data
@@ -1,4 +1,5 @@
 from flask import (
+    Response,
     render_template,
     request,
     redirect,
@@ -6,15 +7,57 @@ from flask import (
     flash,
     session,
     jsonify,
+    stream_with_context,
 )
 from extensions import db
+from internal import internal_only, staff_token_required
+from http_cache import conditional
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from page_cache import get_page_cache_stats, render_cached
+from pool_telemetry import get_pool_stats
+from session_store import get_session_stats, regenerate_session
+from sql_instrumentation import get_sql_profile
+from template_cache import get_template_stats
+from warmup import check_ready, get_warmup_state
 from services.rooms_service import (
-    list_rooms_paginated,
     get_room_with_type,
+    get_rooms_by_ids,
     load_amenities,
 )
+from services.audit_service import get_audit_stats
+from services.audit_retention_service import AuditLogError, parse_audit_range, query_audit_log
+from services.catalog_service import catalog_stats, get_catalog_digest
+from services.availability_service import find_available_room_ids
+from services.pricing_service import quote_rooms
+from services.export_service import (
+    EXPORT_FORMATS,
+    MAX_BATCH_SIZE,
+    ExportFilterError,
+    ExportStats,
+    export_reservations,
+    parse_export_filters,
+)
+from services.reporting_service import (
+    REPORT_GROUPS,
+    ReportError,
+    occupancy_report,
+    parse_report_range,
+)
+from services.search_service import (
+    parse_search_filters,
+    search_args,
+    search_index_stats,
+    search_rooms,
+)
+from services.calendar_service import (
+    parse_month,
+    get_month_occupancy,
+    CalendarError,
+)
 from services.booking_service import (
     parse_and_validate_booking,
+    parse_date_range,
+    parse_guests,
     build_pending_reservation,
     date_today,
     DATE_FMT,
@@ -26,6 +69,7 @@ from services.reservations_service import (
     room_is_available,
     confirm_reservation,
     write_audit_log,
+    RoomUnavailableError,
 )
 from services.auth_service import (
     validate_registration,
@@ -36,8 +80,9 @@ from services.auth_service import (
 )
 from services.team_service import (
     save_team_message,
-    get_team_with_contributions,
-    get_team_member_with_contributions,
+    get_team_json,
+    get_team_member_json,
+    get_team_version,
     TeamMessageError,
 )
 
@@ -49,6 +94,7 @@ def register_routes(app):
     # Landing Page
     # --------------
     @app.route("/")
+    @conditional("page")
     def landing():
         return render_template("index.html")
 
@@ -56,6 +102,7 @@ def register_routes(app):
     # Attraction Page
     # -----------------
     @app.route("/attraction.html")
+    @conditional("page")
     def attraction():
         return render_template("attraction.html")
 
@@ -63,13 +110,21 @@ def register_routes(app):
     # About Us Page
     # ---------------
     @app.route("/about.html")
+    @conditional("page")
     def about():
         return render_template("about.html")
 
     # ------------------------
     # Lodge Reservation Page
     # ------------------------
+    def lodge_reservation_versions():
+        # Filtered listings (availability depends on live bookings): not cached
+        if search_args(request.args):
+            return None
+        return [get_catalog_digest(), date_today()]
+
     @app.route("/lodge_reservation.html")
+    @conditional("page", versions=lodge_reservation_versions)
     def lodge_reservation():
         try:
             page = int(request.args.get("page", 1))
@@ -78,19 +133,50 @@ def register_routes(app):
 
         per_page = 3 # Rooms
 
-        rooms, total_pages = list_rooms_paginated(page=page, per_page=per_page)
-
-        return render_template(
-            "lodge_reservation.html",
-            rooms=rooms,
-            page=page,
-            total_pages=total_pages,
-        )
+        # Optional filters (?check_in=&check_out=&guests=&amenity=&ada=&max_price=...)
+        filters = search_args(request.args)
+        try:
+            search = parse_search_filters(filters)
+        except BookingValidationError as e:
+            flash(str(e), "error")
+            filters = {}
+            search = parse_search_filters(filters)
+
+        # Pages past the end show the last one (and share its cache entry)
+        result = search_rooms(search, page=page, per_page=per_page)
+        if result.page > result.total_pages:
+            result = search_rooms(search, page=result.total_pages, per_page=per_page)
+
+        def context():
+            return {
+                "rooms": result.rooms,
+                "totals": quote_rooms(result.rooms, search.check_in, search.check_out) if search.check_in else {},
+                "nights": (search.check_out - search.check_in).days if search.check_in else None,
+                "page": result.page,
+                "total_pages": result.total_pages,
+                "facets": result.facets,
+                "filters": filters,
+                "today_str": date_today(),
+            }
+
+        # The unfiltered listing only depends on the page and the catalog
+        if not filters:
+            return render_cached(
+                "lodge_reservation.html", (result.page, date_today()), get_catalog_digest(), context
+            )
+        return render_template("lodge_reservation.html", **context())
 
     # ---------------------------------
     # Room details Page + booking step
     # ---------------------------------
+    def room_details_versions(room_id):
+        # Unknown rooms redirect with a flash message: not cached
+        if get_room_with_type(room_id) is None:
+            return None
+        return [get_catalog_digest(), date_today()]
+
     @app.route("/rooms/<int:room_id>", methods=["GET", "POST"])
+    @conditional("page", versions=room_details_versions)
     def room_details(room_id):
         room = get_room_with_type(room_id)
 
@@ -138,28 +224,25 @@ def register_routes(app):
             # Otherwise, show reservation summary page
             return redirect(url_for("reservation_summary"))
 
-        # GET request: render details page
-        return render_template(
+        # GET request: render details page (from the page cache when possible)
+        return render_cached(
             "room_details.html",
-            room=room,
-            amenities=load_amenities(room_id),
-            today_str=date_today(),
+            (room_id, date_today()),
+            get_catalog_digest(),
+            lambda: {"room": room, "amenities": load_amenities(room_id), "today_str": date_today()},
         )
 
     # -------------------------
     # Reservation Lookup Page
     # -------------------------
     @app.route("/reservation_lookup.html", methods=["GET"])
+    @conditional("private")
     def reservation_lookup():
         # Searches query/input (?q=).
         q = (request.args.get("q") or "").strip()
 
-        # Page number (?page=). Sanitizes to a positive int; default = 1
-        page_param = request.args.get("page", "1")
-        try:
-            page = max(int(page_param), 1)
-        except ValueError:
-            page = 1
+        # Opaque keyset cursor (?cursor=) from the previous/next links; none = first page
+        cursor = request.args.get("cursor") or None
 
         per_page = 3
         customer_id = session.get("customer_id")
@@ -170,29 +253,27 @@ def register_routes(app):
                 "reservation_lookup.html",
                 q="",
                 reservations=[],
-                page=1,
-                total_pages=1,
-                total=0,
+                pagination={"page": 1, "total": 0, "total_pages": 1,
+                            "next_cursor": None, "prev_cursor": None},
             )
         
-        # Fetches reservations with filters and pagination from reservations_service
-        reservations, total, total_pages = list_reservations(
-            q=q, customer_id=customer_id, page=page, per_page=per_page
+        # Fetches reservations with filters and keyset pagination from reservations_service
+        reservations, pagination = list_reservations(
+            q=q, customer_id=customer_id, per_page=per_page, cursor=cursor
         )
 
         return render_template(
             "reservation_lookup.html",
             q=q,
             reservations=reservations,
-            page=page,
-            total_pages=total_pages,
-            total=total,
+            pagination=pagination,
         )
 
     # --------------------------
     # Reservation Summary Page
     # --------------------------
     @app.route("/reservation_summary.html", methods=["GET", "POST"])
+    @conditional("private")
     def reservation_summary():
         pending = session.get("pending_reservation")
 
@@ -207,7 +288,7 @@ def register_routes(app):
 
         # Recomputes totals safely on the server
         try:
-            nights, subtotal = compute_totals(pending)
+            quote = compute_totals(pending)
         except Exception:
             flash("Your reservation data is invalid. Please try again.", "error")
             session.pop("pending_reservation", None)
@@ -230,16 +311,13 @@ def register_routes(app):
                 try:
                     reservation_id = confirm_reservation(pending, session["customer_id"])
 
-                    # Attempts audit log (does not fail booking if this errors)
-                    try:
-                        write_audit_log(
-                            customer_id=session["customer_id"],
-                            room_number=pending["room_number"],
-                            in_date=pending["check_in"],
-                            out_date=pending["check_out"],
-                        )
-                    except Exception:
-                        db.session.rollback()
+                    # Queued for the background audit writer; never fails the booking
+                    write_audit_log(
+                        customer_id=session["customer_id"],
+                        room_number=pending["room_number"],
+                        in_date=pending["check_in"],
+                        out_date=pending["check_out"],
+                    )
 
                     session.pop("pending_reservation", None)
                     flash(
@@ -249,6 +327,9 @@ def register_routes(app):
                     )
                     return redirect(url_for("attraction"))
 
+                except RoomUnavailableError:
+                    flash("Sorry, this room is no longer available for those dates.", "error")
+                    return redirect(url_for("room_details", room_id=pending["room_id"]))
                 except Exception as e:
                     db.session.rollback()
                     flash(f"Failed to save reservation: {e}", "error")
@@ -258,14 +339,15 @@ def register_routes(app):
         return render_template(
             "reservation_summary.html",
             reservation=pending,
-            nights=nights,
-            subtotal=subtotal,
+            nights=quote.nights,
+            quote=quote,
         )
 
     # -------------------
     # Registration Page
     # -------------------
     @app.route("/registration", methods=["GET", "POST"])
+    @conditional("page")
     def registration():
         if request.method == "POST" and all(
             field in request.form for field in ["first", "last", "email", "password", "phone"]
@@ -306,7 +388,8 @@ def register_routes(app):
                 # Authenticates users
                 customer = authenticate_user(email, password)
 
-                # Stores user info in session
+                # Stores user info in session (under a new session id)
+                regenerate_session(session)
                 session["customer_id"] = customer.CustomerID
                 session["customer_email"] = customer.Email
                 session["customer_phone"] = customer.Phone
@@ -337,6 +420,149 @@ def register_routes(app):
         flash("You have been successfully logged out.", "success")
         return redirect(url_for("landing"))
 
+    # ---------------------
+    # Availability Search
+    # ---------------------
+
+    # API: Returns every room free for a date range (?check_in=&check_out=&guests=)
+    @app.route("/api/availability", methods=["GET"])
+    def api_availability():
+        try:
+            check_in, check_out = parse_date_range(
+                request.args.get("check_in", ""), request.args.get("check_out", "")
+            )
+            guests_str = request.args.get("guests", "").strip()
+            guests = parse_guests(guests_str) if guests_str else None
+        except BookingValidationError as e:
+            return jsonify({"error": str(e)}), 400
+
+        rooms = get_rooms_by_ids(find_available_room_ids(check_in, check_out, guests))
+        totals = quote_rooms(rooms, check_in, check_out)
+
+        return jsonify({
+            "check_in":  check_in.strftime(DATE_FMT),
+            "check_out": check_out.strftime(DATE_FMT),
+            "nights":    (check_out - check_in).days,
+            "guests":    guests,
+            "rooms": [
+                {
+                    "room_id":         room.RoomID,
+                    "room_number":     room.RoomNumber,
+                    "room_type":       room.TypeName,
+                    "bed_config":      room.BedConfiguration,
+                    "price_per_night": float(room.PricePerNight),
+                    "max_occupancy":   int(room.MaxOccupancy),
+                    "ada_accessible":  bool(room.ADAAccessible),
+                    "image_path":      room.ImagePath,
+                    "total_price":     totals[room.RoomID],
+                    "url":             url_for("room_details", room_id=room.RoomID),
+                }
+                for room in rooms
+            ],
+        })
+
+    @app.route("/api/rooms/search", methods=["GET"])
+    def api_rooms_search():
+        try:
+            search = parse_search_filters(search_args(request.args))
+            page = int(request.args.get("page", 1))
+            per_page = min(int(request.args.get("per_page", 20)), 100)
+        except BookingValidationError as e:
+            return jsonify({"error": str(e)}), 400
+        except ValueError:
+            return jsonify({"error": "page and per_page must be whole numbers."}), 400
+        if page < 1 or per_page < 1:
+            return jsonify({"error": "page and per_page must be at least 1."}), 400
+
+        result = search_rooms(search, page=page, per_page=per_page)
+        # Priced only when the search has a stay to price
+        totals = quote_rooms(result.rooms, search.check_in, search.check_out) if search.check_in else {}
+
+        return jsonify({
+            "filters": {
+                "amenity":   list(search.amenity_ids),
+                "ada":       search.ada,
+                "guests":    search.guests,
+                "min_price": search.min_price,
+                "max_price": search.max_price,
+                "room_type": search.room_type_id,
+                "check_in":  search.check_in.strftime(DATE_FMT) if search.check_in else None,
+                "check_out": search.check_out.strftime(DATE_FMT) if search.check_out else None,
+            },
+            "total":       result.total,
+            "page":        result.page,
+            "per_page":    per_page,
+            "total_pages": result.total_pages,
+            "facets":      result.facets,
+            "rooms": [
+                {
+                    "room_id":         room.RoomID,
+                    "room_number":     room.RoomNumber,
+                    "room_type":       room.TypeName,
+                    "bed_config":      room.BedConfiguration,
+                    "price_per_night": float(room.PricePerNight),
+                    "max_occupancy":   int(room.MaxOccupancy),
+                    "ada_accessible":  bool(room.ADAAccessible),
+                    "image_path":      room.ImagePath,
+                    "total_price":     totals.get(room.RoomID),
+                    "url":             url_for("room_details", room_id=room.RoomID),
+                }
+                for room in result.rooms
+            ],
+        })
+
+    # -------------------
+    # Occupancy Calendar
+    # -------------------
+
+    def calendar_response(payload, occupancy, room_id=None):
+        """
+        Wraps a calendar payload in a short-lived, revalidatable JSON response.
+        """
+        response = jsonify(payload)
+        response.set_etag(f"{occupancy.etag}-{room_id}" if room_id else occupancy.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config["CALENDAR_CACHE_TTL"]
+        return response.make_conditional(request)
+
+    # API: Booked nights per room for a month (?month=YYYY-MM).
+    # "booked" is a bitset: bit (d - 1) is set when the night of day d is taken.
+    @app.route("/api/rooms/calendar", methods=["GET"])
+    def api_rooms_calendar():
+        try:
+            year, month = parse_month(request.args.get("month"))
+        except CalendarError as e:
+            return jsonify({"error": str(e)}), 400
+
+        occupancy = get_month_occupancy(year, month)
+
+        return calendar_response({
+            "month": occupancy.label,
+            "days":  occupancy.days,
+            "rooms": {str(room_id): bits for room_id, bits in occupancy.bitmaps.items()},
+        }, occupancy)
+
+    # API: Booked nights for a single room (used by the room details date pickers)
+    @app.route("/api/rooms/<int:room_id>/calendar", methods=["GET"])
+    def api_room_calendar(room_id):
+        try:
+            year, month = parse_month(request.args.get("month"))
+        except CalendarError as e:
+            return jsonify({"error": str(e)}), 400
+
+        occupancy = get_month_occupancy(year, month)
+
+        if room_id not in occupancy.bitmaps:
+            return jsonify({"error": "Room not found"}), 404
+
+        return calendar_response({
+            "room_id":      room_id,
+            "month":        occupancy.label,
+            "days":         occupancy.days,
+            "booked":       occupancy.bitmaps[room_id],
+            "booked_dates": occupancy.booked_dates(room_id),
+        }, occupancy, room_id)
+
     # ---------------------------------------
     # TEAM FEATURES OF ABOUT US / CONTACT US
     # ---------------------------------------
@@ -368,20 +594,166 @@ def register_routes(app):
 
     # API: Returns JSON for all team members with their contributions.
     @app.route("/api/team", methods=["GET"])
+    @conditional("public", versions=lambda: [get_team_version()])
     def api_team():
-        team = get_team_with_contributions()
-        return jsonify(team)
+        _version, body = get_team_json()
+        return Response(body, mimetype="application/json")
 
     # API: Get a single team member by ID
+    def team_member_versions(member_id):
+        # A missing member is a 404, never a 304
+        version, body = get_team_member_json(member_id)
+        return None if body is None else [version]
+
     @app.route("/api/team/<int:member_id>", methods=["GET"])
+    @conditional("public", versions=team_member_versions)
     def api_team_member(member_id):
-        member = get_team_member_with_contributions(member_id)
+        _version, body = get_team_member_json(member_id)
         
-        if not member:
+        if body is None:
             return jsonify({"error": "Team member not found"}), 404
         
-        return jsonify(member)
+        return Response(body, mimetype="application/json")
     
+    # ----------------------------------------
+    # Health checks (load balancer / orchestrator probes)
+    # ----------------------------------------
+
+    # The process is up and answering requests
+    @app.route("/healthz/live", methods=["GET"])
+    def healthz_live():
+        response = jsonify({"status": "alive"})
+        response.cache_control.no_store = True
+        return response
+
+    # Warmup done and the DB pool open; 503 until then (see warmup.py)
+    @app.route("/healthz/ready", methods=["GET"])
+    def healthz_ready():
+        ready = check_ready(app)
+        response = jsonify({"status": "ready" if ready else "not ready", "phase": get_warmup_state()["phase"]})
+        response.status_code = 200 if ready else 503
+        response.cache_control.no_store = True
+        return response
+
+    # ----------------------------------------
+    # Internal operational endpoints (stats)
+    # ----------------------------------------
+
+    # Room catalog snapshot hit/miss/refresh counters
+    @app.route("/internal/catalog", methods=["GET"])
+    @internal_only
+    def internal_catalog():
+        return jsonify({**catalog_stats(), "search_index": search_index_stats()})
+
+    # Occupancy and revenue per day/month and room type, from the rollup table
+    @app.route("/internal/reports/occupancy", methods=["GET"])
+    @internal_only
+    def internal_occupancy_report():
+        group = request.args.get("group", "month")
+        if group not in REPORT_GROUPS:
+            return jsonify({"error": f"group must be one of: {', '.join(REPORT_GROUPS)}."}), 400
+        try:
+            start, end = parse_report_range(request.args.get("from", ""), request.args.get("to", ""))
+            room_type = request.args.get("room_type", "").strip()
+            room_type_id = int(room_type) if room_type else None
+        except ReportError as e:
+            return jsonify({"error": str(e)}), 400
+        except ValueError:
+            return jsonify({"error": "room_type must be a RoomTypeID."}), 400
+
+        return jsonify(occupancy_report(start, end, group=group, room_type_id=room_type_id))
+
+    # Streams every matching reservation as CSV / NDJSON (server-side cursor)
+    @app.route("/internal/export/reservations", methods=["GET"])
+    @internal_only
+    @staff_token_required
+    def internal_export_reservations():
+        fmt = request.args.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}."}), 400
+        try:
+            where_sql, params = parse_export_filters(
+                date_from=request.args.get("from", ""),
+                date_to=request.args.get("to", ""),
+                customer=request.args.get("customer", ""),
+                status=request.args.get("status", ""),
+            )
+            batch_size = min(max(int(request.args.get("batch_size", 2000)), 1), MAX_BATCH_SIZE)
+        except ExportFilterError as e:
+            return jsonify({"error": str(e)}), 400
+        except ValueError:
+            return jsonify({"error": "batch_size must be a whole number."}), 400
+
+        stats = ExportStats()
+
+        def generate():
+            try:
+                yield from export_reservations(fmt, where_sql, params, batch_size, stats)
+            finally:
+                app.logger.info("Reservations export (%s): %s", fmt, stats.summary())
+
+        response = Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[fmt])
+        response.headers["Content-Disposition"] = f'attachment; filename="reservations-{date_today()}.{fmt}"'
+        response.cache_control.no_store = True
+        return response
+
+    # Warmup steps of this worker (timings and errors)
+    @app.route("/internal/warmup", methods=["GET"])
+    @internal_only
+    def internal_warmup():
+        return jsonify(get_warmup_state())
+
+    @app.route("/internal/pool", methods=["GET"])
+    @internal_only
+    def internal_pool():
+        return jsonify(get_pool_stats())
+
+    @app.route("/metrics", methods=["GET"])
+    @internal_only
+    def metrics():
+        return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+    @app.route("/internal/sql", methods=["GET"])
+    @internal_only
+    def internal_sql():
+        return jsonify(get_sql_profile())
+
+    @app.route("/internal/audit", methods=["GET"])
+    @internal_only
+    def internal_audit():
+        return jsonify(get_audit_stats())
+
+    # Audit events of a time range (reads only the months it covers), paged by `next`
+    @app.route("/internal/audit/events", methods=["GET"])
+    @internal_only
+    @staff_token_required
+    def internal_audit_events():
+        try:
+            start, end = parse_audit_range(request.args.get("from", ""), request.args.get("to", ""))
+            customer = request.args.get("customer", "").strip()
+            customer_id = int(customer) if customer else None
+            limit = int(request.args.get("limit", 100))
+            events = query_audit_log(
+                start, end, customer_id=customer_id, action=request.args.get("action", "").strip() or None,
+                after=request.args.get("after", "").strip() or None, limit=limit,
+            )
+        except AuditLogError as e:
+            return jsonify({"error": str(e)}), 400
+        except ValueError:
+            return jsonify({"error": "customer and limit must be whole numbers."}), 400
+
+        return jsonify({"from": start.isoformat(), "to": end.isoformat(), **events})
+
+    @app.route("/internal/page-cache", methods=["GET"])
+    @internal_only
+    def internal_page_cache():
+        return jsonify({**get_page_cache_stats(), "templates": get_template_stats()})
+
+    @app.route("/internal/sessions", methods=["GET"])
+    @internal_only
+    def internal_sessions():
+        return jsonify(get_session_stats(app))
+
     # --------------------
     # 404 Error Handler
     # --------------------
@@ -0,0 +1,386 @@
+"""
+Synthetic data in the shapes of db/data.sql (room types, amenities, rooms,
+customers, reservations + their roomnight rows) at any scale, for benchmarks
+and capacity planning. Rows are generated lazily and inserted in batches of
+executemany() calls on one connection, so memory stays flat however many rows
+are requested. PyMySQL turns each executemany() of an INSERT ... VALUES into
+multi-row INSERT statements (up to ~1 MB each).
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from extensions import db
+from services.availability_service import availability_index
+from services.calendar_service import calendar_cache
+from services.catalog_service import bump_catalog_version
+from services.reporting_service import rebuild_occupancy_rollup
+from services.reservations_service import INSERT_ROOM_NIGHTS, price_room_nights
+
+# Same hash as the sample customers in data.sql (password: Password123); hashing
+# a million distinct passwords would take longer than the rest of the seeding
+SEED_PASSWORD_HASH = (
+    "scrypt:32768:8:1$qf39ADPITLzbzecX$57a22d2620dbf5dd3ee8e93e9b0a4dc6bfacb18152e7d6048596849e0aba970"
+    "78796a84d736317983992c38212a5f12e7b86c83770242041da112160ab63b6ae"
+)
+
+# Named sizes; "xl" is roughly production scale
+SCALES = {
+    "tiny":   {"rooms": 50,     "customers": 1_000,     "reservations": 5_000},
+    "small":  {"rooms": 500,    "customers": 20_000,    "reservations": 100_000},
+    "medium": {"rooms": 2_000,  "customers": 200_000,   "reservations": 1_000_000},
+    "xl":     {"rooms": 10_000, "customers": 1_000_000, "reservations": 10_000_000},
+}
+
+ROOM_TYPES = [
+    # (TypeName, BedConfiguration, PricePerNight, MaxOccupancy)
+    ("Standard Queen",  "1 Queen", 141.75, 2),
+    ("Standard Double", "2 Full",  126.00, 4),
+    ("Deluxe King",     "1 King",  168.00, 2),
+    ("Bay View Suite",  "2 Queen", 157.50, 4),
+]
+
+AMENITIES = [
+    ("WiFi",        "High-speed wireless internet"),
+    ("Ocean View",  "Partial or full view of the bay"),
+    ("Mini-Fridge", "In-room mini-fridge"),
+    ("Breakfast",   "Continental breakfast"),
+    ("Parking",     "On-site self-parking"),
+    ("ADA Shower",  "Accessible roll-in shower"),
+]
+
+ROOM_IMAGES = [
+    "images/room101.jpeg", "images/room102.jpeg", "images/room103.jpeg",
+    "images/room201.jpeg", "images/room202.jpeg", "images/room301.jpeg",
+]
+ROOM_DESCRIPTIONS = [
+    "Cozy queen, garden side", "Two full beds, courtyard", "King room, partial bay view",
+    "King room, near elevator", "Top-floor suite with full bay view", "Quiet room facing the forest",
+]
+FIRST_NAMES = ["Amit", "Noel", "Kyle", "Steve", "Riese", "Maria", "James", "Aiko", "Omar", "Lena", "Priya", "Diego"]
+LAST_NAMES = ["Rizal", "Miranda", "Conner", "Stylin", "Bohnak", "Garcia", "Smith", "Tanaka", "Haddad", "Novak"]
+
+# Nights per stay (1-7), weighted towards short stays
+STAY_LENGTHS = (1, 2, 3, 4, 5, 6, 7)
+STAY_WEIGHTS = (20, 30, 20, 12, 8, 5, 5)
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _next_id(conn, table: str, column: str):
+    return (conn.execute(text(f"SELECT MAX({column}) FROM {table}")).scalar() or 0) + 1
+
+def ensure_room_types_and_amenities(conn):
+    """
+    Inserts the data.sql room types and amenities that are missing.
+    Returns ({RoomTypeID: MaxOccupancy}, {amenity name: AmenityID}).
+    """
+    existing = set(conn.execute(text("SELECT TypeName FROM roomtype")).scalars())
+    missing = [
+        {"name": name, "beds": beds, "price": price, "occ": occ}
+        for name, beds, price, occ in ROOM_TYPES if name not in existing
+    ]
+    if missing:
+        conn.execute(text("""
+            INSERT INTO roomtype (TypeName, BedConfiguration, PricePerNight, MaxOccupancy)
+            VALUES (:name, :beds, :price, :occ)
+        """), missing)
+
+    existing = set(conn.execute(text("SELECT Name FROM amenity")).scalars())
+    missing = [{"name": name, "descr": descr} for name, descr in AMENITIES if name not in existing]
+    if missing:
+        conn.execute(text("INSERT INTO amenity (Name, Description) VALUES (:name, :descr)"), missing)
+    conn.commit()
+
+    room_types = dict(conn.execute(text("SELECT RoomTypeID, MaxOccupancy FROM roomtype")).all())
+    amenities = dict(conn.execute(text("SELECT Name, AmenityID FROM amenity")).all())
+    return room_types, amenities
+
+def generate_rooms(count: int, first_id: int, room_types: dict, rng: random.Random):
+    type_ids = sorted(room_types)
+    for i in range(count):
+        room_id = first_id + i
+        yield {
+            "id":     room_id,
+            "number": f"S{room_id}",
+            "type":   type_ids[i % len(type_ids)],
+            "ada":    1 if rng.random() < 0.08 else 0,
+            "descr":  rng.choice(ROOM_DESCRIPTIONS),
+            "image":  ROOM_IMAGES[i % len(ROOM_IMAGES)],
+        }
+
+def room_amenity_rows(room: dict, amenities: dict, rng: random.Random):
+    names = ["WiFi", "Mini-Fridge", "Parking"]
+    if rng.random() < 0.3:
+        names.append("Ocean View")
+    if rng.random() < 0.2:
+        names.append("Breakfast")
+    if room["ada"]:
+        names.append("ADA Shower")
+    return [{"room": room["id"], "amenity": amenities[name]} for name in names if name in amenities]
+
+def generate_customers(count: int, first_id: int, rng: random.Random, registered_since: datetime):
+    span = int((datetime.now() - registered_since).total_seconds())
+    for i in range(count):
+        customer_id = first_id + i
+        yield {
+            "id":    customer_id,
+            "first": rng.choice(FIRST_NAMES),
+            "last":  rng.choice(LAST_NAMES),
+            "email": f"guest{customer_id}@example.com",
+            "phone": f"773-555-{customer_id % 10000:04d}",
+            "hash":  SEED_PASSWORD_HASH,
+            "reg":   registered_since + timedelta(seconds=rng.randrange(max(span, 1))),
+        }
+
+def generate_stays(room_id: int, count: int, max_occupancy: int, customer_ids: range,
+                   first_reservation_id: int, last_checkout: date, rng: random.Random):
+    """
+    Yields reservation rows for `count` non-overlapping stays in one room,
+    walking backwards in time from `last_checkout`.
+    """
+    cursor = last_checkout
+    for i in range(count):
+        check_out = cursor - timedelta(days=rng.randint(0, 3))
+        nights = rng.choices(STAY_LENGTHS, STAY_WEIGHTS)[0]
+        check_in = check_out - timedelta(days=nights)
+        cursor = check_in
+
+        roll = rng.random()
+        status = "Confirmed" if roll < 0.85 else ("Cancelled" if roll < 0.97 else "Pending")
+        reservation_id = first_reservation_id + i
+        reserved = datetime.combine(check_in, datetime.min.time()) - timedelta(
+            days=rng.randint(1, 120), seconds=rng.randrange(86400)
+        )
+        yield {
+            "id":       reservation_id,
+            "customer": rng.choice(customer_ids),
+            "room":     room_id,
+            "in_date":  check_in,
+            "out_date": check_out,
+            "guests":   rng.randint(1, max_occupancy),
+            "status":   status,
+            "reserved": reserved,
+        }
+
+
+INSERT_ROOM = text("""
+    INSERT INTO room (RoomID, RoomNumber, RoomTypeID, ADAAccessible, Description, ImagePath)
+    VALUES (:id, :number, :type, :ada, :descr, :image)
+""")
+INSERT_ROOM_AMENITY = text("INSERT INTO roomamenity (RoomID, AmenityID) VALUES (:room, :amenity)")
+INSERT_CUSTOMER = text("""
+    INSERT INTO customer (CustomerID, FirstName, LastName, Email, Phone, PasswordHash, RegistrationDate)
+    VALUES (:id, :first, :last, :email, :phone, :hash, :reg)
+""")
+INSERT_RESERVATION = text("""
+    INSERT INTO reservation
+        (ReservationID, CustomerID, RoomID, CheckInDate, CheckOutDate, NumberOfGuests, ReservationStatus, DateReserved)
+    VALUES (:id, :customer, :room, :in_date, :out_date, :guests, :status, :reserved)
+""")
+
+
+# -----------------
+# Bulk load mode
+# -----------------
+
+# Secondary indexes dropped during the load and rebuilt once at the end:
+# (table, index name, columns). MySQL refuses to drop an index that backs a
+# foreign key, so only the ones that don't are listed there.
+DEFERRED_INDEXES = {
+    "mysql": [
+        ("reservation", "DateReserved", "(DateReserved, ReservationID)"),
+    ],
+    "sqlite": [
+        ("room",        "room_RoomTypeID",                    "(RoomTypeID)"),
+        ("roomamenity", "roomamenity_AmenityID",              "(AmenityID)"),
+        ("reservation", "reservation_CustomerID_DateReserved", "(CustomerID, DateReserved, ReservationID)"),
+        ("reservation", "reservation_DateReserved",           "(DateReserved, ReservationID)"),
+        ("reservation", "reservation_RoomID",                 "(RoomID)"),
+        ("roomnight",   "roomnight_ReservationID",            "(ReservationID)"),
+    ],
+}
+
+def _drop_index(conn, dialect: str, table: str, name: str):
+    if dialect == "mysql":
+        conn.execute(text(f"ALTER TABLE {table} DROP INDEX {name}"))
+    else:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def _create_index(conn, dialect: str, table: str, name: str, columns: str):
+    if dialect == "mysql":
+        conn.execute(text(f"ALTER TABLE {table} ADD KEY {name} {columns}"))
+    else:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}"))
+
+def _existing_indexes(conn, dialect: str):
+    if dialect == "mysql":
+        rows = conn.execute(text("""
+            SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+        """))
+    else:
+        rows = conn.execute(text("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index'"))
+    return {(table.lower(), name) for table, name in rows}
+
+@contextmanager
+def bulk_load(conn, defer_indexes: bool = True, log=print):
+    """
+    Puts `conn` in bulk load mode for the duration of the block: foreign key
+    (and on MySQL unique) checks off, as db/data.sql does, and the
+    DEFERRED_INDEXES dropped, then rebuilt in one pass at the end, which
+    is much cheaper than maintaining them row by row. The checks are turned
+    back on and the indexes rebuilt even if the load fails.
+    """
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        conn.execute(text("SET UNIQUE_CHECKS = 0"))
+    elif dialect == "sqlite":
+        conn.execute(text("PRAGMA foreign_keys = OFF"))
+        conn.execute(text("PRAGMA synchronous = OFF"))
+    conn.commit()
+
+    deferred = []
+    if defer_indexes:
+        existing = _existing_indexes(conn, dialect) if dialect in DEFERRED_INDEXES else set()
+        deferred = [index for index in DEFERRED_INDEXES.get(dialect, []) if (index[0], index[1]) in existing]
+        for table, name, _columns in deferred:
+            _drop_index(conn, dialect, table, name)
+        conn.commit()
+    try:
+        yield
+    finally:
+        conn.rollback()
+        if deferred:
+            started = time.perf_counter()
+            for table, name, columns in deferred:
+                _create_index(conn, dialect, table, name, columns)
+            conn.commit()
+            log(f"rebuilt {len(deferred)} indexes in {time.perf_counter() - started:.1f}s")
+        if dialect == "mysql":
+            conn.execute(text("SET UNIQUE_CHECKS = 1"))
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+        elif dialect == "sqlite":
+            conn.execute(text("PRAGMA synchronous = FULL"))
+        conn.commit()
+
+
+class _Progress:
+    """
+    Rows inserted per table and the time it took, for the rows/s report.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.rows = {}
+        self.started = {}
+
+    def start(self, table: str):
+        self.rows.setdefault(table, 0)
+        self.started[table] = time.perf_counter()
+
+    def add(self, table: str, count: int):
+        self.rows[table] = self.rows.get(table, 0) + count
+
+    def done(self, *tables):
+        for table in tables:
+            seconds = time.perf_counter() - self.started[table]
+            rows = self.rows.get(table, 0)
+            self.log(f"{table}: {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+def seed_database(rooms: int, customers: int, reservations: int, seed: int = 460,
+                  batch_size: int = 5000, defer_indexes: bool = True, log=print):
+    """
+    Adds `rooms` rooms (with amenities), `customers` customers and
+    `reservations` non-overlapping reservations (spread evenly over the new
+    rooms, ending ~6 months from today) to the database, in bulk load mode
+    (see bulk_load). Existing rows are kept; new ids start above the current
+    maximum. Every batch is committed, so at most `batch_size` generated rows
+    are held in memory.
+    Returns the number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    progress = _Progress(log)
+
+    with db.engine.connect() as conn:
+        room_types, amenities = ensure_room_types_and_amenities(conn)
+        prices = dict(conn.execute(text("SELECT RoomTypeID, PricePerNight FROM roomtype")).all())
+        first_room = _next_id(conn, "room", "RoomID")
+        first_customer = _next_id(conn, "customer", "CustomerID")
+        first_reservation = _next_id(conn, "reservation", "ReservationID")
+
+        with bulk_load(conn, defer_indexes=defer_indexes, log=log):
+            progress.start("room")
+            progress.start("roomamenity")
+            new_rooms = []
+            for batch in _batched(generate_rooms(rooms, first_room, room_types, rng), batch_size):
+                conn.execute(INSERT_ROOM, batch)
+                links = [link for room in batch for link in room_amenity_rows(room, amenities, rng)]
+                conn.execute(INSERT_ROOM_AMENITY, links)
+                conn.commit()
+                new_rooms.extend((room["id"], room["type"], room_types[room["type"]]) for room in batch)
+                progress.add("room", len(batch))
+                progress.add("roomamenity", len(links))
+            progress.done("room", "roomamenity")
+
+            progress.start("customer")
+            registered_since = datetime.now() - timedelta(days=5 * 365)
+            for batch in _batched(generate_customers(customers, first_customer, rng, registered_since), batch_size):
+                conn.execute(INSERT_CUSTOMER, batch)
+                conn.commit()
+                progress.add("customer", len(batch))
+            progress.done("customer")
+
+            if new_rooms and customers:
+                progress.start("reservation")
+                progress.start("roomnight")
+                customer_ids = range(first_customer, first_customer + customers)
+                last_checkout = date.today() + timedelta(days=180)
+                per_room, extra = divmod(reservations, len(new_rooms))
+
+                room_type_of = {room_id: room_type for room_id, room_type, _occupancy in new_rooms}
+
+                def stays():
+                    next_reservation = first_reservation
+                    for index, (room_id, _room_type, max_occupancy) in enumerate(new_rooms):
+                        count = per_room + (1 if index < extra else 0)
+                        yield from generate_stays(
+                            room_id, count, max_occupancy, customer_ids, next_reservation, last_checkout, rng
+                        )
+                        next_reservation += count
+
+                for batch in _batched(stays(), batch_size):
+                    # Confirmed stays hold their nights, priced like confirm_reservation() does
+                    night_rows = price_room_nights([
+                        (r["id"], r["room"], room_type_of[r["room"]], prices[room_type_of[r["room"]]],
+                         r["in_date"], r["out_date"])
+                        for r in batch if r["status"] == "Confirmed"
+                    ])
+                    conn.execute(INSERT_RESERVATION, batch)
+                    if night_rows:
+                        conn.execute(INSERT_ROOM_NIGHTS, night_rows)
+                    conn.commit()
+                    progress.add("reservation", len(batch))
+                    progress.add("roomnight", len(night_rows))
+                progress.done("reservation", "roomnight")
+
+    # New rooms and bookings must show up in the catalog snapshot and the caches
+    bump_catalog_version()
+    availability_index.invalidate()
+    calendar_cache.invalidate()
+
+    # The generated bookings didn't go through confirm_reservation(): recompute the rollup
+    rebuild_occupancy_rollup(log=log)
+    return dict(progress.rows)
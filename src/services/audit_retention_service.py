@@ -0,0 +1,402 @@
+import gzip
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from extensions import db
+
+# auditlog is split by month so that a time range only reads the months it
+# covers and old months can be removed without a DELETE:
+#  - MySQL: RANGE COLUMNS (Timestamp) partitions pYYYYMM, plus p_history for
+#    everything older and pfuture (MAXVALUE) so an insert never fails when
+#    `flask audit roll` hasn't added the coming months yet (see db/schema.sql)
+#  - SQLite (no partitioning): the writer always inserts into `auditlog`;
+#    roll_audit_log() renames it to auditlog_YYYYMM once a month has ended
+#    and starts a new `auditlog`, so each closed month is its own table
+AUDIT_COLUMNS = ("AuditLogID", "CustomerID", "Action", "Description", "Timestamp")
+
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+FUTURE_PARTITION = "pfuture"
+
+SEGMENT_TABLE = re.compile(r"^auditlog_(\d{4})(\d{2})$")
+
+# Seconds a partition DDL waits for the table's metadata lock before giving
+# up (and is retried on the next run) instead of queueing every insert
+# behind it while a long transaction holds the table
+DDL_LOCK_WAIT_TIMEOUT = 5
+
+# Most events one query returns
+MAX_QUERY_LIMIT = 1000
+
+# Days a query covers when it has no `from`
+DEFAULT_QUERY_DAYS = 7
+
+SQLITE_HEAD_DDL = (
+    """
+    CREATE TABLE auditlog (
+      AuditLogID INTEGER PRIMARY KEY AUTOINCREMENT,
+      CustomerID INTEGER DEFAULT NULL REFERENCES customer (CustomerID),
+      Action VARCHAR(50) NOT NULL,
+      Description TEXT DEFAULT NULL,
+      Timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Index names are global in SQLite and stay with a renamed table
+    "CREATE INDEX auditlog_{suffix}_CustomerID ON auditlog (CustomerID, Timestamp)",
+    "CREATE INDEX auditlog_{suffix}_Timestamp ON auditlog (Timestamp)",
+)
+
+# One month of the audit log. `ends` is the exclusive upper bound of the
+# Timestamps it can hold (None = still open: pfuture, or SQLite's `auditlog`);
+# oldest / newest are the Timestamps actually in it (None when empty).
+AuditSegment = namedtuple("AuditSegment", ["name", "table", "partition", "ends", "rows", "oldest", "newest"])
+
+
+class AuditLogError(Exception):
+    """Raised when an audit log query or maintenance step can't be done."""
+
+
+def _month_start(day: date):
+    return date(day.year, day.month, 1)
+
+def _add_months(day: date, months: int):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:19], TS_FMT)
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+# -----------------
+# Segments
+# -----------------
+
+def _mysql_segments(conn):
+    partitions = conn.execute(text("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'auditlog'
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)).all()
+    if not partitions or partitions[0].PARTITION_NAME is None:
+        raise AuditLogError("auditlog is not partitioned; apply the partitioning in db/schema.sql first.")
+
+    segments = []
+    for name, description, rows in partitions:
+        ends = None if description == "MAXVALUE" else _as_datetime(description.strip("'"))
+        oldest, newest = conn.execute(
+            text(f"SELECT MIN(Timestamp), MAX(Timestamp) FROM auditlog PARTITION ({name})")
+        ).one()
+        # TABLE_ROWS is InnoDB's estimate; exact counts would scan every month
+        segments.append(AuditSegment(name, "auditlog", name, ends, int(rows or 0), oldest, newest))
+    return segments
+
+def _sqlite_segments(conn):
+    tables = [row[0] for row in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'auditlog%'"
+    ))]
+
+    segments = []
+    for table in sorted(tables, key=lambda name: (name == "auditlog", name)):
+        match = SEGMENT_TABLE.match(table)
+        if table != "auditlog" and not match:
+            continue
+        ends = _add_months(date(int(match[1]), int(match[2]), 1), 1) if match else None
+        rows, oldest, newest = conn.execute(
+            text(f"SELECT COUNT(*), MIN(Timestamp), MAX(Timestamp) FROM {table}")
+        ).one()
+        segments.append(AuditSegment(
+            table, table, None, datetime.combine(ends, datetime.min.time()) if ends else None,
+            rows, _as_datetime(oldest), _as_datetime(newest),
+        ))
+    return segments
+
+def list_audit_segments(conn=None):
+    """
+    The months the audit log is split into, oldest first (AuditSegments).
+    """
+    if conn is None:
+        with db.engine.connect() as conn:
+            return list_audit_segments(conn)
+    return _mysql_segments(conn) if conn.dialect.name == "mysql" else _sqlite_segments(conn)
+
+def _set_ddl_lock_timeout(conn):
+    conn.execute(text(f"SET SESSION lock_wait_timeout = {DDL_LOCK_WAIT_TIMEOUT}"))
+
+def _roll_mysql(months_ahead: int, today: date):
+    """
+    Splits pfuture so that there is a partition for every month up to
+    `months_ahead` months after the current one. pfuture is normally empty,
+    which makes REORGANIZE a metadata change.
+    """
+    with db.engine.connect() as conn:
+        segments = _mysql_segments(conn)
+        if segments[-1].partition != FUTURE_PARTITION:
+            raise AuditLogError(f"auditlog has no {FUTURE_PARTITION} partition.")
+        bounds = [segment.ends.date() for segment in segments if segment.ends is not None]
+        month = bounds[-1] if bounds else _month_start(today)
+        last = _add_months(_month_start(today), months_ahead + 1)
+
+        added = []
+        while month < last:
+            ends = _add_months(month, 1)
+            added.append((f"p{month:%Y%m}", ends))
+            month = ends
+        if not added:
+            return []
+
+        _set_ddl_lock_timeout(conn)
+        partitions = ", ".join(
+            f"PARTITION {name} VALUES LESS THAN ('{ends:%Y-%m-%d} 00:00:00')" for name, ends in added
+        )
+        conn.execute(text(
+            f"ALTER TABLE auditlog REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({partitions}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        ))
+        return [name for name, _ends in added]
+
+def _roll_sqlite(today: date):
+    """
+    Closes the `auditlog` table once it holds events of an earlier month:
+    in one write transaction it is renamed to auditlog_YYYYMM (the month
+    before the current one), a new `auditlog` is created, and the events of
+    the current month move back to it. Renaming is O(1); only the current
+    month's rows (few when this runs early in the month) are copied.
+    """
+    boundary = _month_start(today)
+    closed = f"auditlog_{_add_months(boundary, -1):%Y%m}"
+    params = {"boundary": boundary.strftime(TS_FMT)}
+
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        if conn.execute(text("SELECT 1 FROM auditlog WHERE Timestamp < :boundary LIMIT 1"), params).first() is None:
+            conn.rollback()
+            return []
+
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": closed}
+        ).first()
+        if exists:
+            # Rolled already this month; events flushed late are moved over
+            conn.execute(text(f"INSERT INTO {closed} SELECT * FROM auditlog WHERE Timestamp < :boundary"), params)
+            conn.execute(text("DELETE FROM auditlog WHERE Timestamp < :boundary"), params)
+            conn.commit()
+            return []
+
+        conn.execute(text(f"ALTER TABLE auditlog RENAME TO {closed}"))
+        for statement in SQLITE_HEAD_DDL:
+            conn.execute(text(statement.format(suffix=f"{boundary:%Y%m}")))
+        # Keep AuditLogIDs increasing across tables
+        conn.execute(text("""
+            INSERT INTO sqlite_sequence (name, seq)
+            SELECT 'auditlog', seq FROM sqlite_sequence WHERE name = :closed
+        """), {"closed": closed})
+        conn.execute(text(f"INSERT INTO auditlog SELECT * FROM {closed} WHERE Timestamp >= :boundary"), params)
+        conn.execute(text(f"DELETE FROM {closed} WHERE Timestamp >= :boundary"), params)
+        conn.commit()
+        return [closed]
+
+def roll_audit_log(months_ahead: int = 3, today: date | None = None):
+    """
+    Monthly upkeep (safe to run daily): adds the partitions of the coming
+    months on MySQL, closes the ended month's table on SQLite. Returns the
+    names of the segments created.
+    """
+    today = today or date.today()
+    if _dialect() == "mysql":
+        return _roll_mysql(months_ahead, today)
+    return _roll_sqlite(today)
+
+
+# -----------------
+# Queries
+# -----------------
+
+def parse_audit_time(value: str, label: str):
+    """
+    "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS" (or with a "T") -> datetime.
+    """
+    value = (value or "").strip().replace("T", " ")
+    for fmt in (TS_FMT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise AuditLogError(f"{label} must be a date (YYYY-MM-DD) or a time (YYYY-MM-DD HH:MM:SS).")
+
+def parse_audit_range(date_from: str = "", date_to: str = ""):
+    """
+    (start, end) of a query; `to` defaults to now, `from` to DEFAULT_QUERY_DAYS
+    before `to`. Raises AuditLogError with a user-friendly message on error.
+    """
+    end = parse_audit_time(date_to, "to") if date_to else datetime.now().replace(microsecond=0) + timedelta(seconds=1)
+    start = parse_audit_time(date_from, "from") if date_from else end - timedelta(days=DEFAULT_QUERY_DAYS)
+    if end <= start:
+        raise AuditLogError("to must be after from.")
+    return start, end
+
+def _parse_cursor(after: str):
+    try:
+        timestamp, audit_log_id = after.rsplit("_", 1)
+        return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S"), int(audit_log_id)
+    except ValueError:
+        raise AuditLogError("after must be the `next` value of a previous page.") from None
+
+def query_audit_log(start: datetime, end: datetime, customer_id: int | None = None, action: str | None = None,
+                    after: str | None = None, limit: int = 100):
+    """
+    Events with start <= Timestamp < end (optionally of one customer / one
+    action), oldest first, at most `limit` of them. Returns {"events": [...],
+    "next": cursor}; pass `next` back as `after` for the following page
+    (None on the last page).
+
+    Reads only the months overlapping the range: MySQL prunes the partitions
+    from the Timestamp condition, on SQLite only the tables whose events
+    overlap the range are queried. Within a month, the Timestamp (or
+    CustomerID, Timestamp) index is used.
+    """
+    if end <= start:
+        raise AuditLogError("to must be after from.")
+    limit = min(max(int(limit), 1), MAX_QUERY_LIMIT)
+
+    clauses = ["Timestamp >= :start", "Timestamp < :end"]
+    params = {"start": start.strftime(TS_FMT), "end": end.strftime(TS_FMT), "limit": limit + 1}
+    if customer_id is not None:
+        clauses.append("CustomerID = :customer_id")
+        params["customer_id"] = customer_id
+    if action:
+        clauses.append("Action = :action")
+        params["action"] = action
+    if after:
+        after_ts, params["after_id"] = _parse_cursor(after)
+        params["after_ts"] = after_ts.strftime(TS_FMT)
+        clauses.append("(Timestamp > :after_ts OR (Timestamp = :after_ts AND AuditLogID > :after_id))")
+
+    columns = ", ".join(AUDIT_COLUMNS)
+    where = " AND ".join(clauses)
+    order = " ORDER BY Timestamp, AuditLogID LIMIT :limit"
+
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "mysql":
+            sql = f"SELECT {columns} FROM auditlog WHERE {where}{order}"
+        else:
+            tables = [
+                segment.table for segment in _sqlite_segments(conn)
+                if segment.rows and segment.oldest < end and segment.newest >= start
+            ]
+            if not tables:
+                return {"events": [], "next": None}
+            sql = " UNION ALL ".join(
+                f"SELECT * FROM (SELECT {columns} FROM {table} WHERE {where}{order})" for table in tables
+            ) + order
+        rows = conn.execute(text(sql), params).all()
+
+    events = [
+        {
+            "id":          row.AuditLogID,
+            "customer_id": row.CustomerID,
+            "action":      row.Action,
+            "description": row.Description,
+            "timestamp":   _as_datetime(row.Timestamp).isoformat(),
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = f"{events[-1]['timestamp']}_{events[-1]['id']}" if len(rows) > limit else None
+    return {"events": events, "next": next_cursor}
+
+
+# -----------------
+# Archival
+# -----------------
+
+def _json_line(row):
+    event = dict(zip(AUDIT_COLUMNS, row))
+    event["Timestamp"] = _as_datetime(event["Timestamp"]).strftime(TS_FMT) if event["Timestamp"] else None
+    return json.dumps(event, separators=(",", ":")) + "\n"
+
+def _segment_select(conn, segment: AuditSegment):
+    columns = ", ".join(AUDIT_COLUMNS)
+    if segment.partition:
+        return f"SELECT {columns} FROM auditlog PARTITION ({segment.partition})"
+    return f"SELECT {columns} FROM {segment.table}"
+
+def _write_archive(segment: AuditSegment, path: str, batch_size: int):
+    """
+    Streams the segment's rows (server-side cursor, AuditLogID order) into a
+    gzipped NDJSON file, written to path + ".tmp", fsynced and renamed, so a
+    file at `path` is always complete. Returns (rows, bytes).
+    """
+    rows = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as out:
+            with db.engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                    text(_segment_select(conn, segment) + " ORDER BY AuditLogID")
+                )
+                for partition in result.partitions(batch_size):
+                    out.write("".join(_json_line(row) for row in partition).encode("utf-8"))
+                    rows += len(partition)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return rows, os.path.getsize(path)
+
+def _drop_segment(segment: AuditSegment, archived_rows: int):
+    with db.engine.connect() as conn:
+        count = conn.execute(text(f"SELECT COUNT(*) FROM ({_segment_select(conn, segment)}) AS segment")).scalar()
+        if count != archived_rows:
+            raise AuditLogError(
+                f"{segment.name} has {count} rows but {archived_rows} were archived; not dropped."
+            )
+        if conn.dialect.name == "mysql":
+            # Dropping a partition is a metadata change plus unlinking its
+            # file: no row locks, and the metadata lock is held for moments
+            _set_ddl_lock_timeout(conn)
+            conn.execute(text(f"ALTER TABLE auditlog DROP PARTITION {segment.partition}"))
+        else:
+            conn.execute(text(f"DROP TABLE {segment.table}"))
+            conn.commit()
+
+def archive_audit_log(before: date, directory: str, batch_size: int = 5000, dry_run: bool = False, log=print):
+    """
+    Archives and drops every segment that ends on or before `before` (the
+    first day of a month no later than the current one): each is written to
+    <directory>/auditlog-<last month>.ndjson.gz, its row count checked
+    against the file, then its partition / table dropped. Nothing is
+    deleted row by row. Returns one dict per segment.
+    """
+    if before > _month_start(date.today()):
+        raise AuditLogError("Only months that have ended can be archived.")
+    cutoff = datetime.combine(before, datetime.min.time())
+
+    segments = [segment for segment in list_audit_segments() if segment.ends is not None and segment.ends <= cutoff]
+    if not dry_run and segments:
+        os.makedirs(directory, exist_ok=True)
+
+    archived = []
+    for segment in segments:
+        last_month = (segment.ends - timedelta(days=1)).strftime("%Y-%m")
+        path = os.path.join(directory, f"auditlog-{last_month}.ndjson.gz")
+        if dry_run:
+            log(f"{segment.name}: ~{segment.rows:,} rows -> {path} (dry run)")
+            archived.append({"segment": segment.name, "rows": segment.rows, "bytes": 0, "path": path})
+            continue
+
+        started = time.perf_counter()
+        rows, size = _write_archive(segment, path, batch_size)
+        _drop_segment(segment, rows)
+        seconds = time.perf_counter() - started
+        log(f"{segment.name}: {rows:,} rows -> {path} ({size / 1e6:.1f} MB, {seconds:.1f}s), dropped")
+        archived.append({"segment": segment.name, "rows": rows, "bytes": size, "path": path,
+                         "seconds": round(seconds, 2)})
+    return archived
@@ -0,0 +1,271 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from metrics import AUDIT_EVENTS_DROPPED, AUDIT_EVENTS_FLUSHED, AUDIT_EVENTS_QUEUED, AUDIT_LOG_FAILURES
+
+# One executemany() per batch; PyMySQL sends it as multi-row INSERTs
+INSERT_AUDIT_EVENTS = text("""
+    INSERT INTO auditlog (CustomerID, Action, Description, Timestamp)
+    VALUES (:customer_id, :action, :description, :timestamp)
+""")
+
+# Seconds before the first retry of a failed insert; doubles on every retry
+RETRY_BACKOFF = 0.2
+
+# Seconds the shutdown flush may take before the remaining events are dropped
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class AuditLogWriter:
+    """
+    Write-behind writer for the auditlog table.
+
+    Requests only put events on a bounded queue; one background thread per
+    process drains it and inserts them in batches of up to batch_size rows, or
+    whatever has arrived after flush_interval seconds. The event time is taken
+    when the event is queued, so a late flush doesn't shift Timestamp.
+    """
+
+    def __init__(self):
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._exit_hook = False
+        self.app = None  # set by init_audit_log; None = write synchronously
+        self.configure()
+        self._reset_stats()
+
+    def configure(self, queue_size: int = 10000, batch_size: int = 200, flush_interval: float = 1.0,
+                  enqueue_timeout: float = 0.05, retries: int = 3):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retries = retries
+        if not self._running():
+            self._queue = queue.Queue(maxsize=queue_size)
+
+    def _reset_stats(self):
+        self._stats_lock = threading.Lock()
+        self.stats = {"queued": 0, "flushed": 0, "dropped": 0, "batches": 0, "failed_writes": 0}
+        self.last_error = None
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    # -----------------
+    # Producer side
+    # -----------------
+
+    def submit(self, customer_id: int | None, action: str, description: str):
+        """
+        Queues one event. With a full queue, waits up to enqueue_timeout for
+        the writer to catch up, then drops the event. Never raises; returns
+        whether the event was queued.
+        """
+        self._ensure_started()
+        event = {
+            "customer_id": customer_id,
+            "action":      action,
+            "description": description,
+            "timestamp":   datetime.now().replace(microsecond=0),
+        }
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._drop(1, "queue_full")
+            return False
+        self._count("queued")
+        AUDIT_EVENTS_QUEUED.inc()
+        return True
+
+    def flush(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """
+        Blocks until every event queued before the call is written (or
+        dropped), at most `timeout` seconds. Returns whether it finished.
+        """
+        if not self._running():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """
+        Flushes what is queued and stops the writer thread. Registered with
+        atexit so a worker that shuts down cleanly doesn't lose events.
+        """
+        self._closed = True
+        if self._running():
+            self.flush(timeout)
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+
+        leftover = 0
+        while True:
+            try:
+                leftover += isinstance(self._queue.get_nowait(), dict)
+            except queue.Empty:
+                break
+        if leftover:
+            self._drop(leftover, "shutdown")
+
+    def _running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_started(self):
+        if self._closed or self._running():
+            return
+        with self._start_lock:
+            if self._running():
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def after_fork_in_child(self):
+        """
+        Threads don't survive fork(): a forked worker gets an empty queue and
+        starts its own writer on its first event.
+        """
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._reset_stats()
+
+    # -----------------
+    # Writer thread
+    # -----------------
+
+    def _run(self):
+        batch, waiters = [], []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # flush_interval is up
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            elif isinstance(item, threading.Event):
+                # Everything queued before the flush() call is in `batch` by now
+                waiters.append(item)
+
+            if batch:
+                self._write(batch)
+            batch, deadline = [], None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+            if item is None:
+                return
+
+    def _write(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    conn.execute(INSERT_AUDIT_EVENTS, batch)
+            except SQLAlchemyError as e:
+                self._count("failed_writes")
+                AUDIT_LOG_FAILURES.inc()
+                self.last_error = f"{type(e).__name__}: {e}"[:500]
+                if attempt < self.retries:
+                    time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            self._count("flushed", len(batch))
+            self._count("batches")
+            AUDIT_EVENTS_FLUSHED.inc(len(batch))
+            return
+
+        self._drop(len(batch), "write_failed")
+        self.app.logger.error("Dropped %d audit events after %d attempts: %s",
+                             len(batch), self.retries + 1, self.last_error)
+
+    def _drop(self, count: int, reason: str):
+        self._count("dropped", count)
+        AUDIT_EVENTS_DROPPED.inc(count, reason=reason)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "pending":      self._queue.qsize(),
+            "queue_size":   self.queue_size,
+            "batch_size":   self.batch_size,
+            "writer_alive": self._running(),
+            "last_error":   self.last_error,
+        }
+
+
+audit_writer = AuditLogWriter()
+
+
+def record_audit_event(customer_id: int | None, action: str, description: str):
+    """
+    Adds a row to auditlog: queued for the background writer, or, when
+    AUDIT_ASYNC is off, written and committed right away. Failures are
+    counted and logged, never raised.
+    """
+    if audit_writer.app is not None:
+        audit_writer.submit(customer_id, action, description)
+        return
+
+    try:
+        db.session.execute(INSERT_AUDIT_EVENTS, {
+            "customer_id": customer_id,
+            "action":      action,
+            "description": description,
+            "timestamp":   datetime.now().replace(microsecond=0),
+        })
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        AUDIT_LOG_FAILURES.inc()
+        current_app.logger.warning("Audit log write failed: %s", e)
+
+def get_audit_stats():
+    return audit_writer.snapshot()
+
+def init_audit_log(app):
+    """
+    Sets up the write-behind writer for this app with the AUDIT_* settings.
+    The thread itself starts with the first event (so after a pre-fork).
+    """
+    if not app.config.get("AUDIT_ASYNC", True):
+        return
+
+    audit_writer.configure(
+        queue_size=app.config["AUDIT_QUEUE_SIZE"],
+        batch_size=app.config["AUDIT_BATCH_SIZE"],
+        flush_interval=app.config["AUDIT_FLUSH_INTERVAL"],
+        enqueue_timeout=app.config["AUDIT_ENQUEUE_TIMEOUT"],
+        retries=app.config["AUDIT_WRITE_RETRIES"],
+    )
+    audit_writer.app = app
+    if not audit_writer._exit_hook:
+        atexit.register(audit_writer.close)
+        audit_writer._exit_hook = True
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=audit_writer.after_fork_in_child)
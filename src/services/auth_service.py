@@ -1,7 +1,9 @@
 import re
+from flask import current_app
 from sqlalchemy import text
-from werkzeug.security import generate_password_hash, check_password_hash
 from extensions import db
+from metrics import LOGIN_FAILURES
+from services.password_service import PasswordHashingBusy, hash_password, needs_rehash, verify_password
 
 class RegistrationError(Exception):
     """Raised when registration validation or DB insert fails."""
@@ -9,6 +11,46 @@ class RegistrationError(Exception):
 class LoginError(Exception):
     """Raised when login credentials are invalid."""
 
+def normalize_email(email: str) -> str:
+    """
+    Canonical form emails are stored and looked up in (trimmed, lowercase),
+    so lookups are plain equality seeks on the unique customer.Email index.
+    """
+    return (email or "").strip().lower()
+
+def normalize_stored_emails(dry_run: bool = False):
+    """
+    One-time migration for customers registered before emails were
+    normalized on the way in: rewrites every customer.Email that isn't
+    trimmed + lowercase (otherwise the exact-match lookups can't find them).
+    Nothing is changed if two customers would end up with the same email;
+    those are returned for someone to merge by hand.
+    Returns (emails to rewrite, duplicates as [(email, [CustomerID, ...])]).
+    """
+    duplicates = db.session.execute(text("""
+        SELECT LOWER(TRIM(Email)) AS normalized, CustomerID
+        FROM customer
+        WHERE LOWER(TRIM(Email)) IN (
+            SELECT LOWER(TRIM(Email)) FROM customer GROUP BY LOWER(TRIM(Email)) HAVING COUNT(*) > 1
+        )
+        ORDER BY normalized, CustomerID
+    """)).all()
+    groups = {}
+    for email, customer_id in duplicates:
+        groups.setdefault(email, []).append(customer_id)
+
+    # MySQL compares with the column's case-insensitive collation unless told to compare bytes
+    binary = "BINARY " if db.session.get_bind().dialect.name == "mysql" else ""
+    where = f"WHERE {binary}Email <> LOWER(TRIM(Email))"
+    pending = db.session.execute(text(f"SELECT COUNT(*) FROM customer {where}")).scalar() or 0
+    if groups or dry_run or not pending:
+        db.session.rollback()
+        return pending, sorted(groups.items())
+
+    db.session.execute(text(f"UPDATE customer SET Email = LOWER(TRIM(Email)) {where}"))
+    db.session.commit()
+    return pending, []
+
 def validate_registration(first: str, last: str, email: str, password: str, phone: str):
     """
     Validate registration fields. Raises RegistrationError if invalid.
@@ -29,6 +71,8 @@ def register_customer(first: str, last: str, email: str, phone: str, password: s
     Inserts a new customer if email not taken.
     Raises RegistrationError on duplicate or DB issues.
     """
+    email = normalize_email(email)
+
     existing = db.session.execute(
         text("SELECT 1 FROM customer WHERE email = :email"),
         {"email": email}
@@ -36,7 +80,10 @@ def register_customer(first: str, last: str, email: str, phone: str, password: s
     if existing:
         raise RegistrationError("Email is already registered.")
 
-    pw_hash = generate_password_hash(password)
+    try:
+        pw_hash = hash_password(password)
+    except PasswordHashingBusy:
+        raise RegistrationError("We're handling a lot of sign-ups right now. Please try again in a moment.")
     try:
         db.session.execute(
             text("""
@@ -60,14 +107,42 @@ def authenticate_user(email: str, password: str):
     """
     Validate email + password against the DB.
     Returns a customer row if valid, else raises LoginError.
+    A hash made with an outdated policy is replaced with a current one.
     """
-    email = email.strip().lower()
+    email = normalize_email(email)
 
     customer = db.session.execute(
         text("SELECT * FROM customer WHERE Email = :email"), {"email": email}
     ).fetchone()
 
-    if not customer or not check_password_hash(customer.PasswordHash, password):
+    try:
+        valid = customer is not None and verify_password(customer.PasswordHash, password)
+    except PasswordHashingBusy:
+        raise LoginError("We're handling a lot of logins right now. Please try again in a moment.")
+
+    if not valid:
+        LOGIN_FAILURES.inc()
         raise LoginError("Invalid email or password.")
 
+    if needs_rehash(customer.PasswordHash):
+        upgrade_password_hash(customer.CustomerID, customer.PasswordHash, password)
+
     return customer
+
+def upgrade_password_hash(customer_id: int, old_hash: str, password: str):
+    """
+    Stores a hash of `password` made with the current policy. Only replaces
+    `old_hash` (a concurrent password change wins), and never fails the login.
+    """
+    try:
+        db.session.execute(
+            text("""
+                UPDATE customer SET PasswordHash = :new_hash
+                WHERE CustomerID = :id AND PasswordHash = :old_hash
+            """),
+            {"new_hash": hash_password(password), "id": customer_id, "old_hash": old_hash},
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("Password hash upgrade failed for customer %s: %s", customer_id, e)
@@ -0,0 +1,149 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import text
+from extensions import db
+from services.booking_service import DATE_FMT, as_date
+from services.catalog_service import get_catalog
+
+
+class RoomIntervalIndex:
+    """
+    In-memory index of booked stays per room.
+
+    Each room keeps a sorted list of disjoint, half-open [start, end) date
+    intervals built from its CONFIRMED reservations, so a date-range search
+    over every room is a couple of bisects per room and no DB round trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._max_occupancy = {}  # RoomID -> MaxOccupancy
+        self._starts = {}         # RoomID -> sorted interval starts
+        self._ends = {}           # RoomID -> interval ends, aligned with _starts
+        self._loaded_at = None
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def is_stale(self, ttl_seconds: int):
+        if self._loaded_at is None:
+            return True
+        return ttl_seconds > 0 and time.monotonic() - self._loaded_at >= ttl_seconds
+
+    def load(self):
+        """
+        Rebuilds the index from the room catalog and one query for every
+        CONFIRMED reservation that has not checked out yet.
+        """
+        stay_rows = db.session.execute(
+            text("""
+                SELECT RoomID, CheckInDate, CheckOutDate
+                FROM reservation
+                WHERE ReservationStatus = 'Confirmed'
+                  AND CheckOutDate > :today
+                ORDER BY RoomID, CheckInDate
+            """),
+            {"today": date.today().strftime(DATE_FMT)},
+        ).mappings().all()
+
+        max_occupancy = {room.RoomID: int(room.MaxOccupancy) for room in get_catalog().rooms}
+        starts = {room_id: [] for room_id in max_occupancy}
+        ends = {room_id: [] for room_id in max_occupancy}
+
+        for row in stay_rows:
+            if row.RoomID not in starts:
+                continue
+            self._merge(
+                starts[row.RoomID], ends[row.RoomID],
+                as_date(row.CheckInDate), as_date(row.CheckOutDate),
+            )
+
+        with self._lock:
+            self._max_occupancy = max_occupancy
+            self._starts = starts
+            self._ends = ends
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def add_stay(self, room_id: int, check_in: date, check_out: date):
+        """
+        Marks [check_in, check_out) as booked for a room. Ignored until the
+        index has been loaded (the next load will pick the stay up anyway).
+        """
+        with self._lock:
+            if room_id not in self._starts:
+                return
+            self._merge(self._starts[room_id], self._ends[room_id], check_in, check_out)
+
+    def is_free(self, room_id: int, check_in: date, check_out: date):
+        starts = self._starts.get(room_id)
+        if starts is None:
+            return False
+        # Last interval starting before check_out is the only one that can overlap,
+        # because intervals are disjoint and sorted.
+        i = bisect_left(starts, check_out)
+        return i == 0 or self._ends[room_id][i - 1] <= check_in
+
+    def free_rooms(self, check_in: date, check_out: date, guests: int | None = None):
+        """
+        Returns the set of RoomIDs with no booked night in [check_in, check_out)
+        that fit the given number of guests.
+        """
+        with self._lock:
+            return {
+                room_id
+                for room_id, capacity in self._max_occupancy.items()
+                if (guests is None or guests <= capacity)
+                and self.is_free(room_id, check_in, check_out)
+            }
+
+    @staticmethod
+    def _merge(starts: list, ends: list, start: date, end: date):
+        """
+        Inserts [start, end) into the sorted disjoint lists, merging any
+        intervals it overlaps or touches.
+        """
+        lo = bisect_left(ends, start)
+        hi = bisect_right(starts, end)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+
+# One index per worker process
+availability_index = RoomIntervalIndex()
+
+
+def _ensure_loaded():
+    """
+    Loads the index on first use and reloads it after AVAILABILITY_INDEX_TTL
+    seconds, so bookings made by other worker processes are picked up.
+    """
+    ttl = int(current_app.config.get("AVAILABILITY_INDEX_TTL", 300))
+    if availability_index.is_stale(ttl):
+        availability_index.load()
+
+def find_available_room_ids(check_in: date, check_out: date, guests: int | None = None):
+    """
+    Returns the set of RoomIDs free for [check_in, check_out) that fit the guests.
+    """
+    _ensure_loaded()
+    return availability_index.free_rooms(check_in, check_out, guests)
+
+def record_confirmed_stay(room_id: int, check_in_str: str, check_out_str: str):
+    """
+    Keeps the index in step with a reservation that was just confirmed.
+    """
+    availability_index.add_stay(
+        int(room_id),
+        datetime.strptime(check_in_str, DATE_FMT).date(),
+        datetime.strptime(check_out_str, DATE_FMT).date(),
+    )
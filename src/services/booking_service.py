@@ -12,12 +12,26 @@ def parse_and_validate_booking(check_in_str: str, check_out_str: str, guests_str
     Raises BookingValidationError with a user-friendly message on error.
     """
     # Dates
+    check_in, check_out = parse_date_range(check_in_str, check_out_str)
+
+    # Guests
+    guests = parse_guests(guests_str, max_occupancy)
+
+    nights = (check_out - check_in).days
+    return check_in, check_out, guests, nights
+
+def parse_date_range(check_in_str: str, check_out_str: str):
+    """
+    Parse and validate a check-in/check-out pair of date strings.
+    Returns (check_in_date, check_out_date).
+    Raises BookingValidationError with a user-friendly message on error.
+    """
     try:
-        check_in = datetime.strptime(check_in_str.strip(), DATE_FMT).date()
-        check_out = datetime.strptime(check_out_str.strip(), DATE_FMT).date()
+        check_in = datetime.strptime((check_in_str or "").strip(), DATE_FMT).date()
+        check_out = datetime.strptime((check_out_str or "").strip(), DATE_FMT).date()
     except ValueError:
         raise BookingValidationError("Please provide valid check-in and check-out dates.")
-    
+
     today = date.today()
 
     if check_in < today:
@@ -28,17 +42,25 @@ def parse_and_validate_booking(check_in_str: str, check_out_str: str, guests_str
     if check_in >= check_out:
         raise BookingValidationError("Check-out must be after check-in.")
 
-    # Guests
+    return check_in, check_out
+
+def parse_guests(guests_str: str, max_occupancy: int | None = None):
+    """
+    Parse and validate a guest count. max_occupancy is optional for searches
+    that span several room types.
+    Raises BookingValidationError with a user-friendly message on error.
+    """
     try:
-        guests = int(guests_str.strip())
+        guests = int((guests_str or "").strip())
     except ValueError:
         raise BookingValidationError("Guests must be a whole number.")
 
-    if guests < 1 or guests > int(max_occupancy):
+    if max_occupancy is not None and (guests < 1 or guests > int(max_occupancy)):
         raise BookingValidationError(f"Guests must be between 1 and {max_occupancy}.")
+    if guests < 1:
+        raise BookingValidationError("Guests must be at least 1.")
 
-    nights = (check_out - check_in).days
-    return check_in, check_out, guests, nights
+    return guests
 
 def build_pending_reservation(room_row, check_in_str: str, check_out_str: str, guests: int, nights: int):
     """
@@ -59,6 +81,16 @@ def build_pending_reservation(room_row, check_in_str: str, check_out_str: str, g
         "image_path":      room_row.ImagePath,
     }
 
+def as_date(value):
+    """
+    Normalizes a DATE column value (date on MySQL, string on SQLite) to a date.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], DATE_FMT).date()
+
 def date_today():
     """
     Returns today's date in string format [%Y-%m-%d]
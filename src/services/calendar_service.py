@@ -0,0 +1,173 @@
+import calendar
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import text
+from extensions import db
+from services.booking_service import DATE_FMT, as_date
+
+MONTH_FMT = "%Y-%m"
+
+# Months more than this many years before or after the current one are rejected
+MAX_CALENDAR_YEARS = 10
+
+class CalendarError(Exception):
+    """Raised when a calendar month parameter is invalid."""
+
+
+class MonthOccupancy:
+    """
+    Booked nights of one month for every room.
+    Each room is a single int bitset: bit (d - 1) is set when the night
+    starting on day d of the month is booked.
+    """
+
+    def __init__(self, year: int, month: int, bitmaps: dict):
+        self.year = year
+        self.month = month
+        self.days = calendar.monthrange(year, month)[1]
+        self.bitmaps = bitmaps  # RoomID -> int
+        self.built_at = time.monotonic()
+        self.etag = hashlib.md5(
+            json.dumps([self.label, sorted(bitmaps.items())]).encode()
+        ).hexdigest()
+
+    @property
+    def label(self):
+        return f"{self.year:04d}-{self.month:02d}"
+
+    def booked_dates(self, room_id: int):
+        """
+        Expands a room's bitset into a list of booked night dates (YYYY-MM-DD).
+        """
+        bits = self.bitmaps.get(room_id, 0)
+        return [
+            date(self.year, self.month, day + 1).strftime(DATE_FMT)
+            for day in range(self.days)
+            if bits >> day & 1
+        ]
+
+
+def parse_month(month_str: str | None):
+    """
+    Parses a YYYY-MM string (defaults to the current month).
+    Returns (year, month) or raises CalendarError.
+    """
+    if not month_str:
+        today = date.today()
+        return today.year, today.month
+    try:
+        parsed = datetime.strptime(month_str.strip(), MONTH_FMT)
+    except ValueError:
+        raise CalendarError("Month must be in YYYY-MM format.")
+    if abs(parsed.year - date.today().year) > MAX_CALENDAR_YEARS:
+        raise CalendarError(f"Month must be within {MAX_CALENDAR_YEARS} years of today.")
+    return parsed.year, parsed.month
+
+def _month_bounds(year: int, month: int):
+    first = date(year, month, 1)
+    return first, first + timedelta(days=calendar.monthrange(year, month)[1])
+
+def build_month_occupancy(year: int, month: int):
+    """
+    Builds the per-room bitsets for a month from a single range query.
+    Rooms without bookings get an empty (0) bitset.
+    """
+    month_start, month_end = _month_bounds(year, month)
+
+    rows = db.session.execute(
+        text("""
+            SELECT rm.RoomID, r.CheckInDate, r.CheckOutDate
+            FROM room rm
+            LEFT JOIN reservation r
+              ON r.RoomID = rm.RoomID
+             AND r.ReservationStatus = 'Confirmed'
+             AND r.CheckInDate < :month_end
+             AND r.CheckOutDate > :month_start
+        """),
+        {
+            "month_start": month_start.strftime(DATE_FMT),
+            "month_end":   month_end.strftime(DATE_FMT),
+        },
+    ).mappings().all()
+
+    bitmaps = {}
+    for row in rows:
+        bits = bitmaps.get(row.RoomID, 0)
+        if row.CheckInDate is not None:
+            # Clamps the stay to the month, then sets one bit per night
+            first = max(as_date(row.CheckInDate), month_start)
+            last = min(as_date(row.CheckOutDate), month_end)
+            nights = (last - first).days
+            if nights > 0:
+                bits |= ((1 << nights) - 1) << (first.day - 1)
+        bitmaps[row.RoomID] = bits
+
+    return MonthOccupancy(year, month, bitmaps)
+
+
+class CalendarCache:
+    """
+    Small LRU of built months. Entries expire after CALENDAR_CACHE_TTL seconds
+    (bookings from other workers) and are dropped as soon as this worker
+    confirms a reservation touching that month.
+    """
+
+    def __init__(self, max_months: int = 24):
+        self._lock = threading.Lock()
+        self._months = OrderedDict()
+        self.max_months = max_months
+
+    def get(self, year: int, month: int, ttl_seconds: int):
+        key = (year, month)
+        with self._lock:
+            entry = self._months.get(key)
+            if entry and (ttl_seconds <= 0 or time.monotonic() - entry.built_at < ttl_seconds):
+                self._months.move_to_end(key)
+                return entry
+
+        entry = build_month_occupancy(year, month)
+        with self._lock:
+            self._months[key] = entry
+            self._months.move_to_end(key)
+            while len(self._months) > self.max_months:
+                self._months.popitem(last=False)
+        return entry
+
+    def invalidate(self, keys=None):
+        with self._lock:
+            if keys is None:
+                self._months.clear()
+                return
+            for key in keys:
+                self._months.pop(key, None)
+
+
+calendar_cache = CalendarCache()
+
+
+def get_month_occupancy(year: int, month: int):
+    """
+    Returns the (possibly cached) MonthOccupancy for a month.
+    """
+    ttl = int(current_app.config.get("CALENDAR_CACHE_TTL", 60))
+    return calendar_cache.get(year, month, ttl)
+
+def invalidate_stay_months(check_in_str: str, check_out_str: str):
+    """
+    Drops every cached month touched by the nights of [check_in, check_out).
+    """
+    check_in = datetime.strptime(check_in_str, DATE_FMT).date()
+    last_night = datetime.strptime(check_out_str, DATE_FMT).date() - timedelta(days=1)
+
+    keys = []
+    year, month = check_in.year, check_in.month
+    while (year, month) <= (last_night.year, last_night.month):
+        keys.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    calendar_cache.invalidate(keys)
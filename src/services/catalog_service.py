@@ -0,0 +1,196 @@
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from flask import current_app
+from sqlalchemy import text
+from extensions import db
+
+# Immutable records; attribute names match the SQL column names the
+# templates and routes already use (room.TypeName, room.MaxOccupancy, ...).
+Room = namedtuple("Room", [
+    "RoomID", "RoomNumber", "RoomTypeID", "ADAAccessible", "Description", "ImagePath",
+    "TypeName", "BedConfiguration", "PricePerNight", "MaxOccupancy",
+])
+RoomType = namedtuple("RoomType", [
+    "RoomTypeID", "TypeName", "BedConfiguration", "PricePerNight", "MaxOccupancy",
+])
+Amenity = namedtuple("Amenity", ["AmenityID", "Name", "Description"])
+
+
+class CatalogSnapshot:
+    """
+    Read-only copy of rooms, room types and amenities.
+    Built once with three queries and shared by every request until the next
+    refresh; nothing in it is ever mutated in place.
+    """
+
+    def __init__(self, version: int, rooms, room_types, amenities, room_amenity_pairs):
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        # Content hash: identical in every worker process that loaded the same rows,
+        # so it can be used in ETags and cache keys
+        self.digest = hashlib.sha1(
+            repr((rooms, room_types, amenities, sorted(room_amenity_pairs))).encode()
+        ).hexdigest()[:16]
+
+        self.rooms = tuple(rooms)  # ordered by RoomNumber
+        self.rooms_by_id = MappingProxyType({room.RoomID: room for room in self.rooms})
+        self.room_types = tuple(room_types)
+        self.amenities = tuple(amenities)  # ordered by Name
+
+        amenity_by_id = {amenity.AmenityID: amenity for amenity in self.amenities}
+        per_room = {room.RoomID: [] for room in self.rooms}
+        for room_id, amenity_id in room_amenity_pairs:
+            if room_id in per_room and amenity_id in amenity_by_id:
+                per_room[room_id].append(amenity_by_id[amenity_id])
+        self.amenities_by_room = MappingProxyType({
+            room_id: tuple(sorted(items, key=lambda a: a.Name))
+            for room_id, items in per_room.items()
+        })
+
+
+def load_catalog_snapshot(version: int):
+    """
+    Reads the whole catalog from the DB (3 queries) into a new CatalogSnapshot.
+    """
+    room_rows = db.session.execute(
+        text("""
+            SELECT
+                r.RoomID,
+                r.RoomNumber,
+                r.RoomTypeID,
+                r.ADAAccessible,
+                r.Description,
+                r.ImagePath,
+                rt.TypeName,
+                rt.BedConfiguration,
+                rt.PricePerNight,
+                rt.MaxOccupancy
+            FROM room r
+            JOIN roomtype rt ON r.RoomTypeID = rt.RoomTypeID
+            ORDER BY r.RoomNumber
+        """)
+    ).mappings().all()
+
+    amenity_rows = db.session.execute(
+        text("SELECT AmenityID, Name, Description FROM amenity ORDER BY Name")
+    ).mappings().all()
+
+    pair_rows = db.session.execute(
+        text("SELECT RoomID, AmenityID FROM roomamenity")
+    ).all()
+
+    rooms = [Room(**row) for row in room_rows]
+    room_types = {
+        room.RoomTypeID: RoomType(
+            room.RoomTypeID, room.TypeName, room.BedConfiguration,
+            room.PricePerNight, room.MaxOccupancy,
+        )
+        for room in rooms
+    }
+
+    return CatalogSnapshot(
+        version=version,
+        rooms=rooms,
+        room_types=sorted(room_types.values(), key=lambda t: t.RoomTypeID),
+        amenities=[Amenity(**row) for row in amenity_rows],
+        room_amenity_pairs=[(row.RoomID, row.AmenityID) for row in pair_rows],
+    )
+
+
+class CatalogHolder:
+    """
+    Holds the current snapshot for this worker process and swaps in a new one
+    when it is older than CATALOG_TTL seconds or the version has been bumped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = 1
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+    @property
+    def version(self):
+        return self._version
+
+    def _is_fresh(self, snapshot, ttl_seconds: int):
+        if snapshot is None or snapshot.version != self._version:
+            return False
+        return ttl_seconds <= 0 or time.monotonic() - snapshot.loaded_at < ttl_seconds
+
+    def get(self, ttl_seconds: int):
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot, ttl_seconds):
+            self.stats["hits"] += 1
+            return snapshot
+
+        # Only one thread reloads; the others wait and reuse its result
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot, ttl_seconds):
+                self.stats["hits"] += 1
+                return snapshot
+
+            self.stats["misses"] += 1
+            new_snapshot = load_catalog_snapshot(self._version)
+            if snapshot is not None:
+                self.stats["refreshes"] += 1
+            self._snapshot = new_snapshot
+            return new_snapshot
+
+    def bump_version(self):
+        with self._lock:
+            self._version += 1
+
+
+catalog = CatalogHolder()
+
+
+def get_catalog():
+    """
+    Returns the current CatalogSnapshot, loading or refreshing it if needed.
+    """
+    ttl = int(current_app.config.get("CATALOG_TTL", 300))
+    return catalog.get(ttl)
+
+def get_catalog_digest():
+    """
+    Content hash of the current catalog, for ETags and cache keys.
+    """
+    return get_catalog().digest
+
+def bump_catalog_version():
+    """
+    Call after changing rooms, room types or amenities: the next read rebuilds
+    the snapshot (other worker processes pick the change up within CATALOG_TTL).
+    """
+    catalog.bump_version()
+
+def catalog_stats():
+    """
+    Hit/miss/refresh counters plus the version and age of the current snapshot.
+    """
+    snapshot = catalog._snapshot
+    return {
+        **catalog.stats,
+        "version":     catalog.version,
+        "digest":      snapshot.digest if snapshot else None,
+        "rooms":       len(snapshot.rooms) if snapshot else 0,
+        "age_seconds": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+    }
+
+def init_catalog(app):
+    """
+    Loads the snapshot at startup so the first visitor doesn't pay for it.
+    A DB that is not reachable yet is not fatal: the first request loads it instead.
+    """
+    with app.app_context():
+        try:
+            get_catalog()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.warning("Room catalog not preloaded: %s", e)
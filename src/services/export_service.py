@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import text
+from extensions import db
+from metrics import EXPORT_ROWS, EXPORT_SECONDS
+from services.auth_service import normalize_email
+from services.booking_service import DATE_FMT
+
+# Columns of an export row, in file order
+EXPORT_COLUMNS = (
+    "ReservationID", "ReservationStatus", "CheckInDate", "CheckOutDate", "NumberOfGuests", "DateReserved",
+    "RoomID", "RoomNumber", "TypeName", "BedConfiguration", "PricePerNight",
+    "CustomerID", "FirstName", "LastName", "Email", "Phone",
+)
+
+EXPORT_SELECT = """
+    SELECT
+        r.ReservationID,
+        r.ReservationStatus,
+        r.CheckInDate,
+        r.CheckOutDate,
+        r.NumberOfGuests,
+        r.DateReserved,
+        rm.RoomID,
+        rm.RoomNumber,
+        rt.TypeName,
+        rt.BedConfiguration,
+        rt.PricePerNight,
+        c.CustomerID,
+        c.FirstName,
+        c.LastName,
+        c.Email,
+        c.Phone
+    FROM reservation r
+    JOIN room rm     ON rm.RoomID = r.RoomID
+    JOIN roomtype rt ON rt.RoomTypeID = rm.RoomTypeID
+    JOIN customer c  ON c.CustomerID = r.CustomerID
+"""
+
+EXPORT_FORMATS = {
+    "csv":    "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Upper bound for batch_size: one batch is held in memory at a time
+MAX_BATCH_SIZE = 10000
+
+
+class ExportFilterError(Exception):
+    """Raised when export filters are invalid."""
+
+
+class ExportStats:
+    """
+    Progress of one export; filled in while the rows stream out.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / max(self.seconds, 1e-9)
+
+    def summary(self):
+        return (f"{self.rows:,} rows, {self.bytes / 1e6:.1f} MB in {self.seconds:.1f}s "
+                f"({self.rows_per_sec:,.0f} rows/s)")
+
+
+def _parse_date(value: str, label: str):
+    try:
+        return datetime.strptime(value.strip(), DATE_FMT).date()
+    except ValueError:
+        raise ExportFilterError(f"{label} must be a date (YYYY-MM-DD).") from None
+
+def parse_export_filters(date_from: str = "", date_to: str = "", customer: str = "", status: str = ""):
+    """
+    Validates the export filters and returns (where_sql, params).
+    - date_from / date_to: stays overlapping [date_from, date_to), either end optional
+    - customer: a CustomerID or an email address
+    - status: a ReservationStatus (e.g. Confirmed)
+    Raises ExportFilterError with a user-friendly message on error.
+    """
+    clauses, params = [], {}
+
+    if date_from:
+        params["date_from"] = _parse_date(date_from, "from").strftime(DATE_FMT)
+        clauses.append("r.CheckOutDate > :date_from")
+    if date_to:
+        params["date_to"] = _parse_date(date_to, "to").strftime(DATE_FMT)
+        clauses.append("r.CheckInDate < :date_to")
+    if date_from and date_to and params["date_from"] >= params["date_to"]:
+        raise ExportFilterError("to must be after from.")
+
+    customer = (customer or "").strip()
+    if customer.isdigit():
+        clauses.append("r.CustomerID = :cust")
+        params["cust"] = int(customer)
+    elif customer:
+        clauses.append("r.CustomerID = (SELECT CustomerID FROM customer WHERE Email = :email)")
+        params["email"] = normalize_email(customer)
+
+    if status:
+        clauses.append("r.ReservationStatus = :status")
+        params["status"] = status.strip()
+
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def iter_reservation_batches(where_sql: str, params: dict, batch_size: int = 2000):
+    """
+    Yields lists of up to batch_size export rows (tuples in EXPORT_COLUMNS
+    order), ReservationID order.
+
+    Runs on its own pooled connection with stream_results, i.e. a server-side
+    cursor (PyMySQL's SSCursor): the DB sends rows as they are fetched
+    instead of the whole result at once, so memory stays at one batch no
+    matter how many rows match. The connection is busy until the generator
+    is exhausted or closed.
+    """
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+            text(EXPORT_SELECT + where_sql + " ORDER BY r.ReservationID"), params
+        )
+        try:
+            for partition in result.partitions(batch_size):
+                yield partition
+        finally:
+            result.close()
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _csv_chunks(batches, stats: ExportStats):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows([[_cell(value) for value in row] for row in rows])
+        stats.rows += len(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _ndjson_chunks(batches, stats: ExportStats):
+    for rows in batches:
+        stats.rows += len(rows)
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, (_cell(value) for value in row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+def export_reservations(fmt: str, where_sql: str, params: dict, batch_size: int = 2000, stats=None):
+    """
+    Generator of encoded chunks (one per batch of rows) of the reservations
+    export in `fmt` (a key of EXPORT_FORMATS). `stats` (an ExportStats) is
+    updated as chunks are produced and finished when the generator ends.
+    """
+    stats = stats if stats is not None else ExportStats()
+    encode = _csv_chunks if fmt == "csv" else _ndjson_chunks
+
+    try:
+        for chunk in encode(iter_reservation_batches(where_sql, params, batch_size), stats):
+            data = chunk.encode("utf-8")
+            stats.bytes += len(data)
+            yield data
+    finally:
+        stats.finished = time.perf_counter()
+        EXPORT_ROWS.inc(stats.rows, format=fmt)
+        EXPORT_SECONDS.inc(stats.seconds, format=fmt)
@@ -0,0 +1,157 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Named hashing policies (Werkzeug method strings). PASSWORD_HASH_POLICY takes
+# one of these names or a method string such as "scrypt:65536:8:1".
+HASH_POLICIES = {
+    "scrypt":       "scrypt:32768:8:1",     # Werkzeug's default: ~32 MB and tens of ms per hash
+    "scrypt-light": "scrypt:16384:8:1",     # half the memory and CPU of the default
+    "pbkdf2":       f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}",
+    "pbkdf2-light": "pbkdf2:sha256:600000",  # OWASP's 2023 minimum for PBKDF2-HMAC-SHA256
+}
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool is saturated and a job could not be queued in time."""
+
+
+def canonical_method(method: str) -> str:
+    """
+    Spells out the defaults Werkzeug fills in ("scrypt" -> "scrypt:32768:8:1"),
+    i.e. the prefix a hash made with `method` is stored with.
+    """
+    method = HASH_POLICIES.get(method, method)
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = args if args else (2**15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Unknown password hash method {method!r}")
+
+def stored_method(pw_hash: str) -> str:
+    return (pw_hash or "").split("$", 1)[0]
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification on a bounded process pool, so the
+    scrypt/PBKDF2 CPU and memory are spent outside the request workers and
+    never on more than `workers` cores per app process. A request thread
+    only waits on the result (without holding the GIL), leaving other
+    threads free to serve pages. At most `workers * queue_factor` jobs are
+    queued or running; past that, callers wait `queue_timeout` seconds for a
+    slot and then get PasswordHashingBusy. workers = 0 hashes in the calling
+    thread, as before.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.configure()
+
+    def configure(self, policy: str = "scrypt", workers: int = 0, queue_factor: int = 4,
+                  queue_timeout: float = 2.0, timeout: float = 10.0):
+        self.method = canonical_method(policy)
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(workers * queue_factor, 1))
+        self.shutdown()
+
+    def _pool(self):
+        # Forked request workers can't use the parent's pool processes
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    methods = multiprocessing.get_all_start_methods()
+                    # A fork of a threaded process can inherit held locks; forkserver/spawn start clean
+                    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHashingBusy("Password hashing is saturated.")
+        try:
+            return self._pool().submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHashingBusy("Password hashing timed out.") from None
+        except BrokenProcessPool:
+            # A pool process died (e.g. OOM killed); the next call starts a new pool
+            with self._lock:
+                self._executor = None
+            raise PasswordHashingBusy("Password hashing pool restarted.") from None
+        finally:
+            self._slots.release()
+
+    def warm(self):
+        """
+        Starts every pool process now (a process pool starts them as jobs
+        arrive), so the first logins of a worker don't wait for them.
+        """
+        if self.workers <= 0:
+            return
+        pool = self._pool()
+        try:
+            for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            raise
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pw_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash: str) -> bool:
+        """
+        True if `pw_hash` was made with other parameters than the current policy.
+        """
+        return stored_method(pw_hash) != self.method
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._pid = None
+
+
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+def verify_password(pw_hash: str, password: str) -> bool:
+    return password_hasher.verify(pw_hash, password)
+
+def needs_rehash(pw_hash: str) -> bool:
+    return password_hasher.needs_rehash(pw_hash)
+
+def init_password_hashing(app):
+    """
+    Applies the PASSWORD_HASH_* settings. The pool processes start on the
+    first login or registration of each worker process.
+    """
+    password_hasher.configure(
+        policy=app.config["PASSWORD_HASH_POLICY"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        queue_factor=app.config["PASSWORD_HASH_QUEUE_FACTOR"],
+        queue_timeout=app.config["PASSWORD_HASH_QUEUE_TIMEOUT"],
+    )
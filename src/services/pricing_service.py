@@ -0,0 +1,245 @@
+from collections import namedtuple
+import numpy as np
+
+# Names accepted in PRICING_WEEKEND_NIGHTS; a night is the weekday of its date
+# (Monday = 0), so the default "fri,sat" means the nights of Friday and Saturday
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Totals of many stays, as float64 arrays aligned with the input
+QuoteBatch = namedtuple("QuoteBatch", ["nights", "subtotal", "discount", "total"])
+
+# Quote for one stay; nightly_rates has one entry per night
+StayQuote = namedtuple("StayQuote", ["nights", "nightly_rates", "subtotal", "discount", "total"])
+
+
+def parse_weekend_nights(value: str):
+    """
+    "fri,sat" -> (4, 5).
+    """
+    days = [day.strip().lower()[:3] for day in value.split(",") if day.strip()]
+    for day in days:
+        if day not in WEEKDAYS:
+            raise ValueError(f"Unknown weekday {day!r} in PRICING_WEEKEND_NIGHTS")
+    return tuple(sorted({WEEKDAYS.index(day) for day in days}))
+
+def parse_seasons(value: str):
+    """
+    "06-15..09-15:1.25, 12-20..01-02:1.1" -> ((615, 915, 1.25), (1220, 102, 1.1)).
+    Both ends are inclusive; a season may wrap around the new year.
+    """
+    seasons = []
+    for item in (part.strip() for part in value.split(",")):
+        if not item:
+            continue
+        try:
+            span, multiplier = item.rsplit(":", 1)
+            start, end = span.split("..")
+            bounds = [int(month) * 100 + int(day) for month, day in (s.strip().split("-") for s in (start, end))]
+            seasons.append((bounds[0], bounds[1], float(multiplier)))
+        except ValueError:
+            raise ValueError(f"Bad PRICING_SEASONS entry {item!r} (expected MM-DD..MM-DD:multiplier)") from None
+    return tuple(seasons)
+
+def parse_stay_discounts(value: str):
+    """
+    "7:0.10, 14:0.15" -> ((7, 0.1), (14, 0.15)): 10% off stays of 7+ nights, 15% off 14+.
+    """
+    discounts = []
+    for item in (part.strip() for part in value.split(",")):
+        if not item:
+            continue
+        try:
+            min_nights, rate = item.split(":")
+            discounts.append((int(min_nights), float(rate)))
+        except ValueError:
+            raise ValueError(f"Bad PRICING_STAY_DISCOUNTS entry {item!r} (expected nights:rate)") from None
+        if not 0 <= discounts[-1][1] < 1:
+            raise ValueError(f"PRICING_STAY_DISCOUNTS rate must be in [0, 1): {item!r}")
+    return tuple(sorted(discounts))
+
+
+class QuoteEngine:
+    """
+    Prices stays from a per-night rate calendar.
+
+    A night's rate is the room's PricePerNight times the multipliers of the
+    rules that apply to that date (weekend nights, seasons), rounded to the
+    cent; a stay costs the sum of its nightly rates, less the length-of-stay
+    discount for its number of nights. quote_batch() prices any number of
+    (price, check-in, check-out) tuples at once: it builds the calendar of
+    nightly rates in cents for every distinct price over the dates involved,
+    takes running sums along the dates, and gets each stay's subtotal as the
+    difference of two of those sums. No Python loop per stay or per night.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(self, weekend_nights=(4, 5), weekend_multiplier: float = 1.0, seasons=(),
+                  stay_discounts=()):
+        self.weekend_nights = tuple(weekend_nights)
+        self.weekend_multiplier = float(weekend_multiplier)
+        self.seasons = tuple(seasons)  # later entries win where seasons overlap
+        self.stay_discounts = tuple(sorted(stay_discounts))
+        self._discount_nights = np.array([n for n, _rate in self.stay_discounts], dtype=np.int64)
+        self._discount_rates = np.array([rate for _n, rate in self.stay_discounts], dtype=np.float64)
+
+    # -----------------
+    # Rate calendar
+    # -----------------
+
+    def multipliers(self, start: np.datetime64, days: int):
+        """
+        Rate multiplier of each night start .. start + days - 1.
+        """
+        dates = start + np.arange(days)
+        multipliers = np.ones(days)
+
+        if self.weekend_multiplier != 1.0 and self.weekend_nights:
+            weekday = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+            multipliers[np.isin(weekday, self.weekend_nights)] *= self.weekend_multiplier
+
+        if self.seasons:
+            months = dates.astype("datetime64[M]")
+            month_day = ((months.astype(np.int64) % 12) + 1) * 100 + (dates - months).astype(np.int64) + 1
+            season = np.ones(days)
+            for first, last, multiplier in self.seasons:
+                if first <= last:
+                    inside = (month_day >= first) & (month_day <= last)
+                else:
+                    inside = (month_day >= first) | (month_day <= last)
+                season[inside] = multiplier
+            multipliers *= season
+
+        return multipliers
+
+    def nightly_cents(self, price_cents, start: np.datetime64, days: int):
+        """
+        Matrix of nightly rates in cents: one row per price, one column per night.
+        """
+        multipliers = self.multipliers(start, days)
+        return np.rint(np.asarray(price_cents, dtype=np.float64)[:, None] * multipliers[None, :]).astype(np.int64)
+
+    def stay_discount_rates(self, nights):
+        if not len(self._discount_nights):
+            return np.zeros(len(nights))
+        tier = np.searchsorted(self._discount_nights, nights, side="right") - 1
+        return np.where(tier >= 0, self._discount_rates[np.maximum(tier, 0)], 0.0)
+
+    # -----------------
+    # Quotes
+    # -----------------
+
+    def quote_batch(self, prices, check_ins, check_outs):
+        """
+        Quotes len(prices) stays. Dates are date objects, "YYYY-MM-DD" strings
+        or datetime64 values. Raises ValueError if a check-out is not after
+        its check-in.
+        """
+        check_ins = np.asarray(check_ins, dtype="datetime64[D]")
+        check_outs = np.asarray(check_outs, dtype="datetime64[D]")
+        nights = (check_outs - check_ins).astype(np.int64)
+        if not len(nights):
+            empty = np.zeros(0)
+            return QuoteBatch(nights, empty, empty, empty)
+        if (nights <= 0).any():
+            raise ValueError("Check-out must be after check-in.")
+
+        price_cents, price_row = np.unique(
+            np.rint(np.asarray(prices, dtype=np.float64) * 100).astype(np.int64), return_inverse=True
+        )
+        start = check_ins.min()
+        days = int((check_outs.max() - start).astype(np.int64))
+
+        # running[p, d] = cents of the nights start .. start + d - 1 at price p
+        running = np.zeros((len(price_cents), days + 1), dtype=np.int64)
+        np.cumsum(self.nightly_cents(price_cents, start, days), axis=1, out=running[:, 1:])
+
+        first = (check_ins - start).astype(np.int64)
+        subtotal = running[price_row, first + nights] - running[price_row, first]
+        discount = np.rint(subtotal * self.stay_discount_rates(nights)).astype(np.int64)
+
+        return QuoteBatch(nights, subtotal / 100, discount / 100, (subtotal - discount) / 100)
+
+    def nightly_revenue(self, prices, check_ins, check_outs):
+        """
+        What each night of each stay earns, in cents: its nightly rate less
+        its share of the stay's length-of-stay discount (the shares add up to
+        the discount exactly, so a stay's nights add up to its quote_batch()
+        total). Returns (stay, date, cents) arrays with one entry per night,
+        `stay` being the index of the stay in the input.
+        """
+        check_ins = np.asarray(check_ins, dtype="datetime64[D]")
+        check_outs = np.asarray(check_outs, dtype="datetime64[D]")
+        nights = (check_outs - check_ins).astype(np.int64)
+        if not len(nights):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype="datetime64[D]"), np.zeros(0, dtype=np.int64)
+        if (nights <= 0).any():
+            raise ValueError("Check-out must be after check-in.")
+
+        price_cents, price_row = np.unique(
+            np.rint(np.asarray(prices, dtype=np.float64) * 100).astype(np.int64), return_inverse=True
+        )
+        start = check_ins.min()
+        rates = self.nightly_cents(price_cents, start, int((check_outs.max() - start).astype(np.int64)))
+
+        stay = np.repeat(np.arange(len(nights)), nights)
+        offset = np.arange(len(stay)) - np.repeat(np.cumsum(nights) - nights, nights)
+        day = (check_ins - start).astype(np.int64)[stay] + offset
+        cents = rates[price_row[stay], day]
+
+        discount_rate = self.stay_discount_rates(nights)
+        subtotal = np.bincount(stay, weights=cents, minlength=len(nights)).astype(np.int64)
+        discount = np.rint(subtotal * discount_rate).astype(np.int64)
+        share = np.floor(cents * discount_rate[stay]).astype(np.int64)
+        # Cents left over after rounding the shares down go to the first nights
+        leftover = discount - np.bincount(stay, weights=share, minlength=len(nights)).astype(np.int64)
+        share += offset < leftover[stay]
+
+        return stay, start + day, cents - share
+
+    def quote(self, price, check_in, check_out):
+        """
+        Quotes one stay, with its nightly rates.
+        """
+        batch = self.quote_batch([price], [check_in], [check_out])
+        nights = int(batch.nights[0])
+        rates = self.nightly_cents([round(float(price) * 100)], np.datetime64(check_in, "D"), nights)[0] / 100
+        return StayQuote(
+            nights=nights,
+            nightly_rates=tuple(float(rate) for rate in rates),
+            subtotal=float(batch.subtotal[0]),
+            discount=float(batch.discount[0]),
+            total=float(batch.total[0]),
+        )
+
+
+quote_engine = QuoteEngine()
+
+
+def quote_stays(prices, check_ins, check_outs):
+    return quote_engine.quote_batch(prices, check_ins, check_outs)
+
+def quote_stay(price, check_in, check_out):
+    return quote_engine.quote(price, check_in, check_out)
+
+def quote_rooms(rooms, check_in, check_out):
+    """
+    Total price of the same stay in each of `rooms`, as {RoomID: total}.
+    """
+    rooms = list(rooms)
+    batch = quote_engine.quote_batch(
+        [float(room.PricePerNight) for room in rooms], [check_in] * len(rooms), [check_out] * len(rooms)
+    )
+    return {room.RoomID: float(total) for room, total in zip(rooms, batch.total)}
+
+def init_pricing(app):
+    """
+    Applies the PRICING_* rate rules. Bad values fail at startup, not at booking time.
+    """
+    quote_engine.configure(
+        weekend_nights=parse_weekend_nights(app.config["PRICING_WEEKEND_NIGHTS"]),
+        weekend_multiplier=app.config["PRICING_WEEKEND_MULTIPLIER"],
+        seasons=parse_seasons(app.config["PRICING_SEASONS"]),
+        stay_discounts=parse_stay_discounts(app.config["PRICING_STAY_DISCOUNTS"]),
+    )
@@ -0,0 +1,344 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import text
+from extensions import db
+from services.booking_service import DATE_FMT, as_date
+from services.catalog_service import get_catalog
+
+# occupancyrollup: one row per (night, room type) with the CONFIRMED room
+# nights sold, the guests staying those nights and the revenue they earn.
+# The revenue of a night is the one quoted when it was booked (nightly rate
+# less its share of the stay's discount), stored on its roomnight row, so
+# neither a later price change nor new PRICING_* rules alter past nights.
+# Kept current by confirm_reservation() and set_reservation_status(), in
+# their transactions; rebuilt from roomnight by rebuild_occupancy_rollup().
+ROLLUP_DDL = {
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS occupancyrollup (
+          StayDate date NOT NULL,
+          RoomTypeID int(11) NOT NULL,
+          NightsSold int(11) NOT NULL DEFAULT 0,
+          Guests int(11) NOT NULL DEFAULT 0,
+          Revenue decimal(12,2) NOT NULL DEFAULT 0.00,
+          PRIMARY KEY (StayDate, RoomTypeID)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS occupancyrollup (
+          StayDate DATE NOT NULL,
+          RoomTypeID INTEGER NOT NULL,
+          NightsSold INTEGER NOT NULL DEFAULT 0,
+          Guests INTEGER NOT NULL DEFAULT 0,
+          Revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+          PRIMARY KEY (StayDate, RoomTypeID)
+        )
+    """,
+}
+
+# Adds deltas to a (StayDate, RoomTypeID) row, creating it if needed
+UPSERT_ROLLUP = {
+    "mysql": text("""
+        INSERT INTO occupancyrollup (StayDate, RoomTypeID, NightsSold, Guests, Revenue)
+        VALUES (:day, :type, :nights, :guests, :revenue)
+        ON DUPLICATE KEY UPDATE
+            NightsSold = NightsSold + VALUES(NightsSold),
+            Guests     = Guests + VALUES(Guests),
+            Revenue    = Revenue + VALUES(Revenue)
+    """),
+    "sqlite": text("""
+        INSERT INTO occupancyrollup (StayDate, RoomTypeID, NightsSold, Guests, Revenue)
+        VALUES (:day, :type, :nights, :guests, :revenue)
+        ON CONFLICT (StayDate, RoomTypeID) DO UPDATE SET
+            NightsSold = NightsSold + excluded.NightsSold,
+            Guests     = Guests + excluded.Guests,
+            Revenue    = Revenue + excluded.Revenue
+    """),
+}
+
+INSERT_ROLLUP = text("""
+    INSERT INTO occupancyrollup (StayDate, RoomTypeID, NightsSold, Guests, Revenue)
+    VALUES (:day, :type, :nights, :guests, :revenue)
+""")
+
+# Longest range one report may cover
+MAX_REPORT_DAYS = 3 * 366
+
+REPORT_GROUPS = ("day", "month")
+
+
+class ReportError(Exception):
+    """Raised when report parameters are invalid."""
+
+
+# -----------------
+# Aggregation
+# -----------------
+
+def _rollup_params(totals: dict, sign: int = 1):
+    return [
+        {
+            "day":     day.strftime(DATE_FMT),
+            "type":    room_type,
+            "nights":  sign * nights,
+            "guests":  sign * guests,
+            "revenue": round(sign * cents / 100, 2),
+        }
+        for (day, room_type), (nights, guests, cents) in sorted(totals.items())
+    ]
+
+
+# -----------------
+# Incremental maintenance
+# -----------------
+
+def apply_nights_to_rollup(nights, guests: int, sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) booked room nights to/from the
+    rollup, on db.session: call it inside the transaction that claims or
+    releases them, so both commit or roll back together. `nights` are
+    roomnight rows (mappings with night, type and revenue), and removing
+    uses the revenue stored on them, i.e. exactly what confirming added.
+    Rows are upserted in date order, the same order confirm_reservation()
+    claims room nights in.
+    """
+    totals = {}
+    for night in nights:
+        key = (as_date(night["night"]), int(night["type"]))
+        row = totals.setdefault(key, [0, 0, 0])
+        row[0] += 1
+        row[1] += guests
+        row[2] += int(round(float(night["revenue"]) * 100))
+    if totals:
+        db.session.execute(UPSERT_ROLLUP[db.session.get_bind().dialect.name], _rollup_params(totals, sign))
+
+
+# -----------------
+# Rebuild
+# -----------------
+
+def ensure_rollup_table(conn):
+    conn.execute(text(ROLLUP_DDL[conn.dialect.name]))
+    conn.commit()
+
+def _night_range_clause(date_from, date_to, params: dict):
+    clauses = ""
+    if date_from is not None:
+        clauses += " AND rn.StayDate >= :date_from"
+        params["date_from"] = date_from.strftime(DATE_FMT)
+    if date_to is not None:
+        clauses += " AND rn.StayDate < :date_to"
+        params["date_to"] = date_to.strftime(DATE_FMT)
+    return clauses
+
+def _aggregate_chunk(app, first_id: int, last_id: int, date_from, date_to):
+    """
+    Rollup totals of the room nights held by reservations with
+    first_id <= ReservationID < last_id, and how many reservations those are.
+    """
+    params = {"first": first_id, "last": last_id}
+    night_range = _night_range_clause(date_from, date_to, params)
+    with app.app_context(), db.engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT rn.StayDate, COALESCE(rn.RoomTypeID, rm.RoomTypeID), COUNT(*),
+                   SUM(r.NumberOfGuests), SUM(COALESCE(rn.Revenue, 0))
+            FROM roomnight rn
+            JOIN reservation r ON r.ReservationID = rn.ReservationID
+            JOIN room rm       ON rm.RoomID = rn.RoomID
+            WHERE rn.ReservationID >= :first AND rn.ReservationID < :last{night_range}
+            GROUP BY rn.StayDate, COALESCE(rn.RoomTypeID, rm.RoomTypeID)
+        """), params).all()
+        reservations = conn.execute(text(f"""
+            SELECT COUNT(DISTINCT rn.ReservationID) FROM roomnight rn
+            WHERE rn.ReservationID >= :first AND rn.ReservationID < :last{night_range}
+        """), params).scalar() or 0
+    totals = {
+        (as_date(day), int(room_type)): [int(nights), int(guests), int(round(float(revenue) * 100))]
+        for day, room_type, nights, guests, revenue in rows
+    }
+    return totals, reservations
+
+def rebuild_occupancy_rollup(date_from: date | None = None, date_to: date | None = None,
+                             chunk_size: int = 50000, jobs: int = 4, log=print):
+    """
+    Recomputes the rollup rows of [date_from, date_to) (everything by
+    default) from the room nights of the confirmed reservations (roomnight),
+    with the revenue stored when each night was booked. ReservationID ranges
+    of chunk_size are aggregated by `jobs` threads at once, each on its own
+    connection (the DB does the work, so the GIL is mostly free);
+    the partial totals are then merged and the old rows replaced in one
+    transaction. Bookings confirmed while the chunks are being read can be
+    missed: run it when bookings are quiet, or run it again.
+    Returns a summary dict.
+    """
+    started = time.perf_counter()
+    app = current_app._get_current_object()
+
+    params = {}
+    night_range = _night_range_clause(date_from, date_to, params)
+    with db.engine.connect() as conn:
+        ensure_rollup_table(conn)
+        first_id, last_id = conn.execute(text(f"""
+            SELECT MIN(rn.ReservationID), MAX(rn.ReservationID) FROM roomnight rn
+            WHERE 1 = 1{night_range}
+        """), params).one()
+
+    chunks = []
+    if first_id is not None:
+        chunks = [(lo, min(lo + chunk_size, last_id + 1)) for lo in range(first_id, last_id + 1, chunk_size)]
+
+    totals, reservations = {}, 0
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        futures = [pool.submit(_aggregate_chunk, app, lo, hi, date_from, date_to) for lo, hi in chunks]
+        for done, future in enumerate(futures, 1):
+            partial, count = future.result()
+            reservations += count
+            for key, (nights, guests, cents) in partial.items():
+                row = totals.setdefault(key, [0, 0, 0])
+                row[0] += nights
+                row[1] += guests
+                row[2] += cents
+            if done % 10 == 0 or done == len(futures):
+                log(f"chunk {done}/{len(futures)}: {reservations:,} reservations")
+
+    rows = _rollup_params(totals)
+    with db.engine.begin() as conn:
+        where, delete_params = [], {}
+        if date_from is not None:
+            where.append("StayDate >= :date_from")
+            delete_params["date_from"] = date_from.strftime(DATE_FMT)
+        if date_to is not None:
+            where.append("StayDate < :date_to")
+            delete_params["date_to"] = date_to.strftime(DATE_FMT)
+        conn.execute(
+            text("DELETE FROM occupancyrollup" + (" WHERE " + " AND ".join(where) if where else "")),
+            delete_params,
+        )
+        for i in range(0, len(rows), 5000):
+            conn.execute(INSERT_ROLLUP, rows[i:i + 5000])
+
+    return {
+        "reservations": reservations,
+        "nights":       sum(nights for nights, _guests, _cents in totals.values()),
+        "rows":         len(rows),
+        "chunks":       len(chunks),
+        "seconds":      round(time.perf_counter() - started, 2),
+    }
+
+
+# -----------------
+# Reports
+# -----------------
+
+def parse_report_date(value: str, label: str):
+    try:
+        return datetime.strptime(value.strip(), DATE_FMT).date()
+    except ValueError:
+        raise ReportError(f"{label} must be a date (YYYY-MM-DD).") from None
+
+def parse_report_range(date_from: str = "", date_to: str = ""):
+    """
+    Returns (date_from, date_to) for a report; defaults to the current month.
+    Raises ReportError with a user-friendly message on error.
+    """
+    today = date.today()
+    start = parse_report_date(date_from, "from") if date_from else today.replace(day=1)
+    if date_to:
+        end = parse_report_date(date_to, "to")
+    else:
+        end = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    if end <= start:
+        raise ReportError("to must be after from.")
+    if (end - start).days > MAX_REPORT_DAYS:
+        raise ReportError(f"A report can cover at most {MAX_REPORT_DAYS} days.")
+    return start, end
+
+def _period(day: date, group: str):
+    return day.strftime(DATE_FMT) if group == "day" else day.strftime("%Y-%m")
+
+def _days_in_period(period: str, group: str, start: date, end: date):
+    if group == "day":
+        return 1
+    first = datetime.strptime(period + "-01", DATE_FMT).date()
+    after = (first + timedelta(days=32)).replace(day=1)
+    return (min(after, end) - max(first, start)).days
+
+def _figures(nights: int, guests: int, revenue: float, rooms: int, days: int):
+    available = rooms * days
+    return {
+        "rooms":            rooms,
+        "available_nights": available,
+        "nights_sold":      nights,
+        "occupancy_rate":   round(nights / available, 4) if available else None,
+        "guests":           guests,
+        "revenue":          round(revenue, 2),
+        "adr":              round(revenue / nights, 2) if nights else None,    # average daily rate
+        "revpar":           round(revenue / available, 2) if available else None,  # revenue per available room
+    }
+
+def occupancy_report(start: date, end: date, group: str = "month", room_type_id: int | None = None):
+    """
+    Occupancy rate, guests and revenue per period (day or month) and room
+    type for the nights of [start, end), from the precomputed rollup rows
+    (a primary key range scan; never touches reservation). Room counts come
+    from the current catalog.
+    """
+    params = {"start": start.strftime(DATE_FMT), "end": end.strftime(DATE_FMT)}
+    where = "StayDate >= :start AND StayDate < :end"
+    if room_type_id is not None:
+        where += " AND RoomTypeID = :type"
+        params["type"] = room_type_id
+    rows = db.session.execute(text(f"""
+        SELECT StayDate, RoomTypeID, NightsSold, Guests, Revenue
+        FROM occupancyrollup
+        WHERE {where}
+        ORDER BY StayDate, RoomTypeID
+    """), params).all()
+
+    catalog = get_catalog()
+    rooms_per_type = {}
+    for room in catalog.rooms:
+        rooms_per_type[room.RoomTypeID] = rooms_per_type.get(room.RoomTypeID, 0) + 1
+    type_names = {room_type.RoomTypeID: room_type.TypeName for room_type in catalog.room_types}
+    type_ids = [room_type_id] if room_type_id is not None else sorted(rooms_per_type)
+
+    sums = {}  # (period, RoomTypeID) -> [nights, guests, revenue]
+    for row in rows:
+        key = (_period(as_date(row.StayDate), group), row.RoomTypeID)
+        acc = sums.setdefault(key, [0, 0, 0.0])
+        acc[0] += int(row.NightsSold)
+        acc[1] += int(row.Guests)
+        acc[2] += float(row.Revenue)
+
+    periods = []
+    day = start
+    while day < end:
+        period = _period(day, group)
+        if not periods or periods[-1] != period:
+            periods.append(period)
+        day += timedelta(days=1)
+
+    report_rows = []
+    for period in periods:
+        days = _days_in_period(period, group, start, end)
+        for type_id in type_ids:
+            nights, guests, revenue = sums.get((period, type_id), (0, 0, 0.0))
+            report_rows.append({
+                "period":       period,
+                "room_type_id": type_id,
+                "room_type":    type_names.get(type_id),
+                **_figures(nights, guests, revenue, rooms_per_type.get(type_id, 0), days),
+            })
+
+    total_rooms = sum(rooms_per_type.get(type_id, 0) for type_id in type_ids)
+    return {
+        "from":   start.strftime(DATE_FMT),
+        "to":     end.strftime(DATE_FMT),
+        "group":  group,
+        "rows":   report_rows,
+        "totals": _figures(
+            sum(r["nights_sold"] for r in report_rows), sum(r["guests"] for r in report_rows),
+            sum(r["revenue"] for r in report_rows), total_rooms, (end - start).days,
+        ),
+    }
@@ -1,18 +1,105 @@
-from datetime import datetime
+import base64
+import json
+import random
+import time
+from datetime import datetime, timedelta
+import numpy as np
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
 from extensions import db
-from services.booking_service import DATE_FMT
+from metrics import AVAILABILITY_CONFLICTS, BOOKINGS_CONFIRMED
+from services.booking_service import DATE_FMT, as_date
+from services.audit_service import record_audit_event
+from services.auth_service import normalize_email
+from services.availability_service import availability_index, record_confirmed_stay
+from services.calendar_service import invalidate_stay_months
+from services.pricing_service import quote_engine, quote_stay
+from services.reporting_service import apply_nights_to_rollup
 
+# Times a booking is retried after a lock wait timeout / deadlock before giving up
+BOOKING_LOCK_RETRIES = 3
 
-def list_reservations(q: str, customer_id: int | None, page: int, per_page: int):
+# Seconds slept before the first retry, doubled for each later one and jittered
+# so that the transactions that deadlocked don't collide again right away
+BOOKING_RETRY_BACKOFF = 0.02
+
+# Values of reservation.ReservationStatus
+RESERVATION_STATUSES = ("Pending", "Confirmed", "Cancelled")
+
+INSERT_ROOM_NIGHTS = text("""
+    INSERT INTO roomnight (RoomID, StayDate, ReservationID, RoomTypeID, Revenue)
+    VALUES (:room, :night, :rid, :type, :revenue)
+""")
+
+# Same, skipping (RoomID, StayDate) pairs that are already held
+INSERT_ROOM_NIGHTS_IGNORE = {
+    "mysql": text("""
+        INSERT IGNORE INTO roomnight (RoomID, StayDate, ReservationID, RoomTypeID, Revenue)
+        VALUES (:room, :night, :rid, :type, :revenue)
+    """),
+    "sqlite": text("""
+        INSERT OR IGNORE INTO roomnight (RoomID, StayDate, ReservationID, RoomTypeID, Revenue)
+        VALUES (:room, :night, :rid, :type, :revenue)
+    """),
+}
+
+class RoomUnavailableError(Exception):
+    """Raised when another booking already holds one of the requested room nights."""
+
+class ReservationNotFoundError(Exception):
+    """Raised when a ReservationID does not exist."""
+
+
+def encode_cursor(payload: dict) -> str:
+    """
+    Packs a pagination cursor into an opaque, URL-safe token.
+    """
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str | None):
     """
-    Returns (rows, total, total_pages) for the reservation lookup.
+    Unpacks a cursor made by encode_cursor(). Returns None if missing or malformed.
+    """
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        payload["i"] = int(payload["i"])
+        payload["p"] = max(int(payload.get("p", 1)), 1)
+        payload["d"] = str(payload["d"])
+        return payload
+    except (ValueError, TypeError, KeyError):
+        return None
+
+def _sort_key(row):
+    """
+    (DateReserved, ReservationID) of a row, as strings/ints safe to put in a cursor.
+    """
+    reserved = row.DateReserved
+    if isinstance(reserved, datetime):
+        reserved = reserved.strftime("%Y-%m-%d %H:%M:%S")
+    return str(reserved), int(row.ReservationID)
+
+def list_reservations(q: str, customer_id: int | None, per_page: int, cursor: str | None = None,
+                      with_total: bool = True):
+    """
+    Returns (rows, pagination) for the reservation lookup.
     - If q is empty and customer_id is set -> only that customer's reservations.
     - If q is digits -> lookup by ReservationID.
-    - Else -> lookup by email (exact and case-insensitive).
+    - Else -> lookup by email (stored normalized, so this is an index seek).
     - If q is empty and customer_id is None -> caller should render empty state.
+
+    Pages are fetched with keyset (seek) pagination on (DateReserved, ReservationID)
+    newest first, so every page costs the same no matter how deep it is.
+    `cursor` is an opaque token from a previous call's pagination["next_cursor"]
+    or ["prev_cursor"]. The total is only counted for the first page (and only
+    when with_total is True); later pages carry it along inside the cursor.
+
+    pagination = {"page", "total", "total_pages", "next_cursor", "prev_cursor"};
+    total/total_pages are None when not counted.
     """
-    offset = (page - 1) * per_page
+    empty = {"page": 1, "total": 0, "total_pages": 1, "next_cursor": None, "prev_cursor": None}
 
     base_select = """
         SELECT
@@ -34,14 +121,6 @@ def list_reservations(q: str, customer_id: int | None, page: int, per_page: int)
         JOIN customer c  ON c.CustomerID = r.CustomerID
     """
 
-    base_count = """
-        SELECT COUNT(*) AS cnt
-        FROM reservation r
-        JOIN room rm     ON rm.RoomID = r.RoomID
-        JOIN roomtype rt ON rt.RoomTypeID = rm.RoomTypeID
-        JOIN customer c  ON c.CustomerID = r.CustomerID
-    """
-
     where_clauses = []
     params = {}
 
@@ -50,109 +129,395 @@ def list_reservations(q: str, customer_id: int | None, page: int, per_page: int)
         where_clauses.append("r.CustomerID = :cust")
         params["cust"] = customer_id
     elif q:
-        # If q is digits, it is treated as a ReservationID. Otherwise, it treats it as an Email (case-insensitive exact)
+        # If q is digits, it is treated as a ReservationID. Otherwise, it treats it as an Email.
         if q.isdigit():
             where_clauses.append("r.ReservationID = :rid")
             params["rid"] = int(q)
         else:
-            where_clauses.append("LOWER(c.Email) = LOWER(:email)")
-            params["email"] = q
+            # Emails are stored trimmed + lowercased, so normalizing the input lets the
+            # unique index on customer.Email resolve the customer, and the
+            # (CustomerID, DateReserved, ReservationID) index serve the page.
+            where_clauses.append("r.CustomerID = (SELECT CustomerID FROM customer WHERE Email = :email)")
+            params["email"] = normalize_email(q)
     else:
        # If user not logged in and no query, it shows an empty page with a prompt to search
-        return [], 0, 1
+        return [], empty
 
-    where_sql = (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
-    order_sql = " ORDER BY r.DateReserved DESC"
-    limit_sql = " LIMIT :limit OFFSET :offset"
+    position = decode_cursor(cursor)
+    backwards = bool(position and position.get("dir") == "prev")
+    page = position["p"] if position else 1
 
-    # Count
-    count_row = db.session.execute(
-        text(base_count + where_sql),
-        params
-    ).mappings().first()
-    total = int(count_row.cnt) if count_row else 0
-    total_pages = max((total + per_page - 1) // per_page, 1)
+    # Total: counted once on the first page, then carried inside the cursors
+    if position:
+        total = position.get("t")
+    elif with_total:
+        total = db.session.execute(
+            text("SELECT COUNT(*) FROM reservation r WHERE " + " AND ".join(where_clauses)),
+            params
+        ).scalar() or 0
+    else:
+        total = None
+
+    # Seek past the cursor's row instead of OFFSET-ing over every earlier one
+    if position:
+        op = ">" if backwards else "<"
+        where_clauses.append(
+            f"(r.DateReserved {op} :key_date OR (r.DateReserved = :key_date AND r.ReservationID {op} :key_id))"
+        )
+        params.update({"key_date": position["d"], "key_id": position["i"]})
 
-    # Page
-    page_params = dict(params)
-    page_params.update({"limit": per_page, "offset": offset})
+    direction = "ASC" if backwards else "DESC"
+    where_sql = " WHERE " + " AND ".join(where_clauses)
+    order_sql = f" ORDER BY r.DateReserved {direction}, r.ReservationID {direction}"
+    limit_sql = " LIMIT :limit"
 
+    # Page (one extra row tells us whether there is another page in that direction)
     rows = db.session.execute(
         text(base_select + where_sql + order_sql + limit_sql),
-        page_params
+        {**params, "limit": per_page + 1}
     ).mappings().all()
 
-    return rows, total, total_pages
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows = rows[::-1]
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else position is not None
+
+    def cursor_for(row, target_page, target_dir):
+        key_date, key_id = _sort_key(row)
+        return encode_cursor({"d": key_date, "i": key_id, "p": target_page, "t": total, "dir": target_dir})
+
+    pagination = {
+        "page":        page,
+        "total":       total,
+        "total_pages": max((total + per_page - 1) // per_page, 1) if total is not None else None,
+        "next_cursor": cursor_for(rows[-1], page + 1, "next") if rows and has_next else None,
+        "prev_cursor": cursor_for(rows[0], page - 1, "prev") if rows and has_prev and page > 1 else None,
+    }
+
+    return rows, pagination
 
 def compute_totals(pending: dict):
     """
-    Recompute totals on the server from the pending reservation dict.
-    Returns (nights, subtotal).
+    Recompute totals on the server from the pending reservation dict, night
+    by night with the current rate rules (see pricing_service).
+    Returns a StayQuote (nights, nightly_rates, subtotal, discount, total).
     Raises ValueError if dates are invalid.
     """
     check_in = datetime.strptime(pending["check_in"], DATE_FMT).date()
     check_out = datetime.strptime(pending["check_out"], DATE_FMT).date()
-    nights = (check_out - check_in).days
-    price_per_night = float(pending["price_per_night"])
-    subtotal = price_per_night * nights
-
-    return nights, subtotal
+    return quote_stay(float(pending["price_per_night"]), check_in, check_out)
 
 def room_is_available(room_id: int, check_in_str: str, check_out_str: str) -> bool:
     """
-    True if no overlapping CONFIRMED reservations exist for [check_in, check_out).
-    Overlap: (existing.CheckIn < new.CheckOut) AND (existing.CheckOut > new.CheckIn)
+    True if no night in [check_in, check_out) is already held in the roomnight
+    inventory (one row per booked room night, see confirm_reservation).
+    This is a fast pre-check only; the primary key on roomnight is what
+    actually prevents double bookings.
     """
     row = db.session.execute(text("""
         SELECT COUNT(*) AS cnt
-        FROM reservation
+        FROM roomnight
         WHERE RoomID = :room_id
-          AND ReservationStatus = 'Confirmed'
-          AND CheckInDate < :new_out
-          AND CheckOutDate > :new_in
+          AND StayDate >= :new_in
+          AND StayDate < :new_out
     """), {
         "room_id": room_id,
         "new_in":  check_in_str,
         "new_out": check_out_str,
     }).mappings().first()
-    
-    return (row and int(row.cnt) == 0)
+
+    available = bool(row and int(row.cnt) == 0)
+    if not available:
+        AVAILABILITY_CONFLICTS.inc(source="room_is_available")
+    return available
+
+def _stay_nights(check_in_str: str, check_out_str: str):
+    """
+    Returns every night of [check_in, check_out) as a YYYY-MM-DD string, in order.
+    """
+    check_in = datetime.strptime(check_in_str, DATE_FMT).date()
+    check_out = datetime.strptime(check_out_str, DATE_FMT).date()
+    return [
+        (check_in + timedelta(days=i)).strftime(DATE_FMT)
+        for i in range((check_out - check_in).days)
+    ]
+
+def price_room_nights(stays):
+    """
+    roomnight rows for stays given as (ReservationID, RoomID, RoomTypeID,
+    PricePerNight, check_in, check_out) tuples: one per night, in date
+    order, with what the night earns at the current rate rules (see
+    QuoteEngine.nightly_revenue). The revenue is stored with the night so
+    that releasing it later takes out of the rollup exactly what booking
+    it added.
+    """
+    if not stays:
+        return []
+    rids, rooms, types, prices, check_ins, check_outs = zip(*stays)
+    stay, days, cents = quote_engine.nightly_revenue(
+        [float(price) for price in prices], [as_date(d) for d in check_ins], [as_date(d) for d in check_outs],
+    )
+    return [
+        {"room": rooms[i], "night": night, "rid": rids[i], "type": types[i], "revenue": round(c / 100, 2)}
+        for i, night, c in zip(stay.tolist(), np.datetime_as_string(days, unit="D").tolist(), cents.tolist())
+    ]
+
+def _is_lock_error(error: OperationalError):
+    """
+    True for errors that mean "try again": MySQL deadlock / lock wait timeout,
+    or a busy SQLite database.
+    """
+    code = error.orig.args[0] if getattr(error.orig, "args", None) else None
+    return code in (1205, 1213) or "database is locked" in str(error.orig)
+
+def _is_room_night_conflict(error: IntegrityError):
+    """
+    True if the error is a duplicate key on roomnight's primary key, i.e.
+    another booking holds one of the nights. Other integrity errors (e.g. a
+    customer or room that no longer exists) are not conflicts.
+    """
+    code = error.orig.args[0] if getattr(error.orig, "args", None) else None
+    message = str(error.orig)
+    if code == 1062:
+        # roomnight's primary key is the only unique key these statements can hit
+        return "roomnight" in message or "'PRIMARY'" in message
+    return "UNIQUE constraint failed: roomnight." in message
+
+def _retry_backoff(attempt: int):
+    time.sleep(random.uniform(0.5, 1.5) * BOOKING_RETRY_BACKOFF * 2 ** attempt)
 
 def confirm_reservation(pending: dict, customer_id: int):
     """
-    Insert a confirmed reservation. Returns the new ReservationID.
+    Insert a confirmed reservation, claim its room nights and add them to the
+    occupancy rollup in one transaction. Returns the new ReservationID.
+
+    Every night of the stay is inserted into roomnight, whose primary key is
+    (RoomID, StayDate), with the revenue it earns. Two bookings that share a
+    night cannot both commit: the second one hits a duplicate key and
+    RoomUnavailableError is raised. Bookings for other rooms never wait on
+    each other for room nights; bookings of the same room type with a night
+    in common do queue on that night's occupancyrollup row, which is updated
+    last so it is only held until the commit. Nights are inserted in date
+    order so competing transactions lock rows in the same order; deadlocks /
+    lock timeouts are retried a few times after a short, jittered backoff.
+    Other integrity errors are raised as they are.
     """
-    result = db.session.execute(text("""
-        INSERT INTO reservation
-            (CustomerID, RoomID, CheckInDate, CheckOutDate, NumberOfGuests, ReservationStatus)
-        VALUES
-            (:cust, :room, :in_date, :out_date, :guests, 'Confirmed')
-    """), {
-        "cust":     customer_id,
-        "room":     pending["room_id"],
-        "in_date":  pending["check_in"],
-        "out_date": pending["check_out"],
-        "guests":   pending["guests"],
-    })
-    db.session.commit()
+    nights = _stay_nights(pending["check_in"], pending["check_out"])
+    if not nights:
+        raise RoomUnavailableError("A reservation must cover at least one night.")
 
-    return result.lastrowid
+    for attempt in range(BOOKING_LOCK_RETRIES + 1):
+        try:
+            # Read in the transaction: a stale catalog snapshot may not know the room yet
+            room_type_id = db.session.execute(
+                text("SELECT RoomTypeID FROM room WHERE RoomID = :room"), {"room": pending["room_id"]}
+            ).scalar()
+            if room_type_id is None:
+                db.session.rollback()
+                raise RoomUnavailableError("This room no longer exists.")
 
-def write_audit_log(customer_id: int, room_number: str, in_date: str, out_date: str):
+            result = db.session.execute(text("""
+                INSERT INTO reservation
+                    (CustomerID, RoomID, CheckInDate, CheckOutDate, NumberOfGuests, ReservationStatus)
+                VALUES
+                    (:cust, :room, :in_date, :out_date, :guests, 'Confirmed')
+            """), {
+                "cust":     customer_id,
+                "room":     pending["room_id"],
+                "in_date":  pending["check_in"],
+                "out_date": pending["check_out"],
+                "guests":   pending["guests"],
+            })
+            reservation_id = result.lastrowid
+
+            # Priced like the summary the customer confirmed (compute_totals)
+            night_rows = price_room_nights([(
+                reservation_id, pending["room_id"], room_type_id, pending["price_per_night"],
+                pending["check_in"], pending["check_out"],
+            )])
+            db.session.execute(INSERT_ROOM_NIGHTS, night_rows)
+            apply_nights_to_rollup(night_rows, pending["guests"])
+            db.session.commit()
+            break
+
+        except IntegrityError as e:
+            db.session.rollback()
+            if not _is_room_night_conflict(e):
+                raise
+            AVAILABILITY_CONFLICTS.inc(source="confirm_reservation")
+            raise RoomUnavailableError("This room is no longer available for those dates.")
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt == BOOKING_LOCK_RETRIES or not _is_lock_error(e):
+                raise
+            _retry_backoff(attempt)
+
+    BOOKINGS_CONFIRMED.inc()
+
+    # Keeps the in-memory availability index and occupancy calendar in step with the new booking
+    record_confirmed_stay(pending["room_id"], pending["check_in"], pending["check_out"])
+    invalidate_stay_months(pending["check_in"], pending["check_out"])
+
+    return reservation_id
+
+def set_reservation_status(reservation_id: int, status: str):
     """
-    Attempts Audit log. Let caller ignore failures.
+    Changes a reservation's status in one transaction with everything that
+    depends on it: leaving Confirmed releases its room nights and takes them
+    out of the occupancy rollup at the revenue they were booked at; becoming
+    Confirmed claims the nights again at the current price
+    (RoomUnavailableError if another booking took one meanwhile) and adds
+    them back. Returns the previous status.
     """
-    db.session.execute(text("""
-        INSERT INTO auditlog (CustomerID, Action, Description)
-        VALUES (
-          :cust,
-          'Reservation Created',
-          CONCAT('Reservation for room ', :roomnum, ' from ', :in_date, ' to ', :out_date)
+    if status not in RESERVATION_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(RESERVATION_STATUSES)}.")
+
+    lock = " FOR UPDATE" if db.session.get_bind().dialect.name == "mysql" else ""
+    row = db.session.execute(text(f"""
+        SELECT RoomID, CheckInDate, CheckOutDate, NumberOfGuests, ReservationStatus
+        FROM reservation
+        WHERE ReservationID = :rid{lock}
+    """), {"rid": reservation_id}).mappings().first()
+    if row is None:
+        db.session.rollback()
+        raise ReservationNotFoundError(f"Reservation {reservation_id} does not exist.")
+
+    old_status = row.ReservationStatus
+    if old_status == status:
+        db.session.rollback()
+        return old_status
+
+    check_in = as_date(row.CheckInDate).strftime(DATE_FMT)
+    check_out = as_date(row.CheckOutDate).strftime(DATE_FMT)
+    try:
+        if old_status == "Confirmed":
+            # Taken out at the revenue stored when the nights were booked
+            released = db.session.execute(text("""
+                SELECT rn.StayDate AS night, COALESCE(rn.RoomTypeID, rm.RoomTypeID) AS type,
+                       COALESCE(rn.Revenue, 0) AS revenue
+                FROM roomnight rn
+                JOIN room rm ON rm.RoomID = rn.RoomID
+                WHERE rn.ReservationID = :rid
+            """), {"rid": reservation_id}).mappings().all()
+            db.session.execute(text("DELETE FROM roomnight WHERE ReservationID = :rid"), {"rid": reservation_id})
+            apply_nights_to_rollup(released, row.NumberOfGuests, sign=-1)
+        if status == "Confirmed":
+            # Confirming again books the stay anew, at today's price and rules
+            room = db.session.execute(text("""
+                SELECT rm.RoomTypeID, rt.PricePerNight
+                FROM room rm
+                JOIN roomtype rt ON rt.RoomTypeID = rm.RoomTypeID
+                WHERE rm.RoomID = :room
+            """), {"room": row.RoomID}).one()
+            night_rows = price_room_nights([
+                (reservation_id, row.RoomID, room.RoomTypeID, room.PricePerNight, check_in, check_out),
+            ])
+            db.session.execute(INSERT_ROOM_NIGHTS, night_rows)
+            apply_nights_to_rollup(night_rows, row.NumberOfGuests)
+        db.session.execute(
+            text("UPDATE reservation SET ReservationStatus = :status WHERE ReservationID = :rid"),
+            {"status": status, "rid": reservation_id},
         )
-    """), {
-        "cust":     customer_id,
-        "roomnum":  room_number,
-        "in_date":  in_date,
-        "out_date": out_date,
-    })
-    db.session.commit()
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_room_night_conflict(e):
+            raise
+        AVAILABILITY_CONFLICTS.inc(source="set_reservation_status")
+        raise RoomUnavailableError("Another reservation holds some of these room nights.")
+
+    # Freed nights can't be taken out of the availability index one by one: reload it
+    if status == "Confirmed":
+        record_confirmed_stay(row.RoomID, check_in, check_out)
+    else:
+        availability_index.invalidate()
+    invalidate_stay_months(check_in, check_out)
+
+    return old_status
+
+def backfill_room_nights(batch_size: int = 5000, log=print):
+    """
+    Claims the room nights of every Confirmed reservation that doesn't hold
+    them yet: needed once on a database whose reservations predate the
+    roomnight table, since room_is_available() and the primary key only
+    look at roomnight. Also prices the nights stored before roomnight had
+    RoomTypeID / Revenue. The original quotes are not known, so those nights
+    get the room's current price and rate rules. Safe to run again, and
+    while bookings are taken (nights already held are skipped). Reservations
+    are read in ReservationID order, batch_size per transaction.
+
+    Confirmed reservations that overlap an earlier one (double bookings made
+    before roomnight existed) can't get all their nights; their IDs are
+    returned in "conflicts" for someone to resolve by hand.
+    Returns a summary dict.
+    """
+    started = time.perf_counter()
+    insert = INSERT_ROOM_NIGHTS_IGNORE[db.session.get_bind().dialect.name]
+    summary = {"reservations": 0, "nights": 0, "inserted": 0, "priced": 0, "conflicts": []}
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(text("""
+            SELECT r.ReservationID, r.RoomID, rm.RoomTypeID, rt.PricePerNight, r.CheckInDate, r.CheckOutDate
+            FROM reservation r
+            JOIN room rm     ON rm.RoomID = r.RoomID
+            JOIN roomtype rt ON rt.RoomTypeID = rm.RoomTypeID
+            WHERE r.ReservationStatus = 'Confirmed' AND r.ReservationID > :last
+            ORDER BY r.ReservationID
+            LIMIT :limit
+        """), {"last": last_id, "limit": batch_size}).all()
+        if not rows:
+            break
+        last_id = rows[-1].ReservationID
+        span = {"first": rows[0].ReservationID, "last": last_id}
+
+        stays = [tuple(row) for row in rows if as_date(row.CheckOutDate) > as_date(row.CheckInDate)]
+        night_rows = price_room_nights(stays)
+        if night_rows:
+            summary["inserted"] += db.session.execute(insert, night_rows).rowcount
+
+        unpriced = set(db.session.execute(text("""
+            SELECT DISTINCT ReservationID FROM roomnight
+            WHERE ReservationID >= :first AND ReservationID <= :last
+              AND (RoomTypeID IS NULL OR Revenue IS NULL)
+        """), span).scalars())
+        updates = [night for night in night_rows if night["rid"] in unpriced]
+        if updates:
+            db.session.execute(text("""
+                UPDATE roomnight SET RoomTypeID = :type, Revenue = :revenue
+                WHERE RoomID = :room AND StayDate = :night AND ReservationID = :rid
+            """), updates)
+            summary["priced"] += len(updates)
+
+        held = dict(db.session.execute(text("""
+            SELECT ReservationID, COUNT(*) FROM roomnight
+            WHERE ReservationID >= :first AND ReservationID <= :last
+            GROUP BY ReservationID
+        """), span).all())
+        db.session.commit()
+
+        nights = {}
+        for night in night_rows:
+            nights[night["rid"]] = nights.get(night["rid"], 0) + 1
+        summary["reservations"] += len(rows)
+        summary["nights"] += len(night_rows)
+        summary["conflicts"].extend(rid for rid, count in nights.items() if held.get(rid, 0) < count)
+        log(f"... up to reservation {last_id}: {summary['reservations']:,} reservations, "
+            f"{summary['inserted']:,} nights claimed, {summary['priced']:,} priced")
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+def write_audit_log(customer_id: int, room_number: str, in_date: str, out_date: str):
+    """
+    Records the booking in the audit log. The row is written in the background
+    (see audit_service.py), so this neither waits for nor fails on the insert.
+    """
+    record_audit_event(
+        customer_id,
+        "Reservation Created",
+        f"Reservation for room {room_number} from {in_date} to {out_date}",
+    )
@@ -1,10 +1,13 @@
-from sqlalchemy import text
-from extensions import db
+from services.catalog_service import get_catalog
+
+# Rooms, room types and amenities are served from the in-process catalog
+# snapshot (see catalog_service), so none of these functions touch the DB
+# while the snapshot is fresh.
 
 def list_rooms_paginated(page: int, per_page: int):
     """
     Returns (rooms, total_pages) for the rooms listing.
-    - rooms: list of mappings for the current page
+    - rooms: list of room records for the current page
     - total_pages: pages count derived from total rooms & per_page
     """
     # sanitizes inputs
@@ -12,66 +15,29 @@ def list_rooms_paginated(page: int, per_page: int):
     per_page = max(int(per_page or 1), 1)
     offset = (page - 1) * per_page
 
-    total = db.session.execute(
-        text("SELECT COUNT(*) FROM room")
-    ).scalar() or 0
-
+    rooms = get_catalog().rooms  # already ordered by RoomNumber
+    total = len(rooms)
     total_pages = max((total + per_page - 1) // per_page, 1)
 
-    rooms = db.session.execute(
-        text("""
-            SELECT 
-                r.RoomID,
-                r.ADAAccessible,
-                r.ImagePath,
-                rt.TypeName,
-                rt.PricePerNight,
-                rt.MaxOccupancy
-            FROM room r
-            JOIN roomtype rt ON r.RoomTypeID = rt.RoomTypeID
-            ORDER BY r.RoomNumber
-            LIMIT :limit OFFSET :offset
-        """),
-        {"limit": per_page, "offset": offset}
-    ).mappings().all()
+    return list(rooms[offset:offset + per_page]), total_pages
 
-    return rooms, total_pages
+def get_rooms_by_ids(room_ids):
+    """
+    Fetch several rooms with their joined roomtype fields.
+    Returns a list of room records ordered by RoomNumber.
+    """
+    room_ids = set(room_ids)
+    return [room for room in get_catalog().rooms if room.RoomID in room_ids]
 
 def get_room_with_type(room_id: int):
     """
     Fetch a single room with its joined roomtype fields.
-    Returns a mapping row or None.
+    Returns a room record or None.
     """
-    return db.session.execute(
-        text("""
-            SELECT
-                r.RoomID,
-                r.RoomNumber,
-                r.ADAAccessible,
-                r.Description,
-                r.ImagePath,
-                rt.TypeName,
-                rt.PricePerNight,
-                rt.MaxOccupancy,
-                rt.BedConfiguration
-            FROM room r
-            JOIN roomtype rt ON r.RoomTypeID = rt.RoomTypeID
-            WHERE r.RoomID = :r_id
-        """),
-        {"r_id": room_id},
-    ).mappings().first()
+    return get_catalog().rooms_by_id.get(room_id)
 
 def load_amenities(room_id: int):
     """
-    Load amenities for a room as a list of mapping rows.
+    Load amenities for a room as a tuple of amenity records (ordered by Name).
     """
-    return db.session.execute(
-        text("""
-            SELECT a.AmenityID, a.Name
-            FROM roomamenity ra
-            JOIN amenity a ON a.AmenityID = ra.AmenityID
-            WHERE ra.RoomID = :r_id
-            ORDER BY a.Name
-        """),
-        {"r_id": room_id},
-    ).mappings().all()
+    return get_catalog().amenities_by_room.get(room_id, ())
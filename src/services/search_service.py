@@ -0,0 +1,283 @@
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from services.availability_service import find_available_room_ids
+from services.booking_service import BookingValidationError, parse_date_range, parse_guests
+from services.catalog_service import get_catalog
+
+# Parsed search filters; None / () / False = not filtered on
+RoomSearch = namedtuple("RoomSearch", [
+    "amenity_ids", "ada", "guests", "min_price", "max_price", "room_type_id", "check_in", "check_out",
+])
+RoomSearch.__new__.__defaults__ = ((), False, None, None, None, None, None, None)
+
+SearchResult = namedtuple("SearchResult", ["rooms", "total", "page", "total_pages", "facets"])
+
+# Query string keys of the listing / search filters ("amenity" may repeat)
+SEARCH_ARGS = ("check_in", "check_out", "guests", "amenity", "ada", "min_price", "max_price", "room_type")
+
+
+class RoomSearchIndex:
+    """
+    Bitmap index over one CatalogSnapshot.
+
+    Every room gets a bit position (its place in the RoomNumber ordering) and
+    every filterable attribute value a Python int with the bits of the rooms
+    that have it. A filter combination is the AND of a few of these ints and
+    a facet count the popcount of one more AND, so a search over thousands of
+    rooms is a handful of big-int operations and no join.
+    """
+
+    def __init__(self, snapshot):
+        self.digest = snapshot.digest
+        self.rooms = snapshot.rooms
+        self.position = {room.RoomID: i for i, room in enumerate(self.rooms)}
+        self.all = (1 << len(self.rooms)) - 1
+
+        self.ada = 0
+        self.by_amenity = {amenity.AmenityID: 0 for amenity in snapshot.amenities}
+        self.by_room_type = {room_type.RoomTypeID: 0 for room_type in snapshot.room_types}
+        by_occupancy, by_price = {}, {}
+
+        for i, room in enumerate(self.rooms):
+            bit = 1 << i
+            if room.ADAAccessible:
+                self.ada |= bit
+            self.by_room_type[room.RoomTypeID] = self.by_room_type.get(room.RoomTypeID, 0) | bit
+            for amenity in snapshot.amenities_by_room.get(room.RoomID, ()):
+                self.by_amenity[amenity.AmenityID] |= bit
+            occupancy, price = int(room.MaxOccupancy), float(room.PricePerNight)
+            by_occupancy[occupancy] = by_occupancy.get(occupancy, 0) | bit
+            by_price[price] = by_price.get(price, 0) | bit
+
+        # Range filters use cumulative bitmaps over the distinct values:
+        # occupancy_at_least[i] = rooms sleeping >= occupancies[i],
+        # price_at_most[i] = rooms costing <= prices[i]
+        self.occupancies = sorted(by_occupancy)
+        self.occupancy_at_least = self._cumulative([by_occupancy[v] for v in reversed(self.occupancies)])[::-1]
+        self.prices = sorted(by_price)
+        self.price_at_most = self._cumulative([by_price[v] for v in self.prices])
+
+        self.amenities = snapshot.amenities
+        self.room_types = snapshot.room_types
+
+    @staticmethod
+    def _cumulative(bitmaps):
+        out, acc = [], 0
+        for bits in bitmaps:
+            acc |= bits
+            out.append(acc)
+        return out
+
+    # -----------------
+    # Filters
+    # -----------------
+
+    def sleeps_at_least(self, guests: int):
+        i = bisect_left(self.occupancies, guests)
+        return self.occupancy_at_least[i] if i < len(self.occupancies) else 0
+
+    def price_between(self, min_price: float | None, max_price: float | None):
+        bits = self.all
+        if min_price is not None:
+            i = bisect_left(self.prices, min_price)  # distinct prices below min_price
+            if i:
+                bits &= ~self.price_at_most[i - 1]
+        if max_price is not None:
+            j = bisect_right(self.prices, max_price)  # distinct prices up to max_price
+            bits &= self.price_at_most[j - 1] if j else 0
+        return bits
+
+    def from_room_ids(self, room_ids):
+        bits = 0
+        for room_id in room_ids:
+            i = self.position.get(room_id)
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def match(self, search: RoomSearch, available_ids=None, skip_room_type: bool = False):
+        """
+        Bitmap of the rooms matching every filter of `search` (and, if given,
+        whose RoomID is in available_ids).
+        """
+        bits = self.all
+        for amenity_id in search.amenity_ids:
+            bits &= self.by_amenity.get(amenity_id, 0)
+        if search.ada:
+            bits &= self.ada
+        if search.guests is not None:
+            bits &= self.sleeps_at_least(search.guests)
+        if search.min_price is not None or search.max_price is not None:
+            bits &= self.price_between(search.min_price, search.max_price)
+        if search.room_type_id is not None and not skip_room_type:
+            bits &= self.by_room_type.get(search.room_type_id, 0)
+        if available_ids is not None:
+            bits &= self.from_room_ids(available_ids)
+        return bits
+
+    def facets(self, bits: int, type_bits: int):
+        """
+        Counts for the filter options: how many of the matching rooms (`bits`)
+        have each amenity / are ADA accessible, and how many rooms of each
+        type match the other filters (`type_bits`, i.e. ignoring room_type).
+        """
+        return {
+            "amenities": [
+                {"id": amenity.AmenityID, "name": amenity.Name,
+                 "count": (bits & self.by_amenity[amenity.AmenityID]).bit_count()}
+                for amenity in self.amenities
+            ],
+            "ada": (bits & self.ada).bit_count(),
+            "room_types": [
+                {"id": room_type.RoomTypeID, "name": room_type.TypeName,
+                 "count": (type_bits & self.by_room_type[room_type.RoomTypeID]).bit_count()}
+                for room_type in self.room_types
+            ],
+        }
+
+    def page(self, bits: int, offset: int, limit: int):
+        """
+        Rooms of the set bits offset .. offset + limit, in RoomNumber order.
+        """
+        digits = bin(bits)[:1:-1]  # digits[i] is bit i
+        rooms, i, seen = [], digits.find("1"), 0
+        while i != -1 and len(rooms) < limit:
+            if seen >= offset:
+                rooms.append(self.rooms[i])
+            seen += 1
+            i = digits.find("1", i + 1)
+        return rooms
+
+
+class SearchIndexHolder:
+    """
+    The index of the current catalog snapshot, rebuilt whenever the catalog
+    content (its digest) changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self.builds = 0
+
+    def get(self, snapshot):
+        index = self._index
+        if index is not None and index.digest == snapshot.digest:
+            return index
+        with self._lock:
+            if self._index is None or self._index.digest != snapshot.digest:
+                self._index = RoomSearchIndex(snapshot)
+                self.builds += 1
+            return self._index
+
+
+search_index = SearchIndexHolder()
+
+
+def get_search_index():
+    return search_index.get(get_catalog())
+
+def search_args(args):
+    """
+    The non-empty search filters of a request's query string, as strings
+    ("amenity" as a list), e.g. to repeat them in pagination links.
+    """
+    filters = {}
+    for key in SEARCH_ARGS:
+        if key == "amenity":
+            values = [value.strip() for value in args.getlist(key) if value.strip()]
+        else:
+            values = args.get(key, "").strip()
+        if values:
+            filters[key] = values
+    return filters
+
+def _parse_price(value: str, label: str):
+    try:
+        price = float(value)
+    except ValueError:
+        raise BookingValidationError(f"{label} must be a number.")
+    if not math.isfinite(price):
+        raise BookingValidationError(f"{label} must be a number.")
+    if price < 0:
+        raise BookingValidationError(f"{label} can't be negative.")
+    return price
+
+def parse_search_filters(filters: dict):
+    """
+    Turns search_args() into a RoomSearch.
+    Raises BookingValidationError with a user-friendly message on error.
+    """
+    index = get_search_index()
+
+    amenity_ids = []
+    for value in filters.get("amenity", ()):
+        if not value.isdigit() or int(value) not in index.by_amenity:
+            raise BookingValidationError("Unknown amenity.")
+        amenity_ids.append(int(value))
+
+    room_type_id = None
+    if filters.get("room_type"):
+        if not filters["room_type"].isdigit() or int(filters["room_type"]) not in index.by_room_type:
+            raise BookingValidationError("Unknown room type.")
+        room_type_id = int(filters["room_type"])
+
+    check_in = check_out = None
+    if filters.get("check_in") or filters.get("check_out"):
+        check_in, check_out = parse_date_range(filters.get("check_in", ""), filters.get("check_out", ""))
+
+    min_price = _parse_price(filters["min_price"], "Minimum price") if filters.get("min_price") else None
+    max_price = _parse_price(filters["max_price"], "Maximum price") if filters.get("max_price") else None
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise BookingValidationError("Minimum price can't be above the maximum price.")
+
+    return RoomSearch(
+        amenity_ids=tuple(sorted(set(amenity_ids))),
+        ada=filters.get("ada", "").lower() in ("1", "true", "yes", "on"),
+        guests=parse_guests(filters["guests"]) if filters.get("guests") else None,
+        min_price=min_price,
+        max_price=max_price,
+        room_type_id=room_type_id,
+        check_in=check_in,
+        check_out=check_out,
+    )
+
+def search_rooms(search: RoomSearch, page: int = 1, per_page: int = 20):
+    """
+    Returns a SearchResult: one page of the matching rooms (RoomNumber
+    order), their total count and the facet counts. Only a date range
+    touches the DB (through the availability index).
+    """
+    index = get_search_index()
+    page = max(int(page or 1), 1)
+    per_page = max(int(per_page or 1), 1)
+
+    available_ids = None
+    if search.check_in is not None:
+        available_ids = find_available_room_ids(search.check_in, search.check_out, search.guests)
+
+    type_bits = index.match(search, available_ids, skip_room_type=True)
+    bits = type_bits
+    if search.room_type_id is not None:
+        bits &= index.by_room_type.get(search.room_type_id, 0)
+
+    total = bits.bit_count()
+    return SearchResult(
+        rooms=index.page(bits, (page - 1) * per_page, per_page),
+        total=total,
+        page=page,
+        total_pages=max((total + per_page - 1) // per_page, 1),
+        facets=index.facets(bits, type_bits),
+    )
+
+def search_index_stats():
+    index = search_index._index
+    return {
+        "builds":  search_index.builds,
+        "digest":  index.digest if index else None,
+        "rooms":   len(index.rooms) if index else 0,
+        "bitmaps": (len(index.by_amenity) + len(index.by_room_type) + len(index.occupancies)
+                    + len(index.prices) + 1) if index else 0,
+    }
@@ -1,5 +1,11 @@
+import hashlib
+import threading
+import time
+from flask import current_app
 from extensions import db
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from models import TeamMember, TeamMemberContribution
 
 class TeamMessageError(Exception):
     """Raised when sending a team message fails."""
@@ -13,7 +19,7 @@ def save_team_message(member_id: int, sender_name: str, sender_email: str, messa
         db.session.execute(
             text("""
                 INSERT INTO team_message (team_member_id, sender_name, sender_email, message, sent_at)
-                VALUES (:member_id, :sender_name, :sender_email, :message, NOW())
+                VALUES (:member_id, :sender_name, :sender_email, :message, CURRENT_TIMESTAMP)
             """),
             {
                 "member_id": member_id,
@@ -27,9 +33,27 @@ def save_team_message(member_id: int, sender_name: str, sender_email: str, messa
         db.session.rollback()
         raise TeamMessageError(str(e))
 
+def _member_dict(member, contributions):
+    return {
+        "id":            member.id,
+        "first_name":    member.first_name,
+        "middle_name":   member.middle_name,
+        "last_name":     member.last_name,
+        "role":          member.role,
+        "bio":           member.bio,
+        "fun_fact":      member.fun_fact,
+        "linkedin_url":  member.linkedin_url,
+        "github_url":    member.github_url,
+        "email":         member.email,
+        "profile_image": member.profile_image,
+        "contributions": contributions,
+    }
+
 def get_team_with_contributions():
     """
     Returns a list of team members, each with their contributions array.
+    Always runs exactly two queries (members, then every contribution),
+    no matter how many members there are.
     Shape:
     [
       {
@@ -63,38 +87,20 @@ def get_team_with_contributions():
         .all()
     )
 
-    team = []
-    for member in member_rows:
-        # Fetches team member's contributions
-        contribution_rows = (
-            db.session.execute(
-                text("""
-                    SELECT contribution
-                    FROM team_member_contribution
-                    WHERE team_member_id = :tid
-                """),
-                {"tid": member.id},
-            )
-            .scalars()
-            .all()
-        )
+    # Fetches every contribution at once and groups them by member
+    contribution_rows = db.session.execute(
+        text("""
+            SELECT team_member_id, contribution
+            FROM team_member_contribution
+            ORDER BY team_member_id, id
+        """)
+    ).all()
+
+    contributions = {}
+    for member_id, contribution in contribution_rows:
+        contributions.setdefault(member_id, []).append(contribution)
 
-        team.append({
-            "id":            member.id,
-            "first_name":    member.first_name,
-            "middle_name":   member.middle_name,
-            "last_name":     member.last_name,
-            "role":          member.role,
-            "bio":           member.bio,
-            "fun_fact":      member.fun_fact,
-            "linkedin_url":  member.linkedin_url,
-            "github_url":    member.github_url,
-            "email":         member.email,
-            "profile_image": member.profile_image,
-            "contributions": contribution_rows,
-        })
-
-    return team
+    return [_member_dict(member, contributions.get(member.id, [])) for member in member_rows]
 
 def get_team_member_with_contributions(member_id: int):
     """
@@ -126,6 +132,7 @@ def get_team_member_with_contributions(member_id: int):
                 SELECT contribution
                 FROM team_member_contribution
                 WHERE team_member_id = :id
+                ORDER BY id
             """),
             {"id": member_id},
         )
@@ -133,17 +140,101 @@ def get_team_member_with_contributions(member_id: int):
         .all()
     )
 
-    return {
-        "id":            member_row.id,
-        "first_name":    member_row.first_name,
-        "middle_name":   member_row.middle_name,
-        "last_name":     member_row.last_name,
-        "role":          member_row.role,
-        "bio":           member_row.bio,
-        "fun_fact":      member_row.fun_fact,
-        "linkedin_url":  member_row.linkedin_url,
-        "github_url":    member_row.github_url,
-        "email":         member_row.email,
-        "profile_image": member_row.profile_image,
-        "contributions": contribution_rows,
-    }
+    return _member_dict(member_row, contribution_rows)
+
+
+class TeamResponseCache:
+    """
+    Keeps the serialized JSON bodies for /api/team and /api/team/<id>.
+    The version is a hash of the team data, so every worker process computes
+    the same value for the same rows and it can be used directly as an ETag.
+    Entries are rebuilt after TEAM_CACHE_TTL seconds or on invalidate().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = None
+        self._generation = 0
+
+    def get(self, ttl_seconds: int):
+        entry = self._entry
+        if entry and (ttl_seconds <= 0 or time.monotonic() - entry["built_at"] < ttl_seconds):
+            return entry
+
+        with self._lock:
+            entry = self._entry
+            if entry and (ttl_seconds <= 0 or time.monotonic() - entry["built_at"] < ttl_seconds):
+                return entry
+
+            generation = self._generation
+            team = get_team_with_contributions()
+            dumps = current_app.json.dumps
+            team_json = dumps(team).encode()
+
+            entry = {
+                "version":      hashlib.sha1(team_json).hexdigest()[:16],
+                "built_at":     time.monotonic(),
+                "team_json":    team_json,
+                "members_json": {member["id"]: dumps(member).encode() for member in team},
+            }
+            # Don't publish data read before an invalidation that raced with the build
+            if generation == self._generation:
+                self._entry = entry
+            return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+team_cache = TeamResponseCache()
+
+
+def get_team_json():
+    """
+    Returns (version, JSON bytes) for the whole team.
+    """
+    entry = team_cache.get(int(current_app.config.get("TEAM_CACHE_TTL", 600)))
+    return entry["version"], entry["team_json"]
+
+def get_team_member_json(member_id: int):
+    """
+    Returns (version, JSON bytes) for one member; the bytes are None if not found.
+    """
+    entry = team_cache.get(int(current_app.config.get("TEAM_CACHE_TTL", 600)))
+    return entry["version"], entry["members_json"].get(member_id)
+
+def get_team_version():
+    """
+    Version (content hash) of the cached team data.
+    """
+    return team_cache.get(int(current_app.config.get("TEAM_CACHE_TTL", 600)))["version"]
+
+def invalidate_team_cache(*_args):
+    """
+    Drops the cached team JSON. Called after a session commits ORM changes
+    to the team models (below); call it directly after changing team rows
+    with raw SQL, once they are committed.
+    """
+    team_cache.invalidate()
+
+
+# Invalidating at flush time would let a rebuild that starts between the
+# flush and the commit read the old rows and keep them for TEAM_CACHE_TTL:
+# flushes only note that team rows changed, the commit invalidates.
+TEAM_MODELS = (TeamMember, TeamMemberContribution)
+
+@event.listens_for(Session, "after_flush")
+def _note_team_changes(session, _flush_context):
+    if any(isinstance(obj, TEAM_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["team_cache_dirty"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("team_cache_dirty", False):
+        invalidate_team_cache()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_team_changes(session):
+    session.info.pop("team_cache_dirty", None)
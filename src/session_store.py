@@ -0,0 +1,370 @@
+"""
+Server-side sessions: the cookie carries only an opaque random id and the
+session data (login details, pending reservation, CSRF token) stays on the
+server, in one of the SESSION_BACKENDS:
+
+- "memory": an LRU dict in this process. Single worker process only.
+- "sqlite": a SQLite file shared by every worker process on the host.
+- "cookie": Flask's signed cookie sessions (the old behavior).
+
+SESSION_BACKEND can also be "package.module:Class" for a custom SessionStore.
+The data is only read when the request actually touches the session (static
+files never do), only written back when it changed, and expires after
+SESSION_TTL idle seconds; a background thread deletes expired entries.
+"""
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.utils import import_string
+
+serializer = TaggedJSONSerializer()
+
+
+class SessionStore:
+    """
+    Interface of a session backend. `data` is the serialized session (str);
+    `ttl` is in seconds from now.
+    """
+
+    def get(self, sid: str):
+        raise NotImplementedError
+
+    def set(self, sid: str, data: str, ttl: int):
+        raise NotImplementedError
+
+    def touch(self, sid: str, ttl: int):
+        raise NotImplementedError
+
+    def delete(self, sid: str):
+        raise NotImplementedError
+
+    def sweep(self):
+        """Deletes expired entries; returns how many."""
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in a dict of this process, least recently used evicted first
+    beyond max_entries.
+    """
+
+    def __init__(self, app):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # sid -> (expires_at, data)
+        self.max_entries = app.config["SESSION_MEMORY_MAX_ENTRIES"]
+        self.evictions = 0
+
+    def get(self, sid: str):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return entry[1]
+
+    def set(self, sid: str, data: str, ttl: int):
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, data)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, sid: str, ttl: int):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is not None:
+                self._entries[sid] = (time.time() + ttl, entry[1])
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (expires_at, _data) in self._entries.items() if expires_at <= now]
+            for sid in expired:
+                del self._entries[sid]
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file (WAL mode), so every worker process on the host
+    sees the same sessions. One connection per thread.
+    """
+
+    def __init__(self, app):
+        self.path = app.config["SESSION_SQLITE_PATH"] or os.path.join(app.instance_path, "sessions.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS session (
+                    sid     TEXT PRIMARY KEY,
+                    data    TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+            con.execute("CREATE INDEX IF NOT EXISTS session_expires ON session (expires)")
+
+    def _connect(self):
+        con = getattr(self._local, "con", None)
+        if con is None or getattr(self._local, "pid", None) != os.getpid():
+            con = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
+            self._local.con, self._local.pid = con, os.getpid()
+        return con
+
+    def get(self, sid: str):
+        row = self._connect().execute(
+            "SELECT data FROM session WHERE sid = ? AND expires > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, data: str, ttl: int):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO session (sid, data, expires) VALUES (?, ?, ?)", (sid, data, time.time() + ttl)
+        )
+
+    def touch(self, sid: str, ttl: int):
+        self._connect().execute("UPDATE session SET expires = ? WHERE sid = ?", (time.time() + ttl, sid))
+
+    def delete(self, sid: str):
+        self._connect().execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def sweep(self):
+        return self._connect().execute("DELETE FROM session WHERE expires <= ?", (time.time(),)).rowcount
+
+    def stats(self):
+        return {
+            "path":    self.path,
+            "entries": self._connect().execute("SELECT COUNT(*) FROM session").fetchone()[0],
+        }
+
+
+SESSION_BACKENDS = {
+    "memory": MemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+}
+
+
+# -----------------
+# Flask integration
+# -----------------
+
+class ServerSideSession(SessionMixin):
+    """
+    The session of one request. Nothing is read from the store until the
+    first access, and `modified` tracks whether it needs writing back.
+    """
+
+    def __init__(self, store: SessionStore, sid: str | None):
+        self.store = store
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        self.regenerated = False
+        self._data = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            raw = self.store.get(self.sid) if self.sid else None
+            self._data = serializer.loads(raw) if raw else {}
+            if self.sid and raw is None:
+                self.new = True  # expired or unknown id: start over with a fresh one
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def regenerate(self):
+        """
+        Moves the data to a new id (call on login, against session fixation).
+        """
+        self._load()
+        self.regenerated = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, store: SessionStore, ttl: int):
+        self.store = store
+        self.ttl = ttl
+        self.counters = {"loads": 0, "writes": 0, "touches": 0, "deletes": 0}
+        self._touched = {}  # sid -> monotonic time this process last refreshed its expiry
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        return ServerSideSession(self.store, sid or None)
+
+    def save_session(self, app, session, response):
+        if not session.loaded:
+            return  # never touched: nothing read, nothing to write
+        self.counters["loads"] += 1
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.sid:
+                if not session.new:
+                    self.store.delete(session.sid)
+                    self.counters["deletes"] += 1
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        old_sid = session.sid
+        if session.new or session.regenerated:
+            session.sid = secrets.token_urlsafe(32)
+
+        if session.modified or session.sid != old_sid:
+            self.store.set(session.sid, serializer.dumps(dict(session)), self.ttl)
+            self.counters["writes"] += 1
+            self._touched[session.sid] = time.monotonic()
+            if old_sid and session.regenerated:
+                self.store.delete(old_sid)
+        elif session.accessed:
+            # Sliding expiry without a write per request: the store only has to
+            # know the session is alive before half of its TTL is used up
+            self._maybe_touch(session)
+
+        if session.sid != old_sid or (session.permanent and self.should_set_cookie(app, session)):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+    def _maybe_touch(self, session):
+        now = time.monotonic()
+        touched = self._touched.get(session.sid)
+        if touched is None or now - touched > self.ttl / 2:
+            self.store.touch(session.sid, self.ttl)
+            self.counters["touches"] += 1
+            if len(self._touched) >= 10000:
+                self._touched.clear()
+            self._touched[session.sid] = now
+
+    def stats(self):
+        return {
+            "backend": type(self.store).__name__,
+            "ttl":     self.ttl,
+            **self.counters,
+            **self.store.stats(),
+        }
+
+
+class SessionSweeper:
+    """
+    Background thread deleting expired sessions every `interval` seconds.
+    Started lazily, so a forked worker runs its own.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self.store = None
+        self.interval = 300
+        self.swept = 0
+
+    def ensure_started(self):
+        if self.store is None or self.interval <= 0:
+            return
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.swept += self.store.sweep()
+            except sqlite3.Error:
+                pass
+
+
+sweeper = SessionSweeper()
+
+
+def regenerate_session(session):
+    """
+    Gives the session a new id if the backend supports it (no-op for cookies).
+    """
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+def get_session_stats(app):
+    interface = app.session_interface
+    if not isinstance(interface, ServerSideSessionInterface):
+        return {"backend": "cookie"}
+    return {**interface.stats(), "swept": sweeper.swept}
+
+def init_sessions(app):
+    """
+    Installs the SESSION_BACKEND store as the app's session interface.
+    """
+    backend = app.config["SESSION_BACKEND"]
+    if backend == "cookie":
+        app.session_interface = SecureCookieSessionInterface()
+        return
+
+    store_class = SESSION_BACKENDS.get(backend) or import_string(backend.replace(":", "."))
+    store = store_class(app)
+    app.session_interface = ServerSideSessionInterface(store, app.config["SESSION_TTL"])
+
+    sweeper.store = store
+    sweeper.interval = app.config["SESSION_SWEEP_INTERVAL"]
+
+    @app.before_request
+    def _start_sweeper():
+        sweeper.ensure_started()
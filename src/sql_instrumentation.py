@@ -0,0 +1,200 @@
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from extensions import db
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str):
+    """
+    Collapses a SQL statement to its shape: literals become ?, IN lists of
+    any length become (?), whitespace is squeezed. Two executions with
+    different parameters normalize to the same string.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class RequestSqlStats:
+    """
+    SQL statements run while handling one (sampled) request.
+    """
+
+    __slots__ = ("count", "total", "slowest", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = []  # (seconds, statement), longest first, at most SQL_TOP_STATEMENTS
+        self.shapes = {}   # raw statement -> executions; normalized only at the end
+
+    def record(self, statement: str, seconds: float, keep: int):
+        self.count += 1
+        self.total += seconds
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+        if len(self.slowest) < keep or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[keep:]
+
+    def repeated(self, threshold: int):
+        """
+        Normalized statements run at least `threshold` times (likely N+1), most first.
+        """
+        counts = {}
+        for statement, executions in self.shapes.items():
+            shape = normalize_statement(statement)
+            counts[shape] = counts.get(shape, 0) + executions
+        return sorted(
+            ((shape, n) for shape, n in counts.items() if n >= threshold),
+            key=lambda item: item[1], reverse=True,
+        )
+
+
+class SqlProfile:
+    """
+    Per-endpoint totals of the sampled requests of this process, plus the
+    slowest statement shapes seen, for /internal/sql.
+    """
+
+    def __init__(self, keep: int = 20):
+        self._lock = threading.Lock()
+        self.keep = keep
+        self.endpoints = {}   # endpoint -> {"requests", "statements", "db_ms", "max_statements", "n_plus_one"}
+        self.slowest = {}     # shape -> {"max_ms", "endpoint"}
+
+    def add(self, endpoint: str, stats: RequestSqlStats, repeated):
+        with self._lock:
+            totals = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "statements": 0, "db_ms": 0.0, "max_statements": 0, "n_plus_one": 0,
+            })
+            totals["requests"] += 1
+            totals["statements"] += stats.count
+            totals["db_ms"] += stats.total * 1000
+            totals["max_statements"] = max(totals["max_statements"], stats.count)
+            totals["n_plus_one"] += 1 if repeated else 0
+
+            for seconds, statement in stats.slowest:
+                shape = _short(statement)
+                entry = self.slowest.get(shape)
+                if entry is None or seconds * 1000 > entry["max_ms"]:
+                    self.slowest[shape] = {"max_ms": seconds * 1000, "endpoint": endpoint}
+            if len(self.slowest) > self.keep:
+                ranked = sorted(self.slowest.items(), key=lambda item: item[1]["max_ms"], reverse=True)
+                self.slowest = dict(ranked[:self.keep])
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: {
+                        **totals,
+                        "db_ms": round(totals["db_ms"], 3),
+                        "avg_statements": round(totals["statements"] / totals["requests"], 2),
+                        "avg_db_ms": round(totals["db_ms"] / totals["requests"], 3),
+                    }
+                    for endpoint, totals in sorted(self.endpoints.items())
+                },
+                "slowest_statements": [
+                    {"statement": shape, "max_ms": round(entry["max_ms"], 3), "endpoint": entry["endpoint"]}
+                    for shape, entry in sorted(self.slowest.items(), key=lambda item: item[1]["max_ms"], reverse=True)
+                ],
+            }
+
+
+sql_profile = SqlProfile()
+
+
+def _short(statement: str, limit: int = 160):
+    shape = normalize_statement(statement)
+    return shape if len(shape) <= limit else shape[:limit - 3] + "..."
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    config = current_app.config
+
+    slow_ms = config["SQL_SLOW_QUERY_MS"]
+    if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+        current_app.logger.warning(
+            "Slow query (%.1f ms%s%s): %s",
+            elapsed * 1000,
+            ", executemany" if executemany else "",
+            f", {request.method} {request.path}" if has_request_context() else "",
+            _short(statement, 500),
+        )
+
+    stats = g.get("sql_stats") if has_request_context() else None
+    if stats is not None:
+        stats.record(statement, elapsed, config["SQL_TOP_STATEMENTS"])
+
+def _on_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+def _start_request():
+    rate = current_app.config["SQL_SAMPLE_RATE"]
+    if rate >= 1 or (rate > 0 and random.random() < rate):
+        g.sql_stats = RequestSqlStats()
+
+def _finish_request(response):
+    stats = g.pop("sql_stats", None)
+    if stats is None:
+        return response
+    config = current_app.config
+
+    timings = [f'db;dur={stats.total * 1000:.2f};desc="{stats.count} queries"']
+    if stats.slowest:
+        timings.append(f"db-slowest;dur={stats.slowest[0][0] * 1000:.2f}")
+
+    repeated = stats.repeated(config["SQL_N_PLUS_ONE_THRESHOLD"]) if stats.count else []
+    if repeated:
+        timings.append(f'db-repeated;desc="{repeated[0][1]}x same statement"')
+        for shape, executions in repeated:
+            current_app.logger.warning(
+                "Possible N+1 in %s: statement ran %d times in one request: %s",
+                request.endpoint, executions, shape[:500],
+            )
+
+    sql_profile.add(request.endpoint or "unknown", stats, repeated)
+    response.headers.add("Server-Timing", ", ".join(timings))
+    return response
+
+def get_sql_profile():
+    return sql_profile.snapshot()
+
+def init_sql_instrumentation(app):
+    """
+    Times every statement of this app's engine (slow-query log) and, for a
+    SQL_SAMPLE_RATE share of requests, adds per-request statement count, DB
+    time and slowest statement as a Server-Timing header and logs statements
+    repeated SQL_N_PLUS_ONE_THRESHOLD+ times. SQL_SAMPLE_RATE = 0 and
+    SQL_SLOW_QUERY_MS = 0 turn it off entirely.
+    """
+    if app.config["SQL_SAMPLE_RATE"] <= 0 and app.config["SQL_SLOW_QUERY_MS"] <= 0:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+    if app.config["SQL_SAMPLE_RATE"] > 0:
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
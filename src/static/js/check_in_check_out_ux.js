@@ -29,4 +29,57 @@ if (checkIn && checkOut) {
 
     // Applies once on load (handles re-renders after errors)
     applyCheckoutMin();
-}
\ No newline at end of file
+}
+
+// Warns about already-booked nights using the room's occupancy calendar
+const bookingForm = document.querySelector("form[data-calendar-url]");
+
+if (bookingForm && checkIn && checkOut) {
+    const calendarUrl = bookingForm.dataset.calendarUrl;
+    const note = bookingForm.querySelector(".calendar-note");
+    const months = {}; // "YYYY-MM" -> Promise of booked-night bitset
+
+    function bookedBits(month) {
+        if (!months[month]) {
+            months[month] = fetch(`${calendarUrl}?month=${month}`)
+                .then((res) => (res.ok ? res.json() : { booked: 0 }))
+                .then((data) => data.booked || 0)
+                .catch(() => 0);
+        }
+        return months[month];
+    }
+
+    async function firstBookedNight(startStr, endStr) {
+        const [y1, m1, d1] = startStr.split("-").map(Number);
+        const [y2, m2, d2] = endStr.split("-").map(Number);
+        const end = new Date(y2, m2 - 1, d2);
+
+        for (let night = new Date(y1, m1 - 1, d1); night < end; night.setDate(night.getDate() + 1)) {
+            const month = `${night.getFullYear()}-${String(night.getMonth() + 1).padStart(2, "0")}`;
+            const bits = await bookedBits(month);
+            if ((bits >> (night.getDate() - 1)) & 1) {
+                return `${month}-${String(night.getDate()).padStart(2, "0")}`;
+            }
+        }
+        return null;
+    }
+
+    async function checkBookedNights() {
+        if (!checkIn.value || !checkOut.value || checkOut.value <= checkIn.value) return;
+
+        const booked = await firstBookedNight(checkIn.value, checkOut.value);
+        const message = booked
+            ? `This room is already booked on the night of ${booked}. Please choose different dates.`
+            : "";
+
+        checkOut.setCustomValidity(message);
+        if (note) {
+            note.textContent = message;
+            note.hidden = !booked;
+        }
+    }
+
+    checkIn.addEventListener("change", checkBookedNights);
+    checkOut.addEventListener("change", checkBookedNights);
+    checkBookedNights();
+}
@@ -0,0 +1,68 @@
+"""
+Jinja bytecode cache and template precompilation.
+
+Jinja compiles a template (parse, generate Python source, compile() it) the
+first time a process renders it, so a fresh worker pays for index.html,
+room_details.html and every partial they include on its first requests:
+the visitors right after a deploy or worker recycle get the slow responses.
+Both remedies are opt-in:
+- TEMPLATE_BYTECODE_CACHE keeps the compiled code of each template in
+  TEMPLATE_BYTECODE_CACHE_DIR (Jinja's FileSystemBytecodeCache), shared by
+  the worker processes of a host; the next process only unmarshals it. An
+  entry is checked against the template source, so an edited template is
+  recompiled, and against the Python version.
+- TEMPLATE_PRECOMPILE loads every template in create_app(), before the
+  first request (with a preloading server, once in the master process).
+`flask templates compile` fills the bytecode cache as a deploy step.
+"""
+
+import os
+import time
+from jinja2 import FileSystemBytecodeCache
+
+# Templates that precompile_templates() loads
+TEMPLATE_EXTENSIONS = (".html",)
+
+template_stats = {"bytecode_cache_dir": None, "precompiled": 0, "precompile_ms": 0.0}
+
+
+def bytecode_cache_dir(app):
+    return app.config["TEMPLATE_BYTECODE_CACHE_DIR"] or os.path.join(app.instance_path, "template-cache")
+
+def enable_bytecode_cache(app, directory: str | None = None):
+    """
+    Points the app's Jinja environment at an on-disk bytecode cache. Only
+    templates compiled after this call use it.
+    """
+    directory = directory or bytecode_cache_dir(app)
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    template_stats["bytecode_cache_dir"] = directory
+    return app.jinja_env.bytecode_cache
+
+def precompile_templates(app):
+    """
+    Loads (compiles, or reads from the bytecode cache) every template into
+    the environment's in-memory cache. Returns how many.
+    """
+    started = time.perf_counter()
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.endswith(TEMPLATE_EXTENSIONS))
+    for name in names:
+        app.jinja_env.get_template(name)
+    template_stats["precompiled"] = len(names)
+    template_stats["precompile_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return len(names)
+
+def get_template_stats():
+    return dict(template_stats)
+
+def init_template_cache(app):
+    """
+    Applies TEMPLATE_BYTECODE_CACHE and TEMPLATE_PRECOMPILE. Runs last in
+    create_app(), after everything that adds template globals.
+    """
+    if app.config["TEMPLATE_BYTECODE_CACHE"]:
+        enable_bytecode_cache(app)
+    if app.config["TEMPLATE_PRECOMPILE"]:
+        count = precompile_templates(app)
+        app.logger.info("Precompiled %d templates in %.1f ms", count, template_stats["precompile_ms"])
@@ -0,0 +1,182 @@
+"""
+Warmup before a process takes traffic, and the state the health endpoints
+report.
+
+warm_app() fills what every worker can share: the room catalog, search and
+availability indexes and the compiled templates. With a preloading server
+(gunicorn.conf.py) it runs once in the master, and the forked workers get
+the result copy-on-write. warm_worker() then prepares each worker: it drops
+the DB connections inherited from the master, opens its own pool,
+starts the password hashing processes and renders the WARMUP_PATHS pages
+(filling the page cache), and only then marks the worker ready. gunicorn
+runs it in post_worker_init, before the worker accepts connections.
+
+/healthz/live answers as long as the process serves requests;
+/healthz/ready answers 503 until warm_worker() has opened the DB pool, and
+retries that step on each probe if it failed (e.g. the DB was not up yet).
+"""
+
+import os
+import time
+from flask import current_app
+from sqlalchemy import text
+from extensions import db
+
+# Steps that must succeed before a worker is ready
+REQUIRED_STEPS = ("db_pool",)
+
+# Steps of warm_app(), whose results forked workers inherit
+SHARED_STEPS = ("catalog", "availability", "templates")
+
+
+class WarmupState:
+    """
+    What the warmup of this process did: per step, milliseconds or the error.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.pid = os.getpid()
+        self.phase = "starting"
+        self.steps = {}
+        self.errors = {}
+
+    def run(self, name: str, step, *args):
+        started = time.perf_counter()
+        try:
+            step(*args)
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"[:300]
+            current_app.logger.warning("Warmup step %s failed: %s", name, e)
+            return False
+        self.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+        self.errors.pop(name, None)
+        return True
+
+    @property
+    def ready(self):
+        return self.phase == "ready" and all(step in self.steps for step in REQUIRED_STEPS)
+
+    def after_fork_in_child(self):
+        """
+        A forked worker keeps the master's shared steps but must do its own.
+        """
+        self.started = time.time()
+        self.pid = os.getpid()
+        self.phase = "forked"
+        self.steps = {name: ms for name, ms in self.steps.items() if name in SHARED_STEPS}
+        self.errors = {}
+
+    def snapshot(self):
+        return {
+            "ready":          self.ready,
+            "phase":          self.phase,
+            "pid":            self.pid,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "steps_ms":       dict(self.steps),
+            "errors":         dict(self.errors),
+        }
+
+
+warmup_state = WarmupState()
+
+
+# -----------------
+# Steps
+# -----------------
+
+def _load_catalog():
+    from services.catalog_service import get_catalog
+    from services.search_service import get_search_index
+
+    get_catalog()
+    get_search_index()
+
+def _load_availability():
+    from services.availability_service import availability_index
+
+    availability_index.load()
+
+def _compile_templates(app):
+    from template_cache import precompile_templates
+
+    precompile_templates(app)
+
+def _open_db_pool(app):
+    """
+    Checks out DB_POOL_SIZE connections at once, so the pool opens that many,
+    then returns them to it.
+    """
+    connections = []
+    try:
+        for _ in range(max(app.config["DB_POOL_SIZE"], 1)):
+            conn = db.engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+def _start_password_pool():
+    from services.password_service import password_hasher
+
+    password_hasher.warm()
+
+def _render_pages(app):
+    client = app.test_client()
+    for path in app.config["WARMUP_PATHS"]:
+        response = client.get(path, environ_base={"REMOTE_ADDR": "127.0.0.1"})
+        if response.status_code >= 500:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+
+
+# -----------------
+# Entry points
+# -----------------
+
+def warm_app(app):
+    """
+    Shared warmup; call once the app is created (in the master when preloading).
+    """
+    warmup_state.phase = "warming"
+    with app.app_context():
+        warmup_state.run("catalog", _load_catalog)
+        warmup_state.run("availability", _load_availability)
+        warmup_state.run("templates", _compile_templates, app)
+        db.session.remove()
+    warmup_state.phase = "preloaded"
+
+def warm_worker(app):
+    """
+    Per-process warmup; call in each worker after the fork, before it serves.
+    Marks the process ready.
+    """
+    warmup_state.phase = "warming"
+    with app.app_context():
+        # Sockets opened by the master must not be used by two processes;
+        # close=False leaves them to the master instead of closing them here
+        db.engine.dispose(close=False)
+        warmup_state.run("db_pool", _open_db_pool, app)
+        if app.config["WARMUP_PASSWORD_POOL"]:
+            warmup_state.run("password_pool", _start_password_pool)
+        if app.config["WARMUP_PATHS"]:
+            warmup_state.run("pages", _render_pages, app)
+    warmup_state.phase = "ready"
+    app.logger.info("Worker %d warmed up: %s", os.getpid(), warmup_state.steps)
+
+def check_ready(app):
+    """
+    Readiness for /healthz/ready; retries a failed required step (at most
+    once per probe) so a worker started while the DB was down recovers.
+    """
+    if warmup_state.phase == "ready" and not warmup_state.ready:
+        with app.app_context():
+            warmup_state.run("db_pool", _open_db_pool, app)
+    return warmup_state.ready
+
+def get_warmup_state():
+    return warmup_state.snapshot()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=warmup_state.after_fork_in_child)
@@ -0,0 +1,26 @@
+"""
+WSGI entry point for production. Run from src/ with the bundled gunicorn
+settings (pre-fork workers, preloading, recycling, warmup):
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module creates the app and runs the shared warmup
+(warmup.warm_app). Each worker process must still call
+warmup.warm_worker(app) after it is forked and before it serves, which
+gunicorn.conf.py does in post_worker_init; other servers need the
+equivalent hook (e.g. uWSGI's @postfork), or /healthz/ready stays 503.
+Behind a reverse proxy, set TRUSTED_PROXY_HOPS (see config.py).
+"""
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app import create_app
+from warmup import warm_app
+
+app = create_app()
+
+# Behind a reverse proxy, take the client address (INTERNAL_ALLOWED_IPS,
+# logs) and scheme from the headers the trusted proxies add
+if app.config["TRUSTED_PROXY_HOPS"] > 0:
+    hops = app.config["TRUSTED_PROXY_HOPS"]
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+warm_app(app)